@@ -1,146 +1,289 @@
 
-import pygame
+import queue
 import threading
 import time
 import os
-from datetime import datetime
+
+# pygame is optional - without it (or without a sound device) the null backend is used
+try:
+    import pygame
+except ImportError:
+    pygame = None
+
+class PygameAudioBackend:
+    def __init__(self):
+        """Initialize pygame mixer for audio playback (raises if there is no sound device)"""
+        if pygame is None:
+            raise RuntimeError("pygame not installed")
+        pygame.mixer.init(frequency=22050, size=-16, channels=2, buffer=512)
+        self.channel = None
+        self.music_playing = False
+
+    def load(self, file_path):
+        """Decode a sound file into memory once"""
+        try:
+            return ("sound", pygame.mixer.Sound(file_path))
+        except pygame.error:
+            # Formats Sound cannot decode are streamed instead - still loaded only once
+            pygame.mixer.music.load(file_path)
+            return ("music", file_path)
+
+    def play(self, sound, loop=True, volume=1.0):
+        """Start playing a loaded sound (looping is done by the mixer, not polled)"""
+        self.stop()
+        kind, data = sound
+        if kind == "sound":
+            self.channel = data.play(loops=-1 if loop else 0)
+            if self.channel:
+                self.channel.set_volume(volume)
+        else:
+            pygame.mixer.music.set_volume(volume)
+            pygame.mixer.music.play(loops=-1 if loop else 0)
+            self.music_playing = True
+
+    def get_length(self, sound):
+        """Get the length of one play in seconds (None when it cannot be known)"""
+        kind, data = sound
+        return data.get_length() if kind == "sound" else None
+
+    def stop(self):
+        """Stop playback immediately"""
+        if self.channel:
+            self.channel.stop()
+            self.channel = None
+        if self.music_playing:
+            pygame.mixer.music.stop()
+            self.music_playing = False
+
+    def close(self):
+        """Release the sound device"""
+        self.stop()
+        pygame.mixer.quit()
+
+class NullAudioBackend:
+    def __init__(self):
+        """Silent backend for headless machines and CI"""
+        self.playing = None
+
+    def load(self, file_path):
+        """Check the file exists, nothing is decoded"""
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(file_path)
+        return ("null", file_path)
+
+    def play(self, sound, loop=True, volume=1.0):
+        """Remember what would be playing"""
+        self.playing = sound
+        self.volume = volume
+
+    def get_length(self, sound):
+        """Pretend every sound is one second long"""
+        return 1.0
+
+    def stop(self):
+        """Forget the playing sound"""
+        self.playing = None
+
+    def close(self):
+        """Nothing to release"""
+        self.stop()
+
+# Alarm sounds by escalation level: a higher rank replaces a lower one, never the reverse
+ALARM_MODES = {
+    "chime": {"rank": 1, "volume": 0.3, "loop": False},
+    "siren": {"rank": 2, "volume": 1.0, "loop": True},
+    "pulse": {"rank": 3, "volume": 1.0, "loop": True, "pulse": 0.5}
+}
+
+def create_audio_backend(name=None):
+    """Create the "pygame" or "null" backend; "auto" falls back to null when pygame cannot start"""
+    name = name or os.getenv("ALARM_AUDIO_BACKEND", "auto")
+    if name == "null":
+        return NullAudioBackend()
+    try:
+        return PygameAudioBackend()
+    except Exception as e:
+        if name == "pygame":
+            raise
+        print(f"Audio initialization error: {e} - using silent audio backend")
+        return NullAudioBackend()
 
 class AlarmSystem:
-    def __init__(self, alarm_file="static/alert.wav"):
+    def __init__(self, alarm_file="static/alert.wav", audio_backend=None):
         """Initialize alarm system"""
         self.alarm_file = alarm_file
         self.is_playing = False
-        self.should_stop = False
-        self.alarm_thread = None
-        self.pygame_initialized = False
-        self.initialize_pygame()
-    
-    def initialize_pygame(self):
-        """Initialize pygame mixer for audio playback"""
-        try:
-            pygame.mixer.init(frequency=22050, size=-16, channels=2, buffer=512)
-            self.pygame_initialized = True
+        self.mode = None  # Playing ALARM_MODES entry name, or "test"
+        self.sound = None  # Decoded alarm sound, loaded once per file
+        self.timer_at = None  # When the worker must wake up without a command
+        self.timer_action = None  # "stop" (chime/test over) or "pulse" (toggle the pulsing sound)
+        self.pulse_on = False
+        self.commands = queue.Queue()
+
+        self.backend = create_audio_backend(audio_backend)
+        self.pygame_initialized = isinstance(self.backend, PygameAudioBackend)
+        if self.pygame_initialized:
             print("Audio system initialized successfully")
-        except Exception as e:
-            print(f"Audio initialization error: {e}")
-            self.pygame_initialized = False
-    
+
+        # A single long-lived worker owns the audio device and runs every command in order
+        self.worker_thread = threading.Thread(target=self._worker_loop, daemon=True)
+        self.worker_thread.start()
+        if os.path.exists(self.alarm_file):
+            self._send("load", self.alarm_file)
+
+    def _send(self, command, argument=None, wait=0.0):
+        """Queue a command for the worker, optionally waiting up to `wait` seconds for it to run"""
+        done = threading.Event()
+        self.commands.put((command, argument, done))
+        if wait:
+            done.wait(wait)
+
+    def _worker_loop(self):
+        """Internal method that runs audio commands; it sleeps on the queue, never polls"""
+        while True:
+            timeout = None
+            if self.timer_at is not None:
+                timeout = max(0.0, self.timer_at - time.monotonic())
+            try:
+                command, argument, done = self.commands.get(timeout=timeout)
+            except queue.Empty:
+                try:
+                    self._run_timer()
+                except Exception as e:
+                    print(f"Alarm error ({self.timer_action}): {e}")
+                continue
+
+            try:
+                if command == "shutdown":
+                    self.backend.close()
+                    self.is_playing = False
+                    done.set()
+                    return
+                self._run_command(command, argument)
+            except Exception as e:
+                print(f"Alarm error ({command}): {e}")
+            done.set()
+
+    def _run_command(self, command, argument):
+        """Internal method that applies one command on the worker thread"""
+        if command == "load":
+            self.sound = self.backend.load(argument)
+            print(f"Alarm sound loaded: {argument}")
+
+        elif command == "play":
+            if self.is_playing and self.mode in ALARM_MODES and ALARM_MODES[self.mode]["rank"] >= ALARM_MODES[argument]["rank"]:
+                return  # Never step down while a louder alarm is sounding
+            settings = ALARM_MODES[argument]
+            if self.sound is None:
+                self.sound = self.backend.load(self.alarm_file)
+            self.backend.play(self.sound, loop=settings["loop"], volume=settings["volume"])
+            self.mode = argument
+            self.is_playing = True
+            self.pulse_on = True
+            self._set_timer(None)
+            if "pulse" in settings:
+                self._set_timer("pulse", settings["pulse"])
+            elif not settings["loop"]:
+                self._set_timer("stop", self.backend.get_length(self.sound) or 1.0)
+            print(f"Alarm started ({argument}): {self.alarm_file}")
+
+        elif command == "test":
+            if self.is_playing and self.mode != "test":
+                return  # A real alarm is already sounding
+            if self.sound is None:
+                self.sound = self.backend.load(self.alarm_file)
+            self.backend.play(self.sound, loop=True)
+            self.mode = "test"
+            self.is_playing = True
+            self._set_timer("stop", argument)
+
+        elif command == "stop":
+            self._stop_playback()
+
+    def _set_timer(self, action, delay=0.0):
+        """Internal method that sets (or clears, action None) the worker's wake-up timer"""
+        self.timer_action = action
+        self.timer_at = time.monotonic() + delay if action else None
+
+    def _run_timer(self):
+        """Internal method that handles the wake-up timer on the worker thread"""
+        if self.timer_action == "pulse":
+            # Restarting the sound on every "on" beat gives the pulsing pattern
+            self.pulse_on = not self.pulse_on
+            if self.pulse_on:
+                self.backend.play(self.sound, loop=True, volume=ALARM_MODES["pulse"]["volume"])
+            else:
+                self.backend.stop()
+            self._set_timer("pulse", ALARM_MODES["pulse"]["pulse"])
+        else:
+            self._stop_playback()
+
+    def _stop_playback(self):
+        """Internal method that silences the alarm"""
+        self.backend.stop()
+        self._set_timer(None)
+        self.mode = None
+        self.is_playing = False
+
     def start_alarm(self):
-        """Start playing alarm in background thread"""
-        if not self.pygame_initialized:
-            print("Audio system not initialized - alarm disabled")
-            return False, "ශබ්ද පද්ධතිය අක්‍රීයයි"
-        
-        if self.is_playing:
+        """Start playing the alarm (returns at once, the worker plays it)"""
+        return self.play_mode("siren")
+
+    def play_mode(self, mode):
+        """Play one of ALARM_MODES ("chime", "siren", "pulse"); a quieter mode never replaces a louder one"""
+        if mode not in ALARM_MODES:
+            return False, f"නොදන්නා ඇලම් වර්ගය: {mode}"
+
+        if self.is_playing and self.mode in ALARM_MODES and ALARM_MODES[self.mode]["rank"] >= ALARM_MODES[mode]["rank"]:
             return True, "ඇලම් දැනටමත් වාදනය වේ"
-        
-        if not os.path.exists(self.alarm_file):
+
+        if self.sound is None and not os.path.exists(self.alarm_file):
             return False, f"ඇලම් ගොනුව හමු නොවීය: {self.alarm_file}"
-        
-        self.should_stop = False
-        self.alarm_thread = threading.Thread(target=self._play_alarm_loop, daemon=True)
-        self.alarm_thread.start()
-        
+
+        self._send("play", mode)
         return True, "ඇලම් ආරම්භ කරන ලදී"
-    
+
     def stop_alarm(self):
         """Stop playing alarm"""
-        if not self.is_playing:
+        if not self.is_playing and self.commands.empty():
             return True, "ඇලම් දැනටමත් නවතා ඇත"
-        
-        self.should_stop = True
-        self.is_playing = False
-        
-        # Wait for thread to finish (with timeout)
-        if self.alarm_thread and self.alarm_thread.is_alive():
-            self.alarm_thread.join(timeout=2.0)
-        
+
+        # The worker wakes as soon as the command arrives, so this returns within milliseconds
+        self._send("stop", wait=0.5)
         return True, "ඇලම් නවතා ඇත"
-    
-    def _play_alarm_loop(self):
-        """Internal method to play alarm in loop"""
-        try:
-            self.is_playing = True
-            print(f"Starting alarm loop: {self.alarm_file}")
-            
-            while not self.should_stop:
-                try:
-                    # Load and play the alarm sound
-                    pygame.mixer.music.load(self.alarm_file)
-                    pygame.mixer.music.play()
-                    
-                    # Wait for the sound to finish or stop signal
-                    while pygame.mixer.music.get_busy() and not self.should_stop:
-                        time.sleep(0.1)
-                    
-                    if self.should_stop:
-                        break
-                        
-                except pygame.error as e:
-                    print(f"Error playing alarm: {e}")
-                    break
-                except Exception as e:
-                    print(f"Unexpected error in alarm loop: {e}")
-                    break
-            
-            # Stop any playing music
-            pygame.mixer.music.stop()
-            self.is_playing = False
-            print("Alarm loop ended")
-            
-        except Exception as e:
-            print(f"Error in alarm thread: {e}")
-            self.is_playing = False
-    
-    def test_alarm(self):
+
+    def test_alarm(self, duration=3.0):
         """Test alarm for a short duration"""
-        if not self.pygame_initialized:
-            return False, "ශබ්ද පද්ධතිය අක්‍රීයයි"
-        
-        if not os.path.exists(self.alarm_file):
+        if self.sound is None and not os.path.exists(self.alarm_file):
             return False, f"ඇලම් ගොනුව හමු නොවීය: {self.alarm_file}"
-        
-        try:
-            # Play alarm for 3 seconds
-            pygame.mixer.music.load(self.alarm_file)
-            pygame.mixer.music.play()
-            
-            # Start a timer to stop after 3 seconds
-            def stop_after_delay():
-                time.sleep(3)
-                pygame.mixer.music.stop()
-            
-            timer_thread = threading.Thread(target=stop_after_delay, daemon=True)
-            timer_thread.start()
-            
-            return True, "ඇලම් පරීක්ෂා කරන ලදී"
-        
-        except Exception as e:
-            return False, f"ඇලම් පරීක්ෂා දෝෂය: {str(e)}"
-    
+
+        self._send("test", duration)
+        return True, "ඇලම් පරීක්ෂා කරන ලදී"
+
     def is_playing_alarm(self):
         """Check if alarm is currently playing"""
         return self.is_playing
-    
+
     def get_status(self):
         """Get alarm system status"""
         if not self.pygame_initialized:
+            if self.is_playing:
+                return "වාදනය වේ", "ඇලම් වාදනය වේ (ශබ්ද පද්ධතිය අක්‍රීයයි)"
             return "අක්‍රීයයි", "ශබ්ද පද්ධතිය අක්‍රීයයි"
         elif self.is_playing:
             return "වාදනය වේ", "ඇලම් වාදනය වේ"
         else:
             return "සුරක්ෂිතයි", "ඇලම් නවතා ඇත"
-    
+
     def set_alarm_file(self, file_path):
-        """Set new alarm file"""
+        """Set new alarm file (decoded once by the worker; a sounding alarm keeps the old sound until restarted)"""
         if os.path.exists(file_path):
             self.alarm_file = file_path
+            self._send("load", file_path)
             return True, f"ඇලම් ගොනුව යාවත්කාලීන කරන ලදී: {file_path}"
         else:
             return False, f"ගොනුව හමු නොවීය: {file_path}"
-    
+
     def cleanup(self):
         """Cleanup resources"""
-        self.stop_alarm()
-        if self.pygame_initialized:
-            pygame.mixer.quit()
+        self._send("shutdown", wait=2.0)
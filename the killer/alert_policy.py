@@ -0,0 +1,196 @@
+import math
+import threading
+import time
+
+# Used when config.json has no "alert_policy"
+DEFAULT_ALERT_POLICY = {
+    "enabled": True,
+    "min_interval": 300,  # Seconds between two SMS to the same recipient
+    "bucket_capacity": 5,  # Burst size of the per-recipient token bucket
+    "tokens_per_hour": 6  # Sustained SMS rate per recipient
+}
+
+def format_duration(seconds):
+    """Format seconds as e.g. 45s, 4m or 1h 5m"""
+    seconds = int(seconds or 0)
+    if seconds < 60:
+        return f"{seconds}s"
+    hours, minutes = divmod(seconds // 60, 60)
+    return f"{hours}h {minutes}m" if hours else f"{minutes}m"
+
+def build_digest_message(events, now):
+    """Summarize held (time, event_type, message, duration) alerts as one SMS"""
+    if len(events) == 1:
+        return events[0][2]
+
+    enters = sum(1 for event in events if event[1] == "ENTER")
+    total_duration = sum(event[3] or 0 for event in events if event[1] == "EXIT")
+    minutes = max(1, math.ceil((now - events[0][0]) / 60))
+    if enters == 0:
+        return f"සතුන් වත්තෙන් පිටවී ගොස් ඇත (පසුගිය මිනිත්තු {minutes} තුළ, මුළු කාලය {format_duration(total_duration)})."
+
+    current = "සතුන් දැන් පිටවී ගොස් ඇත." if events[-1][1] == "EXIT" else "සතුන් තවමත් වත්තේ ඇත. කරුණාකර පරීක්ෂා කරන්න."
+    return (f"පසුගිය මිනිත්තු {minutes} තුළ සතුන් ඇතුළු වීම් {enters}ක් "
+            f"(මුළු කාලය {format_duration(total_duration)}). {current}")
+
+class TokenBucket:
+    def __init__(self, capacity, refill_rate, now):
+        """Initialize a full bucket; refill_rate is tokens per second"""
+        self.capacity = capacity
+        self.refill_rate = refill_rate
+        self.tokens = float(capacity)
+        self.updated_at = now
+
+    def refill(self, now):
+        """Add the tokens earned since the last update"""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.refill_rate)
+        self.updated_at = now
+
+    def has_token(self, now):
+        """Check if one token is available"""
+        self.refill(now)
+        return self.tokens >= 1.0
+
+    def consume(self, now):
+        """Take one token (callers check has_token first)"""
+        self.refill(now)
+        self.tokens -= 1.0
+
+class AlertPolicy:
+    def __init__(self, config, send_function, clock=time.time):
+        """Initialize rate limiting and digest aggregation; send_function(recipient, message) returns (success, message)"""
+        self.send_function = send_function
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.recipients = {}  # recipient -> {"bucket", "last_sent", "held"}
+        self.flush_thread = None
+        self.stop_event = threading.Event()
+
+        # Counters exposed through get_stats()
+        self.alerts_submitted = 0
+        self.messages_sent = 0
+        self.digests_sent = 0
+        self.configure(config)
+
+    def configure(self, config):
+        """Apply new limits (missing keys keep their defaults); recipients keep their buckets and held alerts"""
+        settings = dict(DEFAULT_ALERT_POLICY, **(config or {}))
+        now = self.clock()
+        with self.lock:
+            self.enabled = bool(settings["enabled"])
+            self.min_interval = float(settings["min_interval"])
+            self.bucket_capacity = max(1, int(settings["bucket_capacity"]))
+            self.refill_rate = float(settings["tokens_per_hour"]) / 3600.0
+            for state in self.recipients.values():
+                bucket = state["bucket"]
+                bucket.refill(now)  # Tokens earned so far count at the old rate
+                bucket.capacity = self.bucket_capacity
+                bucket.refill_rate = self.refill_rate
+                bucket.tokens = min(bucket.tokens, bucket.capacity)
+
+    def start(self):
+        """Start sending held digests as soon as each recipient is allowed another SMS"""
+        if self.flush_thread and self.flush_thread.is_alive():
+            return
+
+        self.stop_event.clear()
+        self.flush_thread = threading.Thread(target=self._flush_loop, daemon=True)
+        self.flush_thread.start()
+
+    def stop(self):
+        """Stop the digest thread (held alerts stay held)"""
+        self.stop_event.set()
+        if self.flush_thread and self.flush_thread.is_alive():
+            self.flush_thread.join(timeout=2.0)
+        self.flush_thread = None
+
+    def _get_state(self, recipient, now):
+        """Internal method that gets (or creates) one recipient's limiter state"""
+        if recipient not in self.recipients:
+            self.recipients[recipient] = {
+                "bucket": TokenBucket(self.bucket_capacity, self.refill_rate, now),
+                "last_sent": None,
+                "held": []
+            }
+        return self.recipients[recipient]
+
+    def _is_allowed(self, state, now):
+        """Internal method that checks the minimum interval and the token bucket"""
+        if state["last_sent"] is not None and now - state["last_sent"] < self.min_interval:
+            return False
+        return state["bucket"].has_token(now)
+
+    def _take_message(self, state, now):
+        """Internal method that turns the held alerts into one message and charges a token"""
+        message = build_digest_message(state["held"], now)
+        is_digest = len(state["held"]) > 1
+        state["held"] = []
+        state["last_sent"] = now
+        state["bucket"].consume(now)
+        self.messages_sent += 1
+        if is_digest:
+            self.digests_sent += 1
+        return message
+
+    def submit(self, recipient, event_type, message, duration=None):
+        """Send an alert now if the recipient's limits allow it, otherwise hold it for a digest"""
+        if not self.enabled:
+            return self.send_function(recipient, message)
+
+        now = self.clock()
+        with self.lock:
+            self.alerts_submitted += 1
+            state = self._get_state(recipient, now)
+            state["held"].append((now, event_type, message, duration))
+            if not self._is_allowed(state, now):
+                held = len(state["held"])
+                outgoing = None
+            else:
+                outgoing = self._take_message(state, now)
+
+        if outgoing is None:
+            return True, f"SMS රඳවා ඇත - ඊළඟ සාරාංශයට එක් වේ ({held})"
+        return self.send_function(recipient, outgoing)
+
+    def flush_due(self):
+        """Send a digest to every recipient with held alerts that is allowed an SMS again"""
+        now = self.clock()
+        outgoing = []
+        with self.lock:
+            for recipient, state in self.recipients.items():
+                # Alerts held before the policy was switched off go out at once
+                if state["held"] and (not self.enabled or self._is_allowed(state, now)):
+                    outgoing.append((recipient, self._take_message(state, now)))
+
+        for recipient, message in outgoing:
+            self.send_function(recipient, message)
+        return len(outgoing)
+
+    def _flush_loop(self):
+        """Internal method that checks for due digests once a second"""
+        while not self.stop_event.wait(1.0):
+            try:
+                self.flush_due()
+            except Exception as e:
+                print(f"Alert digest error: {e}")
+
+    def get_stats(self):
+        """Get alert counters and the per-recipient limiter state"""
+        now = self.clock()
+        with self.lock:
+            recipients = {}
+            for recipient, state in self.recipients.items():
+                state["bucket"].refill(now)
+                recipients[recipient] = {
+                    "tokens": round(state["bucket"].tokens, 2),
+                    "held_alerts": len(state["held"]),
+                    "seconds_since_last_sms": round(now - state["last_sent"], 1) if state["last_sent"] else None
+                }
+            return {
+                "enabled": self.enabled,
+                "alerts_submitted": self.alerts_submitted,
+                "messages_sent": self.messages_sent,
+                "digests_sent": self.digests_sent,
+                "alerts_held": sum(len(state["held"]) for state in self.recipients.values()),
+                "recipients": recipients
+            }
@@ -1,18 +1,21 @@
-from flask import Flask, render_template, request, jsonify, Response, redirect, url_for
-import cv2
+from flask import Flask, render_template, request, jsonify, Response, redirect, url_for, abort
+import io
 import json
 import threading
 import time
 from datetime import datetime
 import os
 import base64
-import io
-from PIL import Image
 from werkzeug.utils import secure_filename
 
-from detector import AnimalDetector
-from state_machine import FarmGateStateMachine
+from camera_manager import CameraManager, load_camera_registry
+from escalation import EscalationScheduler, load_escalation_plan
+from event_bus import EventBus
+from event_statistics import StatisticsAggregator
+from event_store import EventStore, encode_cursor, decode_cursor
+from frame_broadcaster import get_placeholder_part
 from sms_system import SMSSystem
+from zones import load_zones
 from alarm_system import AlarmSystem
 
 app = Flask(__name__)
@@ -24,75 +27,114 @@ app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
 
 # Global instances
-detector = None
-state_machine = None
+camera_manager = None
 sms_system = None
 alarm_system = None
-camera_thread = None
+escalation = None
+event_store = None
+event_statistics = None
 is_running = False
 
+# Push updates for /api/stream; lives outside initialize_systems so clients survive restarts
+event_bus = EventBus()
+
+# Routes that change config.json read, modify and write it back under this lock
+config_lock = threading.Lock()
+
 def allowed_file(filename):
     """Check if file extension is allowed"""
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+def get_event_store():
+    """Get the event store, opening it (and importing the old CSV) on first use"""
+    global event_store
+    if event_store is None:
+        event_store = EventStore()
+    return event_store
+
+def get_statistics():
+    """Get the statistics aggregator, rebuilding it from the event store on first use"""
+    global event_statistics
+    if event_statistics is None:
+        statistics = StatisticsAggregator()
+        statistics.rebuild(get_event_store())
+        event_statistics = statistics
+    return event_statistics
+
 def initialize_systems():
     """Initialize all monitoring systems"""
-    global detector, state_machine, sms_system, alarm_system
+    global camera_manager, sms_system, alarm_system, escalation, event_statistics
     
-    detector = AnimalDetector()
-    state_machine = FarmGateStateMachine()
+    # Open the store before the camera workers so the CSV migration runs once, here
+    get_event_store()
+    # The store is the source of truth - recount on every (re)start, then update per event
+    event_statistics = None
+    get_statistics()
+    # Alerts go through the SMS outbox so a slow network never holds up camera events
+    if sms_system:
+        sms_system.stop()
     sms_system = SMSSystem()
+    sms_system.start()
+    # The old alarm worker owns the sound device - release it before starting a new one
+    if alarm_system:
+        alarm_system.cleanup()
     alarm_system = AlarmSystem()
+    # One timer wheel escalates every intrusion, stages come from config.json
+    if escalation:
+        escalation.stop()
+    try:
+        with open('config.json', 'r', encoding='utf-8') as f:
+            config_data = json.load(f)
+    except FileNotFoundError:
+        config_data = {}
+    escalation = EscalationScheduler(load_escalation_plan(config_data), on_stage=handle_escalation_stage)
+    escalation.start()
     
-    # Initialize camera
-    if detector.initialize_camera():
-        print("Camera initialized successfully")
+    # Reuse the manager on restart so connected video clients keep their broadcasters
+    if camera_manager is None:
+        camera_manager = CameraManager(on_event=handle_camera_event, on_status_change=handle_status_change)
     else:
-        print("Camera initialization failed")
+        camera_manager.load_config()
+    print(f"Cameras registered: {', '.join(camera_manager.get_camera_ids())}")
 
-def camera_monitoring_loop():
-    """Main monitoring loop running in background thread"""
-    global is_running, detector, state_machine, sms_system, alarm_system
+def handle_camera_event(camera_id, event, message):
+    """Handle ENTER/EXIT events reported by a camera worker"""
+    if event == "ENTER":
+        print(f"[{camera_id}] Animals detected - starting alarm escalation and SMS")
+        escalation.begin(camera_id)
+        sms_system.send_animal_enter_alert()
     
-    while is_running:
-        try:
-            # Get detection result
-            result = detector.detect_animals()
-            if result is None:
-                print("Detector returned None, skipping this iteration")
-                time.sleep(0.1)
-                continue
-                
-            success, frame, status = result
-            
-            if success:
-                # Update state machine
-                event = state_machine.update_state(status)
-                
-                # Handle state changes
-                if event == "ENTER":
-                    print("Animals detected - starting alarm and SMS")
-                    alarm_system.start_alarm()
-                    sms_system.send_animal_enter_alert()
-                
-                elif event == "EXIT":
-                    print("Animals left - stopping alarm and sending SMS")
-                    alarm_system.stop_alarm()
-                    sms_system.send_animal_exit_alert()
-                
-                # Store current frame for web display
-                if frame is not None:
-                    # Encode frame for web display
-                    _, buffer = cv2.imencode('.jpg', frame)
-                    frame_bytes = buffer.tobytes()
-                    # Store in global variable for web access
-                    app.current_frame = frame_bytes
-            
-            time.sleep(0.1)  # Small delay to prevent excessive CPU usage
-            
-        except Exception as e:
-            print(f"Error in monitoring loop: {e}")
-            time.sleep(1)
+    elif event == "EXIT":
+        print(f"[{camera_id}] Animals left - sending SMS")
+        escalation.end(camera_id)
+        # Keep the alarm going while another gate still reports an intrusion
+        if not camera_manager.any_intrusion():
+            alarm_system.stop_alarm()
+        sms_system.send_animal_exit_alert(duration=message.get('duration'))
+    
+    get_statistics().record_event(event, message.get('logged_at') or datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                                  message.get('duration'))
+    
+    event_bus.publish('event', {
+        'camera_id': camera_id,
+        'event': event,
+        'animal_count': message.get('animal_count'),
+        'timestamp': message.get('timestamp', time.time())
+    })
+    event_bus.publish('status', build_overall_status())
+
+def handle_escalation_stage(camera_id, stage):
+    """Run one escalation stage an intrusion has reached (called on the timer wheel thread)"""
+    print(f"[{camera_id}] Intrusion escalation after {stage['after']:.0f}s: {stage['action']}")
+    if stage['action'] == 'sms':
+        sms_system.send_intrusion_reminder(stage['after'])
+    else:
+        alarm_system.play_mode(stage['action'])
+    event_bus.publish('status', build_overall_status())
+
+def handle_status_change(camera_id, status):
+    """Push a camera status change to connected dashboards"""
+    event_bus.publish('status', build_overall_status())
 
 @app.route('/')
 def index():
@@ -119,62 +161,140 @@ def help():
     """Help page"""
     return render_template('help.html')
 
-@app.route('/api/status')
-def api_status():
-    """Get current system status"""
-    if not detector:
-        return jsonify({
+def build_camera_status(camera_id):
+    """Combine a camera's detection status with the SMS and alarm status"""
+    status = dict(camera_manager.get_camera_status(camera_id))
+    status['sms_status'], _ = sms_system.get_status()
+    status['alarm_status'], _ = alarm_system.get_status()
+    status['escalation_stage'] = escalation.get_status()['active'].get(camera_id) if escalation else None
+    return status
+
+def generate_frames(camera_id, profile=None):
+    """Yield MJPEG parts for a camera from the shared broadcaster of a stream profile"""
+    broadcaster = camera_manager.get_broadcaster(camera_id, profile) if camera_manager else None
+    if broadcaster is None:
+        yield get_placeholder_part()
+        return
+    
+    yield from broadcaster.stream()
+
+def build_overall_status():
+    """Build the overall system status (plus every camera)"""
+    if not camera_manager:
+        return {
             'status': 'අක්‍රීයයි',
             'status_icon': '⚪',
             'message': 'පද්ධතිය අක්‍රීයයි',
             'camera_status': 'කැමරාව සම්බන්ධ කර නොමැත',
             'sms_status': 'SMS අක්‍රීයයි',
-            'alarm_status': 'ඇලම් අක්‍රීයයි'
-        })
-    
-    # Get detector status
-    detector_status, detector_message = detector.get_status()
+            'alarm_status': 'ඇලම් අක්‍රීයයි',
+            'cameras': []
+        }
     
-    # Get state machine status
-    state_info = state_machine.get_current_state()
-    status_text, status_icon = state_machine.get_state_display()
+    cameras = [build_camera_status(camera_id) for camera_id in camera_manager.get_camera_ids()]
     
-    # Get SMS status
-    sms_status, sms_message = sms_system.get_status()
+    # Overall status follows the first camera with an intrusion, else the default camera
+    intruded = [camera for camera in cameras if camera.get('is_intrusion')]
+    overall = dict(intruded[0] if intruded else cameras[0])
+    overall['cameras'] = cameras
+    return overall
+
+@app.route('/api/status')
+def api_status():
+    """Get current system status (overall, plus every camera)"""
+    return jsonify(build_overall_status())
+
+@app.route('/api/stream')
+def api_stream():
+    """Server-Sent Events: status changes and ENTER/EXIT events as they happen"""
+    response = Response(event_bus.stream(initial_messages=[('status', build_overall_status())]),
+                        mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'  # Don't let a reverse proxy buffer the stream
+    return response
+
+@app.route('/api/cameras')
+def api_cameras():
+    """List registered cameras"""
+    if not camera_manager:
+        return jsonify([])
     
-    # Get alarm status
-    alarm_status, alarm_message = alarm_system.get_status()
+    return jsonify([{
+        'id': status['camera_id'],
+        'name': status['name'],
+        'status': status['status'],
+        'status_icon': status['status_icon'],
+        'is_intrusion': status['is_intrusion']
+    } for status in camera_manager.get_all_status()])
+
+@app.route('/api/cameras/<camera_id>/status')
+def api_camera_status(camera_id):
+    """Get status of a single camera"""
+    if not camera_manager or not camera_manager.has_camera(camera_id):
+        abort(404)
+    return jsonify(build_camera_status(camera_id))
+
+@app.route('/api/cameras/<camera_id>/zones', methods=['GET', 'POST'])
+def api_camera_zones(camera_id):
+    """Get or replace a camera's detection zones (normalized include/exclude polygons)"""
+    with config_lock:
+        try:
+            with open('config.json', 'r', encoding='utf-8') as f:
+                config_data = json.load(f)
+        except FileNotFoundError:
+            config_data = {}
+        
+        # Cameras from the single camera_index fallback get written out so they can hold zones
+        cameras = config_data.get('cameras') or load_camera_registry(config_data)
+        camera = next((camera for camera in cameras if str(camera.get('id')) == camera_id), None)
+        if camera is None:
+            abort(404)
+        
+        if request.method == 'GET':
+            return jsonify(load_zones(camera))
+        
+        zones_data = request.json or {}
+        if not isinstance(zones_data, dict):
+            return jsonify({'success': False, 'error': 'Invalid zones: expected an object with include/exclude lists'}), 400
+        try:
+            camera['zones'] = load_zones({'zones': zones_data})
+        except (TypeError, ValueError) as e:
+            return jsonify({'success': False, 'error': f'Invalid zones: {e}'}), 400
+        
+        config_data['cameras'] = cameras
+        with open('config.json', 'w', encoding='utf-8') as f:
+            json.dump(config_data, f, indent=4, ensure_ascii=False)
+    if camera_manager:
+        camera_manager.reload_config()
+    return jsonify({'success': True, 'message': 'අනාවරණ කලාප යාවත්කාලීන කරන ලදී', 'zones': camera['zones']})
+
+@app.route('/api/cameras/<camera_id>/video_feed')
+def camera_video_feed(camera_id):
+    """Video feed endpoint for a single camera (?profile=thumbnail|mobile|full)"""
+    if not camera_manager or not camera_manager.has_camera(camera_id):
+        abort(404)
     
-    return jsonify({
-        'status': status_text,
-        'status_icon': status_icon,
-        'message': detector_message,
-        'camera_status': detector_message,
-        'sms_status': sms_status,
-        'alarm_status': alarm_status,
-        'is_intrusion': state_info['is_intrusion'],
-        'intrusion_duration': int(state_info['intrusion_duration'])
-    })
+    profile = request.args.get('profile')
+    if profile and profile not in camera_manager.profiles:
+        return jsonify({'error': f'Unknown stream profile: {profile}'}), 400
+    return Response(generate_frames(camera_id, profile), mimetype='multipart/x-mixed-replace; boundary=frame')
 
 @app.route('/api/video_feed')
 def video_feed():
-    """Video feed endpoint"""
-    def generate_frames():
-        while True:
-            if hasattr(app, 'current_frame') and app.current_frame:
-                yield (b'--frame\r\n'
-                       b'Content-Type: image/jpeg\r\n\r\n' + app.current_frame + b'\r\n')
-            else:
-                # Send placeholder image
-                img = Image.new('RGB', (640, 480), color='black')
-                img_bytes = io.BytesIO()
-                img.save(img_bytes, format='JPEG')
-                img_bytes = img_bytes.getvalue()
-                yield (b'--frame\r\n'
-                       b'Content-Type: image/jpeg\r\n\r\n' + img_bytes + b'\r\n')
-            time.sleep(0.1)
+    """Video feed endpoint for the default camera (?profile=thumbnail|mobile|full)"""
+    camera_id = camera_manager.get_default_camera_id() if camera_manager else None
     
-    return Response(generate_frames(), mimetype='multipart/x-mixed-replace; boundary=frame')
+    profile = request.args.get('profile')
+    if profile and camera_manager and profile not in camera_manager.profiles:
+        return jsonify({'error': f'Unknown stream profile: {profile}'}), 400
+    return Response(generate_frames(camera_id, profile), mimetype='multipart/x-mixed-replace; boundary=frame')
+
+@app.route('/api/stream_profiles')
+def api_stream_profiles():
+    """List the available video stream profiles"""
+    if not camera_manager:
+        return jsonify({'profiles': {}, 'default': None})
+    return jsonify({'profiles': camera_manager.profiles, 'default': camera_manager.default_profile})
 
 @app.route('/api/test_sms', methods=['POST'])
 def test_sms():
@@ -182,16 +302,43 @@ def test_sms():
     success, message = sms_system.send_test_sms()
     return jsonify({'success': success, 'message': message})
 
+@app.route('/api/sms/outbox')
+def api_sms_outbox():
+    """Get SMS queue counts and the latest messages with their delivery status"""
+    if not sms_system:
+        return jsonify({'error': 'SMS අක්‍රීයයි'}), 503
+    
+    return jsonify({
+        'stats': sms_system.get_outbox_stats(),
+        'alert_policy': sms_system.alert_policy.get_stats(),
+        'messages': sms_system.outbox.get_recent(request.args.get('limit', 20, type=int))
+    })
+
+@app.route('/api/sms/log')
+def api_sms_log():
+    """Get sent SMS records, newest first (?offset=0&limit=50)"""
+    if not sms_system:
+        return jsonify({'error': 'SMS අක්‍රීයයි'}), 503
+    
+    offset = max(request.args.get('offset', 0, type=int), 0)
+    limit = min(max(request.args.get('limit', 50, type=int), 1), 500)
+    return jsonify(sms_system.sms_log.paginate(offset, limit))
+
 @app.route('/api/test_alarm', methods=['POST'])
 def test_alarm():
     """Test alarm functionality"""
     success, message = alarm_system.test_alarm()
+    event_bus.publish('status', build_overall_status())
     return jsonify({'success': success, 'message': message})
 
 @app.route('/api/stop_alarm', methods=['POST'])
 def stop_alarm():
     """Stop alarm manually"""
+    # Silencing by hand also drops the stages still to come, or they would restart it
+    if escalation:
+        escalation.cancel_all()
     success, message = alarm_system.stop_alarm()
+    event_bus.publish('status', build_overall_status())
     return jsonify({'success': success, 'message': message})
 
 @app.route('/api/config', methods=['GET', 'POST'])
@@ -208,14 +355,23 @@ def config():
     elif request.method == 'POST':
         try:
             new_config = request.json
+            if not isinstance(new_config, dict):
+                return jsonify({'success': False, 'error': 'Invalid configuration'}), 400
             
-            # Update configuration
-            with open('config.json', 'w', encoding='utf-8') as f:
-                json.dump(new_config, f, indent=4, ensure_ascii=False)
+            # Update configuration - only the posted settings change, the rest (cameras, zones...) is kept
+            with config_lock:
+                try:
+                    with open('config.json', 'r', encoding='utf-8') as f:
+                        config_data = json.load(f)
+                except FileNotFoundError:
+                    config_data = {}
+                config_data.update(new_config)
+                with open('config.json', 'w', encoding='utf-8') as f:
+                    json.dump(config_data, f, indent=4, ensure_ascii=False)
             
-            # Update detector config
-            if detector:
-                detector.load_config('config.json')
+            # Update camera workers
+            if camera_manager:
+                camera_manager.reload_config()
             
             # Update SMS system
             if sms_system:
@@ -226,18 +382,60 @@ def config():
         except Exception as e:
             return jsonify({'success': False, 'error': str(e)}), 500
 
+def stream_json_array(items):
+    """Yield a JSON array piece by piece instead of building it in memory"""
+    yield '['
+    for index, item in enumerate(items):
+        yield (',' if index else '') + json.dumps(item, ensure_ascii=False)
+    yield ']'
+
 @app.route('/api/events')
 def api_events():
-    """Get events history"""
+    """Get events history as a streamed JSON array.
+    
+    Filters: since, until, event, order (asc/desc), limit and cursor. When a
+    limited page has more events after it, the X-Next-Cursor header holds the
+    cursor for the next page.
+    """
     try:
-        events = []
-        if os.path.exists('events/events.csv'):
-            import csv
-            with open('events/events.csv', 'r', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                events = list(reader)
+        store = get_event_store()
+        filters = {
+            'since': request.args.get('since'),
+            'until': request.args.get('until'),
+            'event': request.args.get('event'),
+            'newest_first': request.args.get('order', 'asc') == 'desc'
+        }
+        limit = request.args.get('limit', type=int)
+        if limit is not None and limit < 1:
+            raise ValueError("limit must be at least 1")
+        cursor = request.args.get('cursor')
+        after = decode_cursor(cursor) if cursor else None
+        
+        headers = {}
+        if limit:
+            # One page is small - fetch one extra row to know if there is a next page
+            events = store.query(limit=limit + 1, after=after, **filters)
+            if len(events) > limit:
+                events = events[:limit]
+                headers['X-Next-Cursor'] = encode_cursor(events[-1])
+        else:
+            events = store.iter_events(after=after, **filters)
         
-        return jsonify(events)
+        return Response(stream_json_array(events), mimetype='application/json', headers=headers)
+    
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/events/export.csv')
+def api_events_export():
+    """Download all events as CSV in the old events.csv format"""
+    try:
+        output = io.StringIO()
+        get_event_store().export_csv(output)
+        return Response(output.getvalue().encode('utf-8'), mimetype='text/csv',
+                        headers={'Content-Disposition': 'attachment; filename=events.csv'})
     
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -246,41 +444,12 @@ def api_events():
 def api_statistics():
     """Get system statistics"""
     try:
-        stats = {
-            'total_events': 0,
-            'today_events': 0,
-            'animals_detected': 0,
-            'system_uptime': 0,
-            'last_detection': 'කිසිවිටක නැත'
-        }
-        
-        # Count events
-        if os.path.exists('events/events.csv'):
-            import csv
-            from datetime import datetime, timedelta
-            
-            with open('events/events.csv', 'r', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                events = list(reader)
-                
-            stats['total_events'] = len(events)
-            
-            # Count today's events
-            today = datetime.now().strftime('%Y-%m-%d')
-            today_events = [e for e in events if e.get('date', '').startswith(today)]
-            stats['today_events'] = len(today_events)
-            
-            # Count animal detections
-            animal_events = [e for e in events if 'ඇතුළු වී ඇත' in e.get('status', '')]
-            stats['animals_detected'] = len(animal_events)
-            
-            # Last detection
-            if animal_events:
-                last_event = animal_events[-1]
-                stats['last_detection'] = f"{last_event.get('date', '')} {last_event.get('time', '')}"
+        # Kept up to date per event, nothing is counted here
+        stats = get_statistics().get_summary()
+        stats['last_detection'] = stats['last_detection'] or 'කිසිවිටක නැත'
         
         # System uptime (simplified)
-        if detector and detector.camera and detector.camera.isOpened():
+        if camera_manager and camera_manager.any_camera_active():
             stats['system_uptime'] = "ක්‍රියාත්මකයි"
         else:
             stats['system_uptime'] = "අක්‍රීයයි"
@@ -290,6 +459,31 @@ def api_statistics():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/statistics/daily')
+def api_statistics_daily():
+    """Get per-day ENTER/EXIT counts and intrusion time for charts (?days=30&end=YYYY-MM-DD)"""
+    try:
+        days = min(max(request.args.get('days', 30, type=int), 1), 366)
+        return jsonify(get_statistics().get_daily_rollup(days, request.args.get('end')))
+    
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/statistics/hourly')
+def api_statistics_hourly():
+    """Get the 24 hourly counts of one day (?date=YYYY-MM-DD) and the all-time hour-of-day histogram"""
+    try:
+        statistics = get_statistics()
+        return jsonify({
+            'hours': statistics.get_hourly_rollup(request.args.get('date')),
+            'hour_of_day': statistics.get_hour_of_day_histogram()
+        })
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/upload_alarm', methods=['POST'])
 def upload_alarm():
     """Upload alarm sound file"""
@@ -307,12 +501,13 @@ def upload_alarm():
             file.save(filepath)
             
             # Update config
-            with open('config.json', 'r', encoding='utf-8') as f:
-                config = json.load(f)
-            config['alarm_file'] = f'static/{filename}'
-            
-            with open('config.json', 'w', encoding='utf-8') as f:
-                json.dump(config, f, indent=4, ensure_ascii=False)
+            with config_lock:
+                with open('config.json', 'r', encoding='utf-8') as f:
+                    config = json.load(f)
+                config['alarm_file'] = f'static/{filename}'
+                
+                with open('config.json', 'w', encoding='utf-8') as f:
+                    json.dump(config, f, indent=4, ensure_ascii=False)
             
             # Update alarm system
             if alarm_system:
@@ -342,12 +537,13 @@ def upload_logo():
             file.save(filepath)
             
             # Update config
-            with open('config.json', 'r', encoding='utf-8') as f:
-                config = json.load(f)
-            config['logo_file'] = f'static/{filename}'
-            
-            with open('config.json', 'w', encoding='utf-8') as f:
-                json.dump(config, f, indent=4, ensure_ascii=False)
+            with config_lock:
+                with open('config.json', 'r', encoding='utf-8') as f:
+                    config = json.load(f)
+                config['logo_file'] = f'static/{filename}'
+                
+                with open('config.json', 'w', encoding='utf-8') as f:
+                    json.dump(config, f, indent=4, ensure_ascii=False)
             
             return jsonify({'success': True, 'message': f'ලෝගෝ ගොනුව උඩුගත කරන ලදී: {filename}'})
         else:
@@ -359,7 +555,7 @@ def upload_logo():
 @app.route('/api/start_system', methods=['POST'])
 def start_system():
     """Start the monitoring system"""
-    global is_running, camera_thread
+    global is_running
     
     if is_running:
         return jsonify({'success': False, 'message': 'පද්ධතිය දැනටමත් ක්‍රියාත්මක වේ'})
@@ -367,8 +563,7 @@ def start_system():
     try:
         initialize_systems()
         is_running = True
-        camera_thread = threading.Thread(target=camera_monitoring_loop, daemon=True)
-        camera_thread.start()
+        camera_manager.start()
         
         return jsonify({'success': True, 'message': 'පද්ධතිය ආරම්භ කරන ලදී'})
     
@@ -378,16 +573,18 @@ def start_system():
 @app.route('/api/stop_system', methods=['POST'])
 def stop_system():
     """Stop the monitoring system"""
-    global is_running, detector, alarm_system
+    global is_running, camera_manager, alarm_system
     
     try:
         is_running = False
         
+        if escalation:
+            escalation.cancel_all()
         if alarm_system:
             alarm_system.stop_alarm()
         
-        if detector:
-            detector.release_camera()
+        if camera_manager:
+            camera_manager.stop()
         
         return jsonify({'success': True, 'message': 'පද්ධතිය නවතා ඇත'})
     
@@ -398,10 +595,9 @@ if __name__ == '__main__':
     # Initialize systems on startup
     initialize_systems()
     
-    # Start monitoring in background
+    # Start one monitoring process per camera
     is_running = True
-    camera_thread = threading.Thread(target=camera_monitoring_loop, daemon=True)
-    camera_thread.start()
+    camera_manager.start()
     
     print("Farm Gate Monitor starting...")
     print("Dashboard: http://localhost:5000")
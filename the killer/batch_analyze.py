@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Batch offline analysis
+Re-scores recorded footage with the live detection logic (is_animal_motion +
+FarmGateStateMachine) as fast as the CPU allows, one recording per process.
+
+Usage:
+    python batch_analyze.py recordings/*.mp4 --workers 4 --events-csv events.csv --json report.json
+    python batch_analyze.py recordings/ --min-area 800 --detection-frames 8
+"""
+
+import argparse
+import csv
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import cv2
+
+from detector import AnimalDetector
+from frame_sources import VideoFileSource
+from state_machine import FarmGateStateMachine
+
+VIDEO_EXTENSIONS = {'.mp4', '.avi', '.mkv', '.mov', '.m4v', '.wmv'}
+
+def find_videos(paths):
+    """Expand files, directories and glob patterns into a sorted list of video files"""
+    videos = []
+    for path in paths:
+        matches = glob.glob(path) or [path]
+        for match in matches:
+            if os.path.isdir(match):
+                for name in sorted(os.listdir(match)):
+                    if os.path.splitext(name)[1].lower() in VIDEO_EXTENSIONS:
+                        videos.append(os.path.join(match, name))
+            else:
+                videos.append(match)
+    return sorted(dict.fromkeys(videos))
+
+def format_video_time(seconds):
+    """Format seconds as HH:MM:SS.mmm"""
+    hours, remainder = divmod(seconds, 3600)
+    minutes, seconds = divmod(remainder, 60)
+    return f"{int(hours):02d}:{int(minutes):02d}:{seconds:06.3f}"
+
+def init_worker():
+    """Keep OpenCV single-threaded inside each worker process - parallelism comes from the pool"""
+    cv2.setNumThreads(1)
+
+def analyze_video(path, config_file="config.json", overrides=None):
+    """Run the detection pipeline over one recording and return its events and stats"""
+    detector = AnimalDetector(config_file)
+    detector.config.update(overrides or {})
+    state_machine = FarmGateStateMachine(events_db=None)
+    state_machine.reset_state(timestamp=0.0)
+
+    source = VideoFileSource(path, realtime=False)
+    if not source.open():
+        return {"file": path, "error": "ගොනුව විවෘත කළ නොහැක / cannot open file", "events": []}
+
+    events = []
+    frames = 0
+    detection_frames = 0
+    timestamp = 0.0
+    start = time.perf_counter()
+
+    while True:
+        ret, frame = source.read()
+        if not ret:
+            break
+
+        frames += 1
+        timestamp = source.get_timestamp()
+        result = detector.process_frame(frame, timestamp=timestamp, annotate=False)
+        if result is None:
+            continue
+
+        success, _, status = result
+        if status == "ඇතුළු වී ඇත":
+            detection_frames += 1
+
+        event = state_machine.update_state(status, timestamp=timestamp, animal_count=detector.get_animal_count())
+        if event in ("ENTER", "EXIT"):
+            events.append({
+                "file": path,
+                "event": event,
+                "video_time": round(timestamp, 3),
+                "video_timestamp": format_video_time(timestamp),
+                "duration": round(state_machine.last_intrusion_duration, 1) if event == "EXIT" else "",
+                "animals": state_machine.animal_count
+            })
+
+    elapsed = time.perf_counter() - start
+    source.release()
+
+    return {
+        "file": path,
+        "frames": frames,
+        "video_duration": round(timestamp, 3),
+        "processing_time": round(elapsed, 3),
+        "fps": round(frames / elapsed, 1) if elapsed > 0 else 0,
+        "realtime_factor": round(timestamp / elapsed, 1) if elapsed > 0 else 0,
+        "detection_frames": detection_frames,
+        "enter_events": sum(1 for e in events if e["event"] == "ENTER"),
+        "exit_events": sum(1 for e in events if e["event"] == "EXIT"),
+        "open_intrusion_at_end": state_machine.state == "INTRUSION",
+        "events": events
+    }
+
+def write_events_csv(path, results):
+    """Write ENTER/EXIT events of all recordings to CSV"""
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=["file", "event", "video_time", "video_timestamp", "duration", "animals"])
+        writer.writeheader()
+        for result in results:
+            writer.writerows(result["events"])
+
+def write_stats_csv(path, results):
+    """Write per-recording stats to CSV"""
+    fields = ["file", "frames", "video_duration", "processing_time", "fps", "realtime_factor",
+              "detection_frames", "enter_events", "exit_events", "open_intrusion_at_end", "error"]
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=fields, extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(results)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Re-score recorded footage offline")
+    parser.add_argument("inputs", nargs="+", help="Video files, directories or glob patterns")
+    parser.add_argument("--config", default="config.json", help="Detector configuration file")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes")
+    parser.add_argument("--min-area", type=int, help="Override min_area")
+    parser.add_argument("--detection-frames", type=int, help="Override detection_frames")
+    parser.add_argument("--analysis-resolution", help="Override analysis_resolution, e.g. 640x360 or 'full'")
+    parser.add_argument("--events-csv", default="batch_events.csv", help="ENTER/EXIT events output")
+    parser.add_argument("--stats-csv", default="batch_stats.csv", help="Per-file stats output")
+    parser.add_argument("--json", dest="json_file", default="batch_report.json", help="Full JSON report")
+    args = parser.parse_args(argv)
+
+    videos = find_videos(args.inputs)
+    if not videos:
+        print("❌ No video files found")
+        return False
+
+    overrides = {}
+    if args.min_area is not None:
+        overrides["min_area"] = args.min_area
+    if args.detection_frames is not None:
+        overrides["detection_frames"] = args.detection_frames
+    if args.analysis_resolution:
+        overrides["analysis_resolution"] = (None if args.analysis_resolution == "full" else
+                                            [int(v) for v in args.analysis_resolution.split("x")])
+
+    workers = max(1, min(args.workers, len(videos)))
+    print(f"📹 Analyzing {len(videos)} recordings with {workers} workers...")
+
+    results = []
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker) as pool:
+        futures = {pool.submit(analyze_video, video, args.config, overrides): video for video in videos}
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as e:
+                result = {"file": futures[future], "error": str(e), "events": []}
+            results.append(result)
+
+            if result.get("error"):
+                print(f"❌ {result['file']}: {result['error']}")
+            else:
+                print(f"✅ {result['file']}: {result['frames']} frames, {result['enter_events']} ENTER / "
+                      f"{result['exit_events']} EXIT, {result['fps']} fps ({result['realtime_factor']}x realtime)")
+
+    elapsed = time.perf_counter() - start
+    results.sort(key=lambda result: result["file"])
+    total_frames = sum(result.get("frames", 0) for result in results)
+
+    report = {
+        "settings": overrides,
+        "totals": {
+            "files": len(results),
+            "failed": sum(1 for result in results if result.get("error")),
+            "frames": total_frames,
+            "enter_events": sum(result.get("enter_events", 0) for result in results),
+            "exit_events": sum(result.get("exit_events", 0) for result in results),
+            "elapsed": round(elapsed, 3),
+            "fps": round(total_frames / elapsed, 1) if elapsed > 0 else 0
+        },
+        "files": results
+    }
+
+    write_events_csv(args.events_csv, results)
+    write_stats_csv(args.stats_csv, results)
+    with open(args.json_file, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+    print(f"\n📊 {total_frames} frames in {elapsed:.1f}s ({report['totals']['fps']} fps overall)")
+    print(f"📋 Reports: {args.events_csv}, {args.stats_csv}, {args.json_file}")
+    return report["totals"]["failed"] == 0
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
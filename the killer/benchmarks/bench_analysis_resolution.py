@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Analysis resolution benchmark
+Compares per-frame detection cost and detection decisions at full resolution
+against downscaled analysis resolutions.
+
+Usage:
+    python benchmarks/bench_analysis_resolution.py                 # synthetic scene
+    python benchmarks/bench_analysis_resolution.py night1.mp4 ...  # recorded clips
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import cv2
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from detector import AnimalDetector
+from frame_sources import SyntheticSource, VideoFileSource
+
+def read_frames(source):
+    """Read every frame of a frame source"""
+    frames = []
+    if not source.open():
+        return frames
+    while True:
+        ret, frame = source.read()
+        if not ret:
+            break
+        frames.append(frame)
+    source.release()
+    return frames
+
+def run_detection(frames, resolution):
+    """Run is_animal_motion over a clip, returning decisions, boxes and seconds per frame"""
+    detector = AnimalDetector()
+    detector.config["analysis_resolution"] = resolution
+
+    decisions = []
+    boxes = []
+    start = time.perf_counter()
+    for frame in frames:
+        has_animals, contours = detector.is_animal_motion(frame)
+        decisions.append(has_animals)
+        boxes.append([cv2.boundingRect(contour) for contour in contours])
+    elapsed = time.perf_counter() - start
+
+    return decisions, boxes, elapsed / max(1, len(frames))
+
+def find_episodes(decisions, detection_frames, gap_frames):
+    """Group per-frame decisions into intrusion episodes (start, end) like the detector's debounce"""
+    episodes = []
+    start = last = None
+    hits = 0
+    for i, hit in enumerate(decisions):
+        if not hit:
+            continue
+        if start is None or i - last > gap_frames:
+            if start is not None and hits >= detection_frames:
+                episodes.append((start, last))
+            start, hits = i, 0
+        hits += 1
+        last = i
+    if start is not None and hits >= detection_frames:
+        episodes.append((start, last))
+    return episodes
+
+def episodes_match(baseline, candidate, tolerance):
+    """Check that two episode lists agree within a frame tolerance"""
+    if len(baseline) != len(candidate):
+        return False
+    return all(abs(a[0] - b[0]) <= tolerance and abs(a[1] - b[1]) <= tolerance
+               for a, b in zip(baseline, candidate))
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark downscaled analysis resolutions")
+    parser.add_argument("clips", nargs="*", help="Recorded video clips (default: synthetic scene)")
+    parser.add_argument("--resolutions", default="640x360,320x180",
+                        help="Comma separated analysis resolutions to compare with full resolution")
+    parser.add_argument("--detection-frames", type=int, default=10)
+    parser.add_argument("--gap-frames", type=int, default=20,
+                        help="Frames without detection that end an episode (2s at 10 fps)")
+    args = parser.parse_args()
+
+    resolutions = [tuple(int(v) for v in r.split("x")) for r in args.resolutions.split(",") if r]
+    clips = ([(path, read_frames(VideoFileSource(path))) for path in args.clips] or
+             [("synthetic", read_frames(SyntheticSource(frame_count=200)))])
+
+    all_match = True
+    for name, frames in clips:
+        if not frames:
+            print(f"❌ {name}: no frames")
+            all_match = False
+            continue
+
+        height, width = frames[0].shape[:2]
+        print(f"\n📹 {name}: {len(frames)} frames at {width}x{height}")
+
+        base_decisions, _, base_time = run_detection(frames, None)
+        base_episodes = find_episodes(base_decisions, args.detection_frames, args.gap_frames)
+        print(f"  full      {base_time * 1000:7.2f} ms/frame  detections={sum(base_decisions):4d}  episodes={base_episodes}")
+
+        for resolution in resolutions:
+            decisions, _, per_frame = run_detection(frames, resolution)
+            episodes = find_episodes(decisions, args.detection_frames, args.gap_frames)
+            agreement = sum(a == b for a, b in zip(base_decisions, decisions)) / len(frames)
+            match = episodes_match(base_episodes, episodes, args.gap_frames)
+            all_match = all_match and match
+            label = f"{resolution[0]}x{resolution[1]}"
+            print(f"  {label:9s} {per_frame * 1000:7.2f} ms/frame  detections={sum(decisions):4d}  "
+                  f"episodes={episodes}  speedup={base_time / per_frame:4.1f}x  "
+                  f"frame agreement={agreement:.1%}  {'✅' if match else '❌'}")
+
+    print("\n" + ("✅ Detection decisions match" if all_match else "❌ Detection decisions differ"))
+    return all_match
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
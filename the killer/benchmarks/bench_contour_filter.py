@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Contour filter benchmark
+Times the animal contour filter against the original per-contour loop on
+noisy foreground masks (sensor noise, MOG2 shadows) and on grass-heavy masks
+with thousands of contour points, where the bulk NumPy path takes over. Checks
+that every version keeps exactly the same contours. findContours runs once
+per mask outside the timing, it is the same for all of them.
+
+Usage:
+    python benchmarks/bench_contour_filter.py
+    python benchmarks/bench_contour_filter.py --noise 0.02 --blades 800 --frames 100
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from detection_backends import BULK_FILTER_MIN_POINTS, filter_animal_contours, filter_contours_bulk
+
+def filter_contours_loop(contours, min_area, min_size):
+    """The original filter: every measurement for every contour, one at a time"""
+    animal_contours = []
+    for contour in contours:
+        area = cv2.contourArea(contour)
+        if area > min_area:
+            x, y, w, h = cv2.boundingRect(contour)
+            aspect_ratio = w / h if h > 0 else 0
+            if 0.2 < aspect_ratio < 4.0:
+                hull = cv2.convexHull(contour)
+                hull_area = cv2.contourArea(hull)
+                if hull_area > 0:
+                    solidity = area / hull_area
+                    extent = area / (w * h) if w * h > 0 else 0
+                    if 0.2 < solidity < 0.9 and 0.1 < extent < 0.8 and w > min_size and h > min_size:
+                        perimeter = cv2.arcLength(contour, True)
+                        if perimeter > 0:
+                            perimeter_area_ratio = (perimeter * perimeter) / area
+                            if 10 < perimeter_area_ratio < 50:
+                                animal_contours.append(contour)
+    return animal_contours
+
+def make_noisy_mask(rng, width, height, noise, blobs):
+    """Build a cleaned-up foreground mask: speckle noise, grass-like streaks, animal blobs and shadow pixels"""
+    mask = np.zeros((height, width), dtype=np.uint8)
+    mask[rng.random((height, width)) < noise] = 255
+    for _ in range(int(noise * 4000)):
+        # Grass blades: thin streaks, some long and thick enough to pass the area test
+        x, y = int(rng.integers(0, width)), int(rng.integers(0, height))
+        cv2.line(mask, (x, y), (x + int(rng.integers(-8, 9)), y - int(rng.integers(5, 80))), 255,
+                 int(rng.integers(2, 7)))
+    for _ in range(blobs):
+        center = (int(rng.integers(60, width - 60)), int(rng.integers(60, height - 60)))
+        axes = (int(rng.integers(20, 60)), int(rng.integers(15, 40)))
+        cv2.ellipse(mask, center, axes, float(rng.integers(0, 180)), 0, 360, 255, -1)
+        cv2.circle(mask, (center[0] + axes[0], center[1] - axes[1]), axes[1] // 2, 255, -1)  # Head
+        # MOG2 marks shadows with 127
+        cv2.ellipse(mask, (center[0], center[1] + axes[1]), (axes[0], 8), 0, 0, 360, 127, -1)
+
+    kernel_small = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (3, 3))
+    kernel_large = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (5, 5))
+    mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, kernel_small)
+    return cv2.morphologyEx(mask, cv2.MORPH_CLOSE, kernel_large)
+
+def make_grass_mask(rng, width, height, blades, blobs):
+    """Build a cleaned-up foreground mask of swaying grass: many short separate blades and a few animal blobs"""
+    mask = np.zeros((height, width), dtype=np.uint8)
+    for _ in range(blades):
+        x, y = int(rng.integers(0, width)), int(rng.integers(0, height))
+        cv2.line(mask, (x, y), (x + int(rng.integers(-8, 9)), y - int(rng.integers(5, 40))), 255,
+                 int(rng.integers(2, 5)))
+    for _ in range(blobs):
+        center = (int(rng.integers(60, width - 60)), int(rng.integers(60, height - 60)))
+        axes = (int(rng.integers(20, 60)), int(rng.integers(15, 40)))
+        cv2.ellipse(mask, center, axes, float(rng.integers(0, 180)), 0, 360, 255, -1)
+        cv2.circle(mask, (center[0] + axes[0], center[1] - axes[1]), axes[1] // 2, 255, -1)  # Head
+
+    kernel_small = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (3, 3))
+    kernel_large = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (5, 5))
+    mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, kernel_small)
+    return cv2.morphologyEx(mask, cv2.MORPH_CLOSE, kernel_large)
+
+def same_contours(results, other_results):
+    """Check two filters kept exactly the same contours on every frame"""
+    return all(len(a) == len(b) and all(np.array_equal(x, y) for x, y in zip(a, b))
+               for a, b in zip(results, other_results))
+
+def compare(label, masks, min_area, min_size):
+    """Time the original loop, the filter and the bulk path on the masks, returns True if all agree"""
+    start = time.perf_counter()
+    frames = [cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)[0] for mask in masks]
+    find_time = (time.perf_counter() - start) / len(masks)
+    contour_count = np.mean([len(contours) for contours in frames])
+    point_count = np.mean([sum(map(len, contours)) for contours in frames])
+
+    loop_results, loop_time = time_filter(filter_contours_loop, frames, min_area, min_size)
+    new_results, new_time = time_filter(filter_animal_contours, frames, min_area, min_size)
+    bulk_results, bulk_time = time_filter(filter_contours_bulk, frames, min_area, min_size)
+
+    match = same_contours(loop_results, new_results) and same_contours(loop_results, bulk_results)
+    kept = sum(len(result) for result in new_results) / len(masks)
+    print(f"{label:<12} contours/frame={contour_count:4.0f} ({point_count:5.0f} points)  kept={kept:4.1f}  "
+          f"findContours={find_time * 1000:5.2f} ms  original={loop_time * 1000:5.2f} ms  "
+          f"filter={new_time * 1000:5.2f} ms ({loop_time / new_time:3.1f}x)  "
+          f"bulk={bulk_time * 1000:5.2f} ms ({loop_time / bulk_time:3.1f}x)  {'✅' if match else '❌'}")
+    return match
+
+def time_filter(function, frames, min_area, min_size, repeat=5):
+    """Run a filter over every frame's contours, returning the kept contours and the best seconds per frame"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        results = [function(contours, min_area, min_size) for contours in frames]
+        elapsed = (time.perf_counter() - start) / len(frames)
+        best = elapsed if best is None else min(best, elapsed)
+    return results, best
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the animal contour filter")
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--height", type=int, default=360)
+    parser.add_argument("--frames", type=int, default=50)
+    parser.add_argument("--noise", default="0.002,0.01,0.03",
+                        help="Comma separated speckle densities (fraction of pixels)")
+    parser.add_argument("--blades", default="100,300,600,1000",
+                        help="Comma separated grass blades per mask for the grass-heavy masks")
+    parser.add_argument("--blobs", type=int, default=3, help="Animal-like blobs per mask")
+    parser.add_argument("--min-area", type=float, default=1000 * (640 / 1280) ** 2)
+    parser.add_argument("--min-size", type=float, default=20 * 640 / 1280)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(1)
+    all_match = True
+    print(f"filter_animal_contours switches to the bulk path from {BULK_FILTER_MIN_POINTS} contour points\n")
+    for noise in (float(n) for n in args.noise.split(",") if n):
+        masks = [make_noisy_mask(rng, args.width, args.height, noise, args.blobs) for _ in range(args.frames)]
+        all_match = compare(f"noise={noise}", masks, args.min_area, args.min_size) and all_match
+    for blades in (int(n) for n in args.blades.split(",") if n):
+        masks = [make_grass_mask(rng, args.width, args.height, blades, args.blobs) for _ in range(args.frames)]
+        all_match = compare(f"blades={blades}", masks, args.min_area, args.min_size) and all_match
+
+    print("\n" + ("✅ Same contours kept" if all_match else "❌ Kept contours differ"))
+    return all_match
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,475 @@
+import multiprocessing
+import queue
+import threading
+import time
+import json
+from collections import deque
+
+from detector import AnimalDetector
+from frame_broadcaster import FrameBroadcaster
+from frame_scheduler import FrameScheduler
+from state_machine import FarmGateStateMachine
+from stream_profiles import load_stream_profiles, get_default_profile, encode_frame
+
+# Status fields whose change is pushed to dashboards
+STATUS_CHANGE_KEYS = ("status", "message", "camera_active", "is_intrusion")
+
+# Seconds between checks that every camera worker process is still alive
+WORKER_CHECK_INTERVAL = 2.0
+
+# Seconds before a crashed camera worker is started again
+WORKER_RESTART_DELAY = 10.0
+
+def load_camera_registry(config):
+    """Build the camera registry from config, falling back to the single camera_index"""
+    cameras = config.get("cameras") or [{
+        "id": "gate1",
+        "name": "ප්‍රධාන ගේට්ටුව",
+        "camera_index": config.get("camera_index", 0)
+    }]
+
+    registry = []
+    for i, camera in enumerate(cameras):
+        camera = dict(camera)
+        camera["id"] = str(camera.get("id", f"camera{i + 1}"))
+        camera.setdefault("name", camera["id"])
+        camera.setdefault("enabled", True)
+        registry.append(camera)
+    return registry
+
+def build_camera_status(camera, detector, state_machine, scheduler=None):
+    """Build the status message a camera worker reports to the web app"""
+    detector_status, detector_message = detector.get_status()
+    state_info = state_machine.get_current_state()
+    status_text, status_icon = state_machine.get_state_display()
+
+    return {
+        "type": "status",
+        "camera_id": camera["id"],
+        "name": camera["name"],
+        "status": status_text,
+        "status_icon": status_icon,
+        "message": detector_message,
+        "camera_status": detector_message,
+        "camera_active": detector.camera is not None and detector.camera.isOpened(),
+        "is_intrusion": state_info["is_intrusion"],
+        "intrusion_duration": int(state_info["intrusion_duration"]),
+        "animal_count": state_info["animal_count"],
+        "frame_stats": detector.get_frame_stats(),
+        "motion_gate": detector.get_gate_stats(),
+        "classifier": detector.get_classifier_stats(),
+        "frame_rate": scheduler.get_stats() if scheduler else {},
+        "event_writer": state_machine.get_writer_stats(),
+        "updated_at": time.time()
+    }
+
+def flush_events(result_queue, pending_events, timeout=None):
+    """Hand queued ENTER/EXIT messages to the web app in order, returns True once none are left.
+
+    Without a timeout nothing blocks: whatever does not fit stays queued for the next frame.
+    """
+    while pending_events:
+        try:
+            if timeout is None:
+                result_queue.put_nowait(pending_events[0])
+            else:
+                result_queue.put(pending_events[0], timeout=timeout)
+        except queue.Full:
+            return False
+        pending_events.popleft()
+    return True
+
+def camera_worker_main(camera, config_file, result_queue, control_queue):
+    """Run one camera's detector + state machine pipeline in its own process"""
+    detector = AnimalDetector(config_file, camera_id=camera["id"])
+    state_machine = FarmGateStateMachine(camera_id=camera["id"])
+
+    if detector.initialize_camera():
+        print(f"[{camera['id']}] Camera initialized successfully")
+    else:
+        print(f"[{camera['id']}] Camera initialization failed")
+
+    profiles = load_stream_profiles(detector.config)
+    # Paces the loop: full rate on motion or intrusion, a low idle rate for a quiet scene
+    scheduler = FrameScheduler(detector.config.get("frame_rate"))
+    active_profiles = set()  # Profiles with at least one viewer - nothing is encoded without viewers
+    last_encode_times = {}
+    last_status_time = 0
+    pending_events = deque()  # ENTER/EXIT messages the web app has not taken yet - kept until it does
+    running = True
+
+    while running:
+        scheduler.start_frame()
+
+        # Handle commands from the web app without blocking detection
+        try:
+            while True:
+                command = control_queue.get_nowait()
+                if command.get("command") == "stop":
+                    running = False
+                elif command.get("command") == "reload_config":
+                    detector.load_config(config_file)
+                    profiles = load_stream_profiles(detector.config)
+                    scheduler.configure(detector.config.get("frame_rate"))
+                elif command.get("command") == "set_profiles":
+                    active_profiles = set(command.get("profiles", []))
+        except queue.Empty:
+            pass
+
+        if not running:
+            break
+
+        flush_events(result_queue, pending_events)
+
+        try:
+            event = None
+            result = detector.detect_animals()
+            if result is None:
+                print(f"[{camera['id']}] Detector returned None, skipping this iteration")
+                time.sleep(scheduler.end_frame(active=True))
+                continue
+
+            success, frame, status = result
+
+            if success:
+                event = state_machine.update_state(status, animal_count=detector.get_animal_count())
+
+                if event in ("ENTER", "EXIT"):
+                    # Events must never be dropped: a full result queue keeps them here and retries every frame
+                    pending_events.append({
+                        "type": "event",
+                        "camera_id": camera["id"],
+                        "event": event,
+                        "timestamp": time.time(),
+                        "logged_at": state_machine.last_event_time,
+                        "duration": state_machine.last_intrusion_duration if event == "EXIT" else 0,
+                        "animal_count": state_machine.animal_count,
+                        "state": state_machine.get_current_state()
+                    })
+                    flush_events(result_queue, pending_events)
+
+                if frame is not None:
+                    now = time.time()
+                    for name in active_profiles:
+                        profile = profiles.get(name)
+                        # Encode each watched profile at its own frame rate
+                        if not profile or now - last_encode_times.get(name, 0) < 1.0 / profile["fps"]:
+                            continue
+                        last_encode_times[name] = now
+                        jpeg_bytes = encode_frame(frame, profile)
+                        if jpeg_bytes is None:
+                            continue
+                        try:
+                            # Frames are disposable - drop this one if the web app is behind
+                            result_queue.put_nowait({
+                                "type": "frame",
+                                "camera_id": camera["id"],
+                                "profile": name,
+                                "frame": jpeg_bytes
+                            })
+                        except queue.Full:
+                            pass
+
+            if event in ("ENTER", "EXIT") or time.time() - last_status_time >= 0.5:
+                try:
+                    # Status is resent every 0.5 s anyway - drop this one if the web app is behind
+                    result_queue.put_nowait(build_camera_status(camera, detector, state_machine, scheduler))
+                except queue.Full:
+                    pass
+                last_status_time = time.time()
+
+            # Live viewers keep at least their profile's frame rate
+            viewer_fps = max((profiles[name]["fps"] for name in active_profiles if name in profiles), default=0)
+            active = state_machine.state == "INTRUSION" or detector.is_motion_seen()
+            time.sleep(scheduler.end_frame(active, viewer_fps))
+
+        except Exception as e:
+            print(f"[{camera['id']}] Error in monitoring loop: {e}")
+            time.sleep(1)
+
+    # Give the web app a last chance to take the events still waiting
+    if not flush_events(result_queue, pending_events, timeout=5.0):
+        print(f"[{camera['id']}] {len(pending_events)} events could not be delivered before stopping")
+
+    state_machine.close()
+    detector.release_camera()
+
+class CameraManager:
+    def __init__(self, config_file="config.json", on_event=None, on_status_change=None):
+        """Initialize the multi-camera monitoring engine"""
+        self.config_file = config_file
+        self.on_event = on_event  # Called as on_event(camera_id, event, message)
+        self.on_status_change = on_status_change  # Called as on_status_change(camera_id, status)
+        self.context = multiprocessing.get_context("spawn")
+        self.cameras = {}
+        self.workers = {}
+        self.worker_cameras = {}  # camera_id -> camera settings the running worker was started with
+        self.control_queues = {}
+        self.restart_at = {}  # camera_id -> time a crashed worker is started again
+        self.workers_lock = threading.Lock()
+        self.result_queue = None
+        self.latest_status = {}
+        self.profiles = {}
+        self.default_profile = None
+        self.broadcasters = {}  # camera_id -> {profile name -> FrameBroadcaster}
+        self.dispatch_thread = None
+        self.is_running = False
+        self.load_config()
+
+    def load_config(self):
+        """Load the camera registry from the configuration file"""
+        try:
+            with open(self.config_file, 'r', encoding='utf-8') as f:
+                config = json.load(f)
+        except FileNotFoundError:
+            config = {}
+
+        self.cameras = {camera["id"]: camera for camera in load_camera_registry(config)}
+        self.profiles = load_stream_profiles(config)
+        self.default_profile = get_default_profile(config)
+        for camera_id in self.cameras:
+            camera_broadcasters = self.broadcasters.setdefault(camera_id, {})
+            for name in self.profiles:
+                if name not in camera_broadcasters:
+                    camera_broadcasters[name] = FrameBroadcaster(
+                        on_subscribers_changed=lambda count, camera_id=camera_id: self._update_profiles(camera_id)
+                    )
+
+    def start(self):
+        """Start one worker process per enabled camera"""
+        if self.is_running:
+            return
+
+        self.load_config()
+        self.result_queue = self.context.Queue(maxsize=256)
+        self.is_running = True
+
+        with self.workers_lock:
+            for camera_id, camera in self.cameras.items():
+                if camera.get("enabled", True):
+                    self._start_worker(camera_id, camera)
+
+        self.dispatch_thread = threading.Thread(target=self._dispatch_loop, daemon=True)
+        self.dispatch_thread.start()
+
+    def _start_worker(self, camera_id, camera):
+        """Start the worker process of one camera (called with workers_lock held)"""
+        control_queue = self.context.Queue()
+        worker = self.context.Process(
+            target=camera_worker_main,
+            args=(camera, self.config_file, self.result_queue, control_queue),
+            name=f"camera-{camera_id}",
+            daemon=True
+        )
+        worker.start()
+        self.workers[camera_id] = worker
+        self.worker_cameras[camera_id] = camera
+        self.control_queues[camera_id] = control_queue
+        self.restart_at.pop(camera_id, None)
+        print(f"Camera worker started: {camera_id} (pid {worker.pid})")
+
+        # Clients may already be watching from before a restart
+        self._update_profiles(camera_id)
+
+    def _stop_workers(self, camera_ids):
+        """Stop the worker processes of these cameras and wait for them (called with workers_lock held)"""
+        workers = {}
+        for camera_id in camera_ids:
+            worker = self.workers.pop(camera_id, None)
+            control_queue = self.control_queues.pop(camera_id, None)
+            self.worker_cameras.pop(camera_id, None)
+            self.restart_at.pop(camera_id, None)
+            self.latest_status.pop(camera_id, None)
+            if worker is None:
+                continue
+            control_queue.put({"command": "stop"})
+            workers[camera_id] = worker
+
+        for camera_id, worker in workers.items():
+            worker.join(timeout=5.0)
+            if worker.is_alive():
+                print(f"Camera worker {camera_id} did not stop, terminating")
+                worker.terminate()
+
+    def stop(self):
+        """Stop all camera workers"""
+        if not self.is_running:
+            return
+
+        with self.workers_lock:
+            self._stop_workers(list(self.workers))
+            self.restart_at = {}
+
+        self.is_running = False
+        if self.dispatch_thread and self.dispatch_thread.is_alive():
+            self.dispatch_thread.join(timeout=2.0)
+
+        self.latest_status = {}
+        for camera_broadcasters in self.broadcasters.values():
+            for broadcaster in camera_broadcasters.values():
+                broadcaster.clear()
+
+    def reload_config(self):
+        """Reload the camera registry: start added cameras, stop removed ones, reload the rest"""
+        self.load_config()
+
+        # Viewers of a removed camera get disconnected
+        for camera_id in [camera_id for camera_id in self.broadcasters if camera_id not in self.cameras]:
+            for broadcaster in self.broadcasters.pop(camera_id).values():
+                broadcaster.clear()
+
+        if not self.is_running:
+            return
+
+        with self.workers_lock:
+            enabled = {camera_id: camera for camera_id, camera in self.cameras.items()
+                       if camera.get("enabled", True)}
+
+            # A worker keeps the camera settings it was started with, so a changed camera is restarted
+            stale = [camera_id for camera_id in set(self.workers) | set(self.restart_at)
+                     if self.worker_cameras.get(camera_id) != enabled.get(camera_id)]
+            self._stop_workers(stale)
+
+            for camera_id, camera in enabled.items():
+                if camera_id in self.workers:
+                    self.control_queues[camera_id].put({"command": "reload_config"})
+                else:
+                    self._start_worker(camera_id, camera)
+
+    def _check_workers(self):
+        """Report cameras whose worker process died as offline and start them again after a delay"""
+        now = time.time()
+        with self.workers_lock:
+            for camera_id, worker in list(self.workers.items()):
+                if worker.is_alive():
+                    continue
+                print(f"Camera worker {camera_id} exited unexpectedly (exit code {worker.exitcode}), "
+                      f"restarting in {WORKER_RESTART_DELAY:.0f}s")
+                del self.workers[camera_id]
+                del self.control_queues[camera_id]
+                self.restart_at[camera_id] = now + WORKER_RESTART_DELAY
+
+                camera = self.cameras.get(camera_id, {})
+                status = {
+                    "type": "status",
+                    "camera_id": camera_id,
+                    "name": camera.get("name", camera_id),
+                    "status": "අක්‍රීයයි",
+                    "status_icon": "⚪",
+                    "message": "කැමරා ක්‍රියාවලිය නතර විය - නැවත ආරම්භ කරමින්",
+                    "camera_status": "කැමරා ක්‍රියාවලිය නතර විය - නැවත ආරම්භ කරමින්",
+                    "camera_active": False,
+                    "is_intrusion": False,
+                    "intrusion_duration": 0,
+                    "frame_stats": {},
+                    "updated_at": now
+                }
+                self.latest_status[camera_id] = status
+                if self.on_status_change:
+                    self.on_status_change(camera_id, status)
+
+            for camera_id, restart_time in list(self.restart_at.items()):
+                if now >= restart_time and self.is_running:
+                    self._start_worker(camera_id, self.worker_cameras[camera_id])
+
+    def _update_profiles(self, camera_id):
+        """Tell a camera worker which stream profiles currently have viewers"""
+        control_queue = self.control_queues.get(camera_id)
+        if control_queue is None:
+            return
+
+        profiles = [name for name, broadcaster in self.broadcasters.get(camera_id, {}).items()
+                    if broadcaster.get_subscriber_count() > 0]
+        control_queue.put({"command": "set_profiles", "profiles": profiles})
+
+    def _dispatch_loop(self):
+        """Internal method that consumes worker results in the web app process"""
+        last_check_time = time.time()
+        while self.is_running:
+            if time.time() - last_check_time >= WORKER_CHECK_INTERVAL:
+                last_check_time = time.time()
+                try:
+                    self._check_workers()
+                except Exception as e:
+                    print(f"Error checking camera workers: {e}")
+
+            try:
+                message = self.result_queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            except (EOFError, OSError):
+                break
+
+            try:
+                camera_id = message["camera_id"]
+                if message["type"] == "frame":
+                    broadcaster = self.broadcasters[camera_id].get(message["profile"])
+                    if broadcaster:
+                        broadcaster.publish(message["frame"])
+                elif message["type"] == "status":
+                    previous = self.latest_status.get(camera_id, {})
+                    self.latest_status[camera_id] = message
+                    # Only the fields a dashboard shows count as a change, not the running counters
+                    if self.on_status_change and any(previous.get(key) != message.get(key) for key in STATUS_CHANGE_KEYS):
+                        self.on_status_change(camera_id, message)
+                elif message["type"] == "event":
+                    status = self.latest_status.setdefault(camera_id, {})
+                    status["is_intrusion"] = message["state"]["is_intrusion"]
+                    if self.on_event:
+                        self.on_event(camera_id, message["event"], message)
+            except Exception as e:
+                print(f"Error dispatching camera message: {e}")
+
+    def get_camera_ids(self):
+        """Get the ids of all registered cameras"""
+        return list(self.cameras.keys())
+
+    def get_default_camera_id(self):
+        """Get the id of the first registered camera"""
+        return next(iter(self.cameras), None)
+
+    def has_camera(self, camera_id):
+        """Check if a camera id is registered"""
+        return camera_id in self.cameras
+
+    def get_camera_status(self, camera_id):
+        """Get the latest status reported by a camera worker"""
+        camera = self.cameras.get(camera_id, {})
+        status = self.latest_status.get(camera_id)
+        if status and "status" in status:
+            return dict(status, viewers=self.get_viewer_count(camera_id))
+
+        return {
+            "camera_id": camera_id,
+            "name": camera.get("name", camera_id),
+            "status": "අක්‍රීයයි",
+            "status_icon": "⚪",
+            "message": "කැමරාව සම්බන්ධ කර නොමැත",
+            "camera_status": "කැමරාව සම්බන්ධ කර නොමැත",
+            "camera_active": False,
+            "is_intrusion": False,
+            "intrusion_duration": 0,
+            "frame_stats": {},
+            "viewers": 0
+        }
+
+    def get_all_status(self):
+        """Get the latest status of every registered camera"""
+        return [self.get_camera_status(camera_id) for camera_id in self.cameras]
+
+    def get_broadcaster(self, camera_id, profile=None):
+        """Get the MJPEG broadcaster of a camera for a stream profile"""
+        return self.broadcasters.get(camera_id, {}).get(profile or self.default_profile)
+
+    def get_viewer_count(self, camera_id):
+        """Get the number of video clients of a camera across all profiles"""
+        return sum(broadcaster.get_subscriber_count()
+                   for broadcaster in self.broadcasters.get(camera_id, {}).values())
+
+    def any_intrusion(self):
+        """Check if any camera currently reports an intrusion"""
+        return any(status.get("is_intrusion") for status in self.latest_status.values())
+
+    def any_camera_active(self):
+        """Check if any camera is connected"""
+        return any(status.get("camera_active") for status in self.latest_status.values())
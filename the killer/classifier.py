@@ -0,0 +1,142 @@
+import os
+import time
+
+import cv2
+import numpy as np
+
+# onnxruntime is optional - without it models run through OpenCV's dnn module
+try:
+    import onnxruntime
+except ImportError:
+    onnxruntime = None
+
+# Used when config.json has no "classifier"; off until a model is installed
+DEFAULT_CLASSIFIER = {
+    "enabled": False,
+    "engine": "opencv",  # "opencv" (cv2.dnn) or "onnxruntime"
+    "model": "models/animal_classifier.onnx",  # Takes N x 3 x size x size BGR scaled to 0..1, outputs N x labels
+    "input_size": 64,
+    "labels": ["ගවයා", "එළුවා", "බල්ලා", "අලියා", "වල් ඌරා", "මිනිසා", "පසුබිම"],
+    "ignore_labels": ["මිනිසා", "පසුබිම"],  # Confident crops of these are not animals
+    "min_confidence": 0.5,  # Below this a crop keeps the generic animal name
+    "padding": 0.1,  # Crop margin around the motion box, as a fraction of its size
+    "max_batch": 8  # Crops per forward pass
+}
+
+def load_classifier_settings(config):
+    """Get the classifier settings from config (missing keys keep their defaults)"""
+    return {**DEFAULT_CLASSIFIER, **(config.get("classifier") or {})}
+
+def to_probabilities(scores):
+    """Turn raw model outputs into per-row probabilities (outputs that already are pass through)"""
+    scores = scores.astype(np.float32).reshape(len(scores), -1)
+    if scores.min() >= 0 and np.allclose(scores.sum(axis=1), 1.0, atol=1e-3):
+        return scores
+    exp = np.exp(scores - scores.max(axis=1, keepdims=True))
+    return exp / exp.sum(axis=1, keepdims=True)
+
+class AnimalClassifier:
+    def __init__(self, settings):
+        """Load the classifier model once (raises if the model cannot be loaded)"""
+        self.settings = settings
+        self.labels = list(settings["labels"])
+        self.ignore_labels = set(settings["ignore_labels"])
+        self.input_size = int(settings["input_size"])
+        self.engine = settings["engine"]
+        self.crops_classified = 0
+        self.batches = 0
+        self.total_time = 0.0
+
+        model = settings["model"]
+        if not os.path.exists(model):
+            raise FileNotFoundError(model)
+
+        if self.engine == "onnxruntime" and onnxruntime is None:
+            print("onnxruntime not installed - running the classifier with OpenCV dnn")
+            self.engine = "opencv"
+
+        if self.engine == "onnxruntime":
+            self.session = onnxruntime.InferenceSession(model, providers=["CPUExecutionProvider"])
+            self.input_name = self.session.get_inputs()[0].name
+        elif self.engine == "opencv":
+            self.net = cv2.dnn.readNetFromONNX(model)  # Runs on the CPU by default
+        else:
+            raise ValueError(f"Unknown classifier engine: {self.engine}")
+        print(f"Animal classifier loaded: {model} ({self.engine})")
+
+    def crop(self, frame, box):
+        """Cut one padded (x, y, w, h) box out of a frame"""
+        x, y, w, h = box
+        pad_x = int(w * self.settings["padding"])
+        pad_y = int(h * self.settings["padding"])
+        height, width = frame.shape[:2]
+        return frame[max(0, y - pad_y):min(height, y + h + pad_y), max(0, x - pad_x):min(width, x + w + pad_x)]
+
+    def run(self, crops):
+        """Run one batch of crops through the model, returns N x labels probabilities"""
+        size = (self.input_size, self.input_size)
+        blob = cv2.dnn.blobFromImages(crops, scalefactor=1.0 / 255, size=size, swapRB=False, crop=False)
+        if self.engine == "onnxruntime":
+            scores = self.session.run(None, {self.input_name: blob})[0]
+        else:
+            self.net.setInput(blob)
+            scores = self.net.forward()
+        return to_probabilities(scores)
+
+    def classify(self, frame, boxes):
+        """Classify the motion boxes of one frame, returns (label, confidence) per box.
+
+        Only the candidate regions are looked at, resized to the fixed input
+        size and sent through the model in batches. The label is None when the
+        model is not confident enough.
+        """
+        if not boxes:
+            return []
+
+        start = time.perf_counter()
+        results = []
+        max_batch = max(1, int(self.settings["max_batch"]))
+        for i in range(0, len(boxes), max_batch):
+            crops = [self.crop(frame, box) for box in boxes[i:i + max_batch]]
+            for row in self.run(crops):
+                best = int(np.argmax(row))
+                confidence = float(row[best])
+                label = self.labels[best] if best < len(self.labels) else None
+                if confidence < self.settings["min_confidence"]:
+                    label = None
+                results.append((label, confidence))
+            self.batches += 1
+
+        self.crops_classified += len(boxes)
+        self.total_time += time.perf_counter() - start
+        return results
+
+    def is_ignored(self, label):
+        """Check if a label means the crop is not an animal (a person, swaying grass...)"""
+        return label in self.ignore_labels
+
+    def get_stats(self):
+        """Get classifier counters"""
+        return {
+            "engine": self.engine,
+            "crops_classified": self.crops_classified,
+            "batches": self.batches,
+            "ms_per_crop": round(self.total_time * 1000 / self.crops_classified, 2) if self.crops_classified else 0.0
+        }
+
+def load_classifier(config, current=None):
+    """Get the configured classifier, None when it is off or its model cannot be loaded.
+
+    The current classifier is kept (not reloaded) while its settings are unchanged.
+    """
+    settings = load_classifier_settings(config)
+    if not settings["enabled"]:
+        return None
+    if current is not None and current.settings == settings:
+        return current
+
+    try:
+        return AnimalClassifier(settings)
+    except Exception as e:
+        print(f"Classifier initialization error: {e} - animals are not classified")
+        return None
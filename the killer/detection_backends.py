@@ -0,0 +1,238 @@
+import cv2
+import numpy as np
+
+from zones import build_zone_mask, has_zones, load_zones
+
+# From this many contour points in a mask (swaying grass, rain) measuring every contour in one NumPy
+# pass beats the per-contour loop; below it the NumPy call overhead costs more than it saves
+BULK_FILTER_MIN_POINTS = 4000
+
+def filter_contours_bulk(contours, min_area, min_size):
+    """Same filter as filter_animal_contours, with area, perimeter and bounding box of every
+    contour computed in one pass over all their points; only the contours left get a convex hull"""
+    counts = np.fromiter(map(len, contours), dtype=np.intp, count=len(contours))
+    starts = np.zeros(len(contours), dtype=np.intp)
+    np.cumsum(counts[:-1], out=starts[1:])
+    points = np.concatenate(contours).reshape(-1, 2).astype(np.float64)
+
+    # Each point's successor along its own (closed) contour
+    following = np.arange(1, len(points) + 1)
+    following[starts + counts - 1] = starts
+    x, y = points[:, 0], points[:, 1]
+    next_x, next_y = x[following], y[following]
+
+    # Shoelace area and closed arc length, like cv2.contourArea / cv2.arcLength
+    areas = np.abs(np.add.reduceat(x * next_y - next_x * y, starts)) * 0.5
+    perimeters = np.add.reduceat(np.hypot(next_x - x, next_y - y), starts)
+    sizes = np.maximum.reduceat(points, starts) - np.minimum.reduceat(points, starts) + 1
+    w, h = sizes[:, 0], sizes[:, 1]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        extent = areas / (w * h)
+        ratio = perimeters * perimeters / areas
+        candidates = np.flatnonzero((areas > min_area) & (w > min_size) & (h > min_size) &
+                                    (w > 0.2 * h) & (w < 4.0 * h) & (extent > 0.1) & (extent < 0.8) &
+                                    (ratio > 10) & (ratio < 50))
+
+    animal_contours = []
+    for i in candidates:
+        hull_area = cv2.contourArea(cv2.convexHull(contours[i]))
+        if hull_area > 0 and 0.2 < areas[i] / hull_area < 0.9:
+            animal_contours.append(contours[i])
+    return animal_contours
+
+def filter_animal_contours(contours, min_area, min_size):
+    """Keep the contours that are shaped like an animal.
+
+    The tests are ordered cheapest first: area, then the bounding box (size,
+    aspect ratio, extent), and only the contours left get a convex hull and a
+    perimeter. Same result as the full test on every contour. Masks full of
+    grass go through filter_contours_bulk instead.
+    """
+    if sum(map(len, contours)) >= BULK_FILTER_MIN_POINTS:
+        return filter_contours_bulk(contours, min_area, min_size)
+
+    animal_contours = []
+    for contour in contours:
+        area = cv2.contourArea(contour)
+        if area <= min_area:
+            continue
+
+        # Animals typically have different aspect ratios than humans (wider range for different animal shapes),
+        # a reasonable extent and a minimum size
+        x, y, w, h = cv2.boundingRect(contour)
+        if not (w > min_size and h > min_size and 0.2 < w / h < 4.0 and 0.1 < area / (w * h) < 0.8):
+            continue
+
+        # Animals tend to have more irregular shapes: not too irregular, not too regular
+        hull_area = cv2.contourArea(cv2.convexHull(contour))
+        if hull_area <= 0 or not 0.2 < area / hull_area < 0.9:
+            continue
+
+        # Additional check: contour perimeter vs area ratio
+        perimeter = cv2.arcLength(contour, True)
+        if perimeter > 0 and 10 < (perimeter * perimeter) / area < 50:
+            animal_contours.append(contour)
+
+    return animal_contours
+
+class DetectorWorkspace:
+    def __init__(self):
+        """Initialize the kernels and image buffers reused by every frame"""
+        self.kernel_small = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (3, 3))
+        self.kernel_large = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (5, 5))
+        self.buffers = {}
+
+    def get(self, name, shape, dtype=np.uint8):
+        """Get a named buffer of this shape, reallocated only when the resolution changes"""
+        buffer = self.buffers.get(name)
+        if buffer is None or buffer.shape != shape or buffer.dtype != dtype:
+            buffer = np.empty(shape, dtype=dtype)
+            self.buffers[name] = buffer
+        return buffer
+
+class DetectionBackend:
+    """Base class for the stage that finds candidate animals in a frame.
+
+    A backend gets every frame the motion gate lets through and returns
+    (has_animals, contours) with contours in full-frame coordinates; the
+    detector tracks, classifies and draws them.
+    """
+
+    name = None
+
+    def __init__(self, workspace=None):
+        self.workspace = workspace or DetectorWorkspace()
+        self.config = {}
+
+    def configure(self, config):
+        """Apply the detector configuration (called again on every reload)"""
+        self.config = config
+
+    def detect(self, frame):
+        """Find candidate animals in one frame, returns (has_animals, contours)"""
+        raise NotImplementedError
+
+    def is_warming_up(self):
+        """Check if the backend still has to see every frame before its results can be trusted"""
+        return False
+
+class MotionBackend(DetectionBackend):
+    """MOG2 background subtraction followed by the animal shape filter"""
+
+    name = "motion"
+
+    def __init__(self, workspace=None):
+        super().__init__(workspace)
+        self.background_subtractor = self.create_subtractor()
+        self.analysis_shape = None  # (height, width) the background model was built for
+        self.background_frames = 0  # Frames the current background model has learned from
+        self.zone_key = None  # (frame shape, zones) the cached zone mask was built for
+        self.zone_mask = None
+        self.zone_rect = None
+
+    def create_subtractor(self):
+        """Create a fresh background model"""
+        return cv2.createBackgroundSubtractorMOG2(history=500, varThreshold=50, detectShadows=True)
+
+    def is_warming_up(self):
+        """The background model adapts per frame seen until it has a full history"""
+        return self.background_frames < self.background_subtractor.getHistory()
+
+    def get_zone_mask(self, frame):
+        """Get (mask, (x, y, w, h)) of the active detection area for this frame size, None if zones are off"""
+        zones = load_zones(self.config)
+        if not has_zones(zones):
+            return None, None
+
+        key = (frame.shape[:2], repr(zones))
+        if key != self.zone_key:
+            height, width = frame.shape[:2]
+            self.zone_mask, self.zone_rect = build_zone_mask(zones, width, height)
+            self.zone_key = key
+        return self.zone_mask, self.zone_rect
+
+    def get_analysis_scale(self, frame):
+        """Get the factor that maps a full frame down to the analysis resolution"""
+        resolution = self.config.get("analysis_resolution")
+        if not resolution:
+            return 1.0
+
+        height, width = frame.shape[:2]
+        analysis_width, analysis_height = resolution
+        return min(1.0, analysis_width / width, analysis_height / height)
+
+    def detect(self, frame):
+        """Enhanced detection to filter out humans and focus on animals"""
+        # Work on a downscaled copy; thresholds are scaled to match
+        workspace = self.workspace
+        scale = self.get_analysis_scale(frame)
+        if scale < 1.0:
+            height, width = frame.shape[:2]
+            resized = workspace.get("resized", (round(height * scale), round(width * scale)) + frame.shape[2:])
+            frame = cv2.resize(frame, None, dst=resized, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+
+        # Only the bounding box of the detection zones is analysed
+        zone_mask, zone_rect = self.get_zone_mask(frame)
+        offset = (0, 0)
+        if zone_rect is not None:
+            x, y, w, h = zone_rect
+            if w == 0:
+                return False, []  # Every pixel is excluded
+            frame = frame[y:y + h, x:x + w]
+            offset = (x, y)
+
+        # The background model only works for one frame size
+        if self.analysis_shape != frame.shape[:2]:
+            if self.analysis_shape is not None:
+                self.background_subtractor = self.create_subtractor()
+            self.analysis_shape = frame.shape[:2]
+            self.background_frames = 0
+
+        shape = frame.shape[:2]
+
+        # Convert to grayscale for better processing
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=workspace.get("gray", shape))
+
+        # Apply Gaussian blur to reduce noise (15x15 at full resolution)
+        blur_size = max(3, int(15 * scale) | 1)
+        blurred = cv2.GaussianBlur(gray, (blur_size, blur_size), 0, dst=workspace.get("blurred", shape))
+
+        # Apply background subtraction
+        fg_mask = self.background_subtractor.apply(blurred, fgmask=workspace.get("foreground", shape))
+        self.background_frames += 1
+
+        # Enhanced morphological operations (kept at pixel scale - downscaling already removes fine noise)
+        # Remove noise
+        opened = cv2.morphologyEx(fg_mask, cv2.MORPH_OPEN, workspace.kernel_small, dst=workspace.get("opened", shape))
+        # Fill gaps
+        fg_mask = cv2.morphologyEx(opened, cv2.MORPH_CLOSE, workspace.kernel_large, dst=fg_mask)
+
+        # Drop motion in excluded areas (and outside odd-shaped include zones)
+        if zone_mask is not None:
+            cv2.bitwise_and(fg_mask, zone_mask, dst=fg_mask)
+
+        # Find contours (in analysis frame coordinates)
+        contours, _ = cv2.findContours(fg_mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE, offset=offset)
+
+        # Enhanced filtering for animal detection
+        min_area = self.config.get("min_area", 1000) * scale * scale
+        min_size = 20 * scale
+        animal_contours = filter_animal_contours(contours, min_area, min_size)
+
+        # Map contours back to full-resolution coordinates for drawing
+        if scale < 1.0:
+            animal_contours = [np.round(contour / scale).astype(np.int32) for contour in animal_contours]
+
+        return len(animal_contours) > 0, animal_contours
+
+DETECTION_BACKENDS = {
+    MotionBackend.name: MotionBackend
+}
+
+def create_detection_backend(name=None, workspace=None):
+    """Create a detection backend by name ("motion" when not set)"""
+    name = name or MotionBackend.name
+    if name not in DETECTION_BACKENDS:
+        raise ValueError(f"Unknown detection backend: {name}")
+    return DETECTION_BACKENDS[name](workspace)
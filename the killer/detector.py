@@ -4,21 +4,31 @@ import json
 import time
 from datetime import datetime
 import os
-import random
+
+from classifier import load_classifier
+from detection_backends import DetectorWorkspace, create_detection_backend
+from frame_grabber import FrameGrabber
+from frame_sources import create_frame_source
+from motion_gate import MotionGate
+from tracker import ObjectTracker
 
 class AnimalDetector:
-    def __init__(self, config_file="config.json"):
+    def __init__(self, config_file="config.json", camera_id=None):
         """Initialize the animal detection system"""
+        self.camera_id = camera_id
+        self.motion_gate = MotionGate()  # Skips the full pipeline while the scene is static
+        self.workspace = DetectorWorkspace()  # Output buffers are reused, so steady state allocates almost nothing
+        self.backend = None  # Finds candidate animals (MOG2 motion by default)
+        self.classifier = None  # Optional model that names the candidates, or rejects them
         self.load_config(config_file)
-        self.background_subtractor = cv2.createBackgroundSubtractorMOG2(
-            history=500, varThreshold=50, detectShadows=True
-        )
         self.camera = None
+        self.frame_grabber = None
         self.detection_count = 0
         self.last_detection_time = 0
         self.is_detecting = False
-        self.detected_animals = {}  # Store detected animals with their positions
-        self.animal_names = ["ගවයා", "බැටළුවා", "කුකුලා", "හරකා", "අශ්වයා", "පූසා", "බල්ලා", "වල් සතා"]
+        self.tracker = ObjectTracker()  # Gives each animal a stable id across frames
+        self.default_name = "සතා"  # Shown until (or unless) the classifier names the animal
+        self.track_names = [None] * self.tracker.max_tracks  # (track id, name, confidence) per tracker slot
         
     def load_config(self, config_file):
         """Load configuration from JSON file"""
@@ -31,163 +41,138 @@ class AnimalDetector:
                 "min_area": 1000,
                 "detection_frames": 5,
                 "camera_index": 0,
-                "detection_enabled": True
+                "detection_enabled": True,
+                "threaded_capture": True,
+                "frame_buffer_size": 3
             }
+        
+        # Per-camera settings from the camera registry override the global ones
+        if self.camera_id is not None:
+            for camera in self.config.get("cameras", []):
+                if str(camera.get("id")) == str(self.camera_id):
+                    self.config = {**self.config, **camera}
+                    break
+        
+        self.motion_gate.configure(self.config.get("motion_gate"))
+        
+        # Switching backends starts a new model; a reload with the same one keeps what it learned
+        backend_name = self.config.get("detection_backend")
+        if self.backend is None or (backend_name or "motion") != self.backend.name:
+            self.backend = create_detection_backend(backend_name, self.workspace)
+        self.backend.configure(self.config)
+        self.classifier = load_classifier(self.config, self.classifier)
     
     def initialize_camera(self):
-        """Initialize camera connection"""
+        """Initialize camera connection (or the configured replay source)"""
         try:
-            # Try different camera backends
-            backends = [cv2.CAP_DSHOW, cv2.CAP_MSMF, cv2.CAP_ANY]
-            for backend in backends:
-                try:
-                    self.camera = cv2.VideoCapture(self.config.get("camera_index", 0), backend)
-                    if self.camera.isOpened():
-                        break
-                except:
-                    continue
-            
-            if not self.camera or not self.camera.isOpened():
-                print("No camera found, using default")
-                self.camera = cv2.VideoCapture(self.config.get("camera_index", 0))
-            
-            if not self.camera.isOpened():
+            self.camera = create_frame_source(self.config)
+            if not self.camera.open():
                 return False
-                
-            # Set camera properties for better performance and quality
-            self.camera.set(cv2.CAP_PROP_FRAME_WIDTH, 1280)
-            self.camera.set(cv2.CAP_PROP_FRAME_HEIGHT, 720)
-            self.camera.set(cv2.CAP_PROP_FPS, 30)
-            self.camera.set(cv2.CAP_PROP_BRIGHTNESS, 0.5)
-            self.camera.set(cv2.CAP_PROP_CONTRAST, 0.5)
-            self.camera.set(cv2.CAP_PROP_BUFFERSIZE, 1)  # Reduce buffer size
+            
+            # Capture live/paced sources on a dedicated thread so detection always gets the newest frame.
+            # Sources replayed as fast as possible are read inline so no frame is dropped.
+            if self.config.get("threaded_capture", True) and (self.camera.is_live or self.camera.realtime):
+                self.frame_grabber = FrameGrabber(self.camera, self.config.get("frame_buffer_size", 3))
+                self.frame_grabber.start()
             return True
         except Exception as e:
             print(f"Camera initialization error: {e}")
             return False
     
     def is_animal_motion(self, frame):
-        """Enhanced detection to filter out humans and focus on animals"""
-        # Convert to grayscale for better processing
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        
-        # Apply Gaussian blur to reduce noise
-        blurred = cv2.GaussianBlur(gray, (15, 15), 0)
-        
-        # Apply background subtraction
-        fg_mask = self.background_subtractor.apply(blurred)
-        
-        # Enhanced morphological operations
-        kernel_small = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (3, 3))
-        kernel_large = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (5, 5))
-        
-        # Remove noise
-        fg_mask = cv2.morphologyEx(fg_mask, cv2.MORPH_OPEN, kernel_small)
-        # Fill gaps
-        fg_mask = cv2.morphologyEx(fg_mask, cv2.MORPH_CLOSE, kernel_large)
-        
-        # Find contours
-        contours, _ = cv2.findContours(fg_mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-        
-        # Enhanced filtering for animal detection
-        animal_contours = []
-        min_area = self.config.get("min_area", 1000)
-        
-        for contour in contours:
-            area = cv2.contourArea(contour)
-            if area > min_area:
-                # Get bounding rectangle
-                x, y, w, h = cv2.boundingRect(contour)
-                aspect_ratio = w / h if h > 0 else 0
-                
-                # Animals typically have different aspect ratios than humans
-                if 0.2 < aspect_ratio < 4.0:  # Wider range for different animal shapes
-                    # Calculate contour properties
-                    hull = cv2.convexHull(contour)
-                    hull_area = cv2.contourArea(hull)
-                    
-                    if hull_area > 0:
-                        solidity = area / hull_area
-                        extent = area / (w * h) if w * h > 0 else 0
-                        
-                        # Animals tend to have more irregular shapes and different movement patterns
-                        if (0.2 < solidity < 0.9 and  # Not too irregular, not too regular
-                            0.1 < extent < 0.8 and    # Reasonable extent
-                            w > 20 and h > 20):       # Minimum size
-                            
-                            # Additional check: contour perimeter vs area ratio
-                            perimeter = cv2.arcLength(contour, True)
-                            if perimeter > 0:
-                                perimeter_area_ratio = (perimeter * perimeter) / area
-                                if 10 < perimeter_area_ratio < 50:  # Reasonable ratio for animals
-                                    animal_contours.append(contour)
-        
-        return len(animal_contours) > 0, animal_contours
+        """Find candidate animals with the detection backend, returns (has_animals, contours)"""
+        return self.backend.detect(frame)
     
     def detect_animals(self):
         """Main detection loop"""
         if not self.camera or not self.camera.isOpened():
             return False, None, "කැමරාව සම්බන්ධ කර නොමැත"
         
-        ret, frame = self.camera.read()
-        if not ret:
-            return False, None, "කැමරාවෙන් රූපය ලබා ගැනීමට නොහැකි විය"
+        if self.frame_grabber:
+            latest = self.frame_grabber.read_latest(timeout=1.0)
+            if latest is None:
+                return False, None, "කැමරාවෙන් රූපය ලබා ගැනීමට නොහැකි විය"
+            _, _, frame = latest
+        else:
+            ret, frame = self.camera.read()
+            if not ret:
+                return False, None, "කැමරාවෙන් රූපය ලබා ගැනීමට නොහැකි විය"
         
+        return self.process_frame(frame)
+    
+    def process_frame(self, frame, timestamp=None, annotate=True):
+        """Run detection on one frame (timestamp defaults to now; replays pass the video time).
+
+        The captured frame is never drawn on: annotations go to an overlay
+        buffer that the next call reuses, so use (or copy) the returned frame
+        before processing another one.
+        """
         if not self.config.get("detection_enabled", True):
             return True, frame, "අක්‍රීයයි"
         
-        # Detect animal motion
-        has_animals, contours = self.is_animal_motion(frame)
+        current_time = timestamp if timestamp is not None else time.time()
+        
+        # Detect animal motion - a static scene skips the pipeline, except during a detection run and while
+        # the backend is still warming up (the background model adapts per frame until it has a full history)
+        warming_up = self.backend.is_warming_up()
+        if self.motion_gate.check(frame, current_time, force=self.detection_count > 0 or warming_up):
+            has_animals, contours = self.is_animal_motion(frame)
+        else:
+            has_animals, contours = False, []
+        
+        boxes = [cv2.boundingRect(contour) for contour in contours]
+        labels = [(None, 0.0)] * len(boxes)
+        if has_animals and self.classifier is not None:
+            # The model only sees the candidate regions; people and moving grass are dropped here
+            labels = self.classifier.classify(frame, boxes)
+            keep = [i for i, (label, _) in enumerate(labels) if not self.classifier.is_ignored(label)]
+            boxes = [boxes[i] for i in keep]
+            labels = [labels[i] for i in keep]
+            has_animals = len(boxes) > 0
         
         if has_animals:
+            if self.detection_count == 0:
+                # A new run of detections - count the animals of this intrusion from here
+                self.tracker.reset_count()
             self.detection_count += 1
-            self.last_detection_time = time.time()
+            self.last_detection_time = current_time
+            
+            slots = self.tracker.update(boxes, current_time)
+            
+            if annotate:
+                overlay = self.workspace.get("overlay", frame.shape)
+                np.copyto(overlay, frame)
+                frame = overlay
             
             # Draw bounding boxes around detected animals with names
-            current_time = time.time()
-            for i, contour in enumerate(contours):
-                x, y, w, h = cv2.boundingRect(contour)
-                
-                # Generate or assign animal name
-                animal_id = f"{x}_{y}_{w}_{h}"
-                if animal_id not in self.detected_animals:
-                    self.detected_animals[animal_id] = {
-                        'name': random.choice(self.animal_names),
-                        'first_seen': current_time,
-                        'position': (x, y, w, h)
-                    }
-                
-                animal_info = self.detected_animals[animal_id]
-                animal_name = animal_info['name']
-                
-                # Draw bounding box
-                cv2.rectangle(frame, (x, y), (x + w, y + h), (0, 0, 255), 3)
-                
-                # Draw animal name above the head (top of bounding box)
-                text_size = cv2.getTextSize(animal_name, cv2.FONT_HERSHEY_SIMPLEX, 0.8, 2)[0]
-                text_x = x + (w - text_size[0]) // 2
-                text_y = y - 15
-                
-                # Draw background rectangle for text
-                cv2.rectangle(frame, (text_x - 5, text_y - text_size[1] - 5), 
-                             (text_x + text_size[0] + 5, text_y + 5), (0, 0, 0), -1)
+            for (x, y, w, h), slot, (label, confidence) in zip(boxes, slots, labels):
+                if slot < 0:
+                    continue  # More animals than tracker slots
                 
-                # Draw animal name
-                cv2.putText(frame, animal_name, (text_x, text_y), 
-                           cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 255), 2)
+                # A name sticks to the track, not to the exact box; a more confident label replaces it
+                track_id = int(self.tracker.ids[slot])
+                if self.track_names[slot] is None or self.track_names[slot][0] != track_id:
+                    self.track_names[slot] = (track_id, self.default_name, 0.0)
+                if label is not None and confidence > self.track_names[slot][2]:
+                    self.track_names[slot] = (track_id, label, confidence)
+                animal_name = self.track_names[slot][1]
                 
-                # Update position
-                self.detected_animals[animal_id]['position'] = (x, y, w, h)
-            
-            # Clean up old animal detections (remove animals not seen for 5 seconds)
-            current_time = time.time()
-            animals_to_remove = []
-            for animal_id, animal_info in self.detected_animals.items():
-                if current_time - animal_info['first_seen'] > 5.0:
-                    animals_to_remove.append(animal_id)
-            
-            for animal_id in animals_to_remove:
-                del self.detected_animals[animal_id]
+                if annotate:
+                    # Draw bounding box
+                    cv2.rectangle(frame, (x, y), (x + w, y + h), (0, 0, 255), 3)
+                    
+                    # Draw animal name above the head (top of bounding box)
+                    text_size = cv2.getTextSize(animal_name, cv2.FONT_HERSHEY_SIMPLEX, 0.8, 2)[0]
+                    text_x = x + (w - text_size[0]) // 2
+                    text_y = y - 15
+                    
+                    # Draw background rectangle for text
+                    cv2.rectangle(frame, (text_x - 5, text_y - text_size[1] - 5), 
+                                 (text_x + text_size[0] + 5, text_y + 5), (0, 0, 0), -1)
+                    
+                    # Draw animal name
+                    cv2.putText(frame, animal_name, (text_x, text_y), 
+                               cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 255), 2)
             
             # Check if we have enough consecutive detections
             if self.detection_count >= self.config.get("detection_frames", 5):
@@ -200,7 +185,7 @@ class AnimalDetector:
             # Reset detection count if no animals detected
             if self.detection_count > 0:
                 # Check if enough time has passed without detection
-                if time.time() - self.last_detection_time > 2.0:  # 2 seconds
+                if current_time - self.last_detection_time > 2.0:  # 2 seconds
                     if self.is_detecting:
                         self.is_detecting = False
                         self.detection_count = 0
@@ -213,6 +198,10 @@ class AnimalDetector:
             else:
                 return True, frame, "සුරක්ෂිතයි"
     
+    def get_animal_count(self):
+        """Get the number of distinct animals tracked since the current (or last) intrusion began"""
+        return self.tracker.distinct_count
+    
     def get_status(self):
         """Get current system status"""
         if not self.camera or not self.camera.isOpened():
@@ -223,11 +212,42 @@ class AnimalDetector:
         else:
             return "සුරක්ෂිතයි", "සියල්ල සාමාන්‍යයි"
     
+    def is_motion_seen(self):
+        """Check if the last frame showed motion (a detection run, or a change the motion gate noticed)"""
+        return self.detection_count > 0 or self.motion_gate.motion_seen
+    
+    def get_gate_stats(self):
+        """Get motion gate counters"""
+        return self.motion_gate.get_stats()
+    
+    def get_classifier_stats(self):
+        """Get classifier counters (empty when no classifier is loaded)"""
+        return self.classifier.get_stats() if self.classifier else {}
+    
+    def get_frame_stats(self):
+        """Get capture/processing counters from the frame grabber"""
+        if self.frame_grabber:
+            return self.frame_grabber.get_stats()
+        return {
+            "frames_captured": 0,
+            "frames_processed": 0,
+            "frames_dropped": 0,
+            "read_failures": 0,
+            "buffered_frames": 0,
+            "frame_age": None
+        }
+    
     def release_camera(self):
         """Release camera resources"""
+        if self.frame_grabber:
+            self.frame_grabber.stop()
+            self.frame_grabber = None
         if self.camera:
             self.camera.release()
-            cv2.destroyAllWindows()
+            try:
+                cv2.destroyAllWindows()
+            except cv2.error:
+                pass  # Headless OpenCV builds (camera worker processes) have no windows
     
     def __del__(self):
         """Cleanup on destruction"""
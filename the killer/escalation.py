@@ -0,0 +1,88 @@
+import threading
+
+from timer_wheel import TimerWheel
+
+# Used when config.json has no "escalation_plan" - the old behaviour, siren right away
+DEFAULT_ESCALATION_PLAN = [{"after": 0, "action": "siren"}]
+
+ESCALATION_ACTIONS = ("chime", "siren", "pulse", "sms")
+
+def load_escalation_plan(config):
+    """Get the escalation stages from config, sorted by time"""
+    plan = []
+    for stage in config.get("escalation_plan") or DEFAULT_ESCALATION_PLAN:
+        action = stage.get("action")
+        if action not in ESCALATION_ACTIONS:
+            print(f"Unknown escalation action ignored: {action}")
+            continue
+        plan.append({"after": max(0.0, float(stage.get("after", 0))), "action": action})
+    return sorted(plan, key=lambda stage: stage["after"])
+
+class EscalationScheduler:
+    def __init__(self, plan, on_stage, wheel=None):
+        """Initialize per-intrusion escalation; on_stage(key, stage) runs when an intrusion reaches a stage"""
+        self.plan = plan
+        self.on_stage = on_stage
+        self.wheel = wheel or TimerWheel()
+        self.lock = threading.Lock()
+        self.pending = {}  # key -> timer ids of the stages not reached yet
+        self.reached = {}  # key -> last stage reached
+
+    def start(self):
+        """Start the timer wheel"""
+        self.wheel.start()
+
+    def stop(self):
+        """Cancel every escalation and stop the timer wheel"""
+        self.cancel_all()
+        self.wheel.stop()
+
+    def begin(self, key):
+        """Start escalating an intrusion (e.g. a camera id); stages at 0s run right away"""
+        self.end(key)
+        immediate = []
+        with self.lock:
+            self.pending[key] = []
+            for stage in self.plan:
+                if stage["after"] <= 0:
+                    immediate.append(stage)
+                else:
+                    self.pending[key].append(self.wheel.schedule(stage["after"], lambda stage=stage: self._fire(key, stage)))
+
+        for stage in immediate:
+            self._fire(key, stage)
+
+    def end(self, key):
+        """Stop escalating an intrusion, dropping the stages it has not reached"""
+        with self.lock:
+            timer_ids = self.pending.pop(key, [])
+            self.reached.pop(key, None)
+        for timer_id in timer_ids:
+            self.wheel.cancel(timer_id)
+
+    def cancel_all(self):
+        """Drop every pending stage (used when the alarm is silenced by hand)"""
+        with self.lock:
+            keys = list(self.pending)
+        for key in keys:
+            self.end(key)
+
+    def _fire(self, key, stage):
+        """Internal method that records and runs a reached stage"""
+        with self.lock:
+            if key not in self.pending:
+                return  # Ended while the timer was firing
+            self.reached[key] = stage
+        try:
+            self.on_stage(key, stage)
+        except Exception as e:
+            print(f"Escalation error ({stage['action']}): {e}")
+
+    def get_status(self):
+        """Get the stage each active intrusion has reached"""
+        with self.lock:
+            return {
+                "active": {key: (stage["action"] if stage else None)
+                           for key, stage in ((key, self.reached.get(key)) for key in self.pending)},
+                "pending_stages": self.wheel.get_pending_count()
+            }
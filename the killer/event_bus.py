@@ -0,0 +1,74 @@
+import json
+import queue
+import threading
+import time
+
+def format_sse(event_type, data):
+    """Format one Server-Sent Events message"""
+    return f"event: {event_type}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+class EventBus:
+    def __init__(self, max_queue_size=100):
+        """Initialize in-process publish/subscribe bus for push updates"""
+        self.subscribers = []
+        self.lock = threading.Lock()
+        self.max_queue_size = max_queue_size
+        self.messages_published = 0
+        self.messages_dropped = 0
+
+    def subscribe(self):
+        """Register a subscriber and return its message queue"""
+        subscription = queue.Queue(maxsize=self.max_queue_size)
+        with self.lock:
+            self.subscribers.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        """Remove a subscriber"""
+        with self.lock:
+            if subscription in self.subscribers:
+                self.subscribers.remove(subscription)
+
+    def publish(self, event_type, data):
+        """Send a message to every subscriber without ever blocking the publisher"""
+        message = (event_type, data)
+        with self.lock:
+            subscribers = list(self.subscribers)
+            self.messages_published += 1
+
+        for subscription in subscribers:
+            try:
+                subscription.put_nowait(message)
+            except queue.Full:
+                # A stalled client loses its oldest message, never the newest
+                try:
+                    subscription.get_nowait()
+                    self.messages_dropped += 1
+                except queue.Empty:
+                    pass
+                try:
+                    subscription.put_nowait(message)
+                except queue.Full:
+                    self.messages_dropped += 1
+
+    def stream(self, initial_messages=(), heartbeat_interval=15.0):
+        """Yield SSE text for one client, with a heartbeat while idle"""
+        subscription = self.subscribe()
+        try:
+            for event_type, data in initial_messages:
+                yield format_sse(event_type, data)
+
+            while True:
+                try:
+                    event_type, data = subscription.get(timeout=heartbeat_interval)
+                except queue.Empty:
+                    yield format_sse("heartbeat", {"time": time.time()})
+                    continue
+                yield format_sse(event_type, data)
+        finally:
+            self.unsubscribe(subscription)
+
+    def get_subscriber_count(self):
+        """Get the number of connected clients"""
+        with self.lock:
+            return len(self.subscribers)
@@ -0,0 +1,91 @@
+import threading
+from datetime import datetime, timedelta
+
+def empty_counts():
+    """Counters kept for each day and each hour"""
+    return {"ENTER": 0, "EXIT": 0, "intrusion_seconds": 0.0}
+
+class StatisticsAggregator:
+    def __init__(self):
+        """Initialize in-memory event statistics, updated per event instead of rescanning history"""
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Clear all counters"""
+        with self.lock:
+            self.totals = empty_counts()
+            self.daily = {}  # "YYYY-MM-DD" -> counts
+            self.hourly = {}  # "YYYY-MM-DD HH" -> counts
+            self.hour_of_day = [0] * 24  # ENTER events per hour of the day, all days together
+            self.last_detection = None
+
+    def rebuild(self, event_store):
+        """Recount everything from the event store (used once at startup)"""
+        self.reset()
+        count = 0
+        for event in event_store.iter_events():
+            self.record_event(event["event"], event["timestamp"], event.get("duration"))
+            count += 1
+        print(f"Statistics rebuilt from {count} events")
+        return count
+
+    def record_event(self, event_type, timestamp, duration=None):
+        """Add one ENTER/EXIT event ("YYYY-MM-DD HH:MM:SS" timestamp) to every counter"""
+        if event_type not in ("ENTER", "EXIT"):
+            return
+
+        day, hour = timestamp[:10], timestamp[:13]
+        with self.lock:
+            for counts in (self.totals, self.daily.setdefault(day, empty_counts()),
+                           self.hourly.setdefault(hour, empty_counts())):
+                counts[event_type] += 1
+                if event_type == "EXIT" and duration:
+                    counts["intrusion_seconds"] += duration
+
+            if event_type == "ENTER":
+                self.hour_of_day[int(timestamp[11:13])] += 1
+                if self.last_detection is None or timestamp >= self.last_detection:
+                    self.last_detection = timestamp
+
+    def get_summary(self, today=None):
+        """Get the dashboard numbers"""
+        today = today or datetime.now().strftime("%Y-%m-%d")
+        with self.lock:
+            today_counts = self.daily.get(today, empty_counts())
+            return {
+                "total_events": self.totals["ENTER"] + self.totals["EXIT"],
+                "today_events": today_counts["ENTER"] + today_counts["EXIT"],
+                "animals_detected": self.totals["ENTER"],
+                "exit_events": self.totals["EXIT"],
+                "today_enter_events": today_counts["ENTER"],
+                "today_exit_events": today_counts["EXIT"],
+                "total_intrusion_seconds": round(self.totals["intrusion_seconds"], 1),
+                "last_detection": self.last_detection
+            }
+
+    def get_daily_rollup(self, days=30, end_date=None):
+        """Get per-day counts for the last `days` days, oldest first (missing days are zero)"""
+        end = datetime.strptime(end_date, "%Y-%m-%d") if end_date else datetime.now()
+        rollup = []
+        with self.lock:
+            for offset in range(days - 1, -1, -1):
+                day = (end - timedelta(days=offset)).strftime("%Y-%m-%d")
+                counts = self.daily.get(day, empty_counts())
+                rollup.append(dict(counts, date=day, intrusion_seconds=round(counts["intrusion_seconds"], 1)))
+        return rollup
+
+    def get_hourly_rollup(self, date=None):
+        """Get the 24 hourly counts of one day"""
+        date = date or datetime.now().strftime("%Y-%m-%d")
+        rollup = []
+        with self.lock:
+            for hour in range(24):
+                counts = self.hourly.get(f"{date} {hour:02d}", empty_counts())
+                rollup.append(dict(counts, hour=hour, intrusion_seconds=round(counts["intrusion_seconds"], 1)))
+        return rollup
+
+    def get_hour_of_day_histogram(self):
+        """Get ENTER events per hour of the day over the whole history"""
+        with self.lock:
+            return list(self.hour_of_day)
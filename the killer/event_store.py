@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Event store
+Append-only SQLite (WAL) store for ENTER/EXIT events, indexed on timestamp
+and event type. Replaces the full-scan events/events.csv; the CSV is
+imported once on first open and can be exported again for compatibility.
+
+Usage:
+    python event_store.py export events_export.csv
+    python event_store.py import old_events.csv
+"""
+
+import base64
+import csv
+import json
+import os
+import re
+import sqlite3
+import sys
+import threading
+from datetime import datetime
+
+CSV_FIELDS = ["timestamp", "event", "description_sinhala", "description_english"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp TEXT NOT NULL,
+    event TEXT NOT NULL,
+    description_sinhala TEXT,
+    description_english TEXT,
+    camera_id TEXT,
+    duration REAL,
+    animal_count INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_events_timestamp ON events (timestamp);
+CREATE INDEX IF NOT EXISTS idx_events_event_timestamp ON events (event, timestamp);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+INSERT_SQL = ("INSERT INTO events (timestamp, event, description_sinhala, description_english, camera_id, duration, "
+              "animal_count) VALUES (?, ?, ?, ?, ?, ?, ?)")
+
+# Legacy rows only have the intrusion duration inside the EXIT description
+DURATION_PATTERN = re.compile(r"Duration: (\d+(?:\.\d+)?)s")
+
+def parse_duration(english_desc):
+    """Get the intrusion duration from a legacy EXIT description (None if absent)"""
+    match = DURATION_PATTERN.search(english_desc or "")
+    return float(match.group(1)) if match else None
+
+def read_csv_rows(csv_path):
+    """Read legacy CSV rows as insert tuples"""
+    with open(csv_path, 'r', encoding='utf-8', newline='') as f:
+        return [(row.get("timestamp"), row.get("event"), row.get("description_sinhala"),
+                 row.get("description_english"), row.get("camera_id"), parse_duration(row.get("description_english")),
+                 None)
+                for row in csv.DictReader(f) if row.get("timestamp") and row.get("event")]
+
+def encode_cursor(event):
+    """Make an opaque page cursor pointing just past this event"""
+    position = json.dumps([event["timestamp"], event["id"]]).encode('utf-8')
+    return base64.urlsafe_b64encode(position).decode('ascii')
+
+def decode_cursor(cursor):
+    """Turn a page cursor back into (timestamp, id), ValueError if it is not one of ours"""
+    try:
+        timestamp, event_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        return str(timestamp), int(event_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+class EventStore:
+    def __init__(self, db_path="events/events.db", legacy_csv="events/events.csv"):
+        """Open (and create/migrate if needed) the event database"""
+        self.db_path = db_path
+        self.lock = threading.Lock()
+
+        db_dir = os.path.dirname(db_path)
+        if db_dir and not os.path.exists(db_dir):
+            os.makedirs(db_dir)
+
+        # One connection per store, shared by threads under self.lock; other
+        # processes (camera workers) open their own and WAL lets them coexist
+        self.connection = sqlite3.connect(db_path, timeout=10.0, check_same_thread=False, isolation_level=None)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+        self.upgrade_schema()
+
+        if legacy_csv:
+            self.migrate_csv(legacy_csv)
+
+    def upgrade_schema(self):
+        """Add columns introduced after a database was created"""
+        with self.lock:
+            self.connection.execute("BEGIN IMMEDIATE")
+            try:
+                columns = [row["name"] for row in self.connection.execute("PRAGMA table_info(events)")]
+                if "duration" not in columns:
+                    self.connection.execute("ALTER TABLE events ADD COLUMN duration REAL")
+                    exits = self.connection.execute(
+                        "SELECT id, description_english FROM events WHERE event = 'EXIT'").fetchall()
+                    self.connection.executemany("UPDATE events SET duration = ? WHERE id = ?",
+                                                [(parse_duration(row[1]), row[0]) for row in exits])
+                if "animal_count" not in columns:
+                    # Unknown for events logged before animals were tracked
+                    self.connection.execute("ALTER TABLE events ADD COLUMN animal_count INTEGER")
+                self.connection.execute("COMMIT")
+            except Exception:
+                self.connection.execute("ROLLBACK")
+                raise
+
+    def migrate_csv(self, csv_path):
+        """Import the legacy events CSV once (safe when several processes start together)"""
+        if not os.path.exists(csv_path):
+            return 0
+
+        with self.lock:
+            # IMMEDIATE takes the write lock first, so only one process can import
+            self.connection.execute("BEGIN IMMEDIATE")
+            try:
+                if self.connection.execute("SELECT 1 FROM meta WHERE key = 'csv_imported'").fetchone():
+                    self.connection.execute("COMMIT")
+                    return 0
+                rows = read_csv_rows(csv_path)
+                self.connection.executemany(INSERT_SQL, rows)
+                self.connection.execute("INSERT INTO meta (key, value) VALUES ('csv_imported', ?)",
+                                        (f"{csv_path} ({len(rows)} rows)",))
+                self.connection.execute("COMMIT")
+            except Exception:
+                self.connection.execute("ROLLBACK")
+                raise
+
+        print(f"Imported {len(rows)} events from {csv_path}")
+        return len(rows)
+
+    def import_csv(self, csv_path):
+        """Import events from a CSV file with the legacy columns"""
+        return self.append_many(read_csv_rows(csv_path))
+
+    def append(self, event_type, sinhala_desc, english_desc, timestamp=None, camera_id=None, duration=None,
+               animal_count=None):
+        """Append one event, returns its id"""
+        timestamp = timestamp or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        with self.lock:
+            cursor = self.connection.execute(
+                INSERT_SQL, (timestamp, event_type, sinhala_desc, english_desc, camera_id, duration, animal_count))
+            return cursor.lastrowid
+
+    def append_many(self, rows):
+        """Append (timestamp, event, sinhala, english, camera_id, duration, animal_count) rows in one transaction"""
+        rows = list(rows)
+        if not rows:
+            return 0
+        with self.lock:
+            self.connection.execute("BEGIN")
+            try:
+                self.connection.executemany(INSERT_SQL, rows)
+                self.connection.execute("COMMIT")
+            except Exception:
+                self.connection.execute("ROLLBACK")
+                raise
+        return len(rows)
+
+    def _where(self, since=None, until=None, event=None, after=None, newest_first=False):
+        """Build the WHERE clause for the indexed filters (after = (timestamp, id) keyset position)"""
+        clauses = []
+        params = []
+        if after:
+            clauses.append("(timestamp, id) < (?, ?)" if newest_first else "(timestamp, id) > (?, ?)")
+            params.extend(after)
+        if since:
+            clauses.append("timestamp >= ?")
+            params.append(since)
+        if until:
+            clauses.append("timestamp < ?")
+            params.append(until)
+        if event:
+            clauses.append("event = ?")
+            params.append(event)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def query(self, since=None, until=None, event=None, limit=None, newest_first=False, after=None):
+        """Get events as dicts, filtered on the timestamp/event indexes"""
+        where, params = self._where(since, until, event, after, newest_first)
+        order = "DESC" if newest_first else "ASC"
+        sql = f"SELECT * FROM events{where} ORDER BY timestamp {order}, id {order}"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+
+        with self.lock:
+            return [dict(row) for row in self.connection.execute(sql, params).fetchall()]
+
+    def iter_events(self, since=None, until=None, event=None, limit=None, newest_first=False, after=None,
+                    batch_size=500):
+        """Yield matching events one batch query at a time, so memory stays flat for any history size"""
+        remaining = limit
+        while remaining is None or remaining > 0:
+            size = batch_size if remaining is None else min(batch_size, remaining)
+            events = self.query(since, until, event, size, newest_first, after)
+            yield from events
+
+            if len(events) < size:
+                return
+            if remaining is not None:
+                remaining -= len(events)
+            after = (events[-1]["timestamp"], events[-1]["id"])
+
+    def count(self, since=None, until=None, event=None):
+        """Count events matching the filters"""
+        where, params = self._where(since, until, event)
+        with self.lock:
+            return self.connection.execute(f"SELECT COUNT(*) FROM events{where}", params).fetchone()[0]
+
+    def last_event(self, event=None):
+        """Get the most recent event (optionally of one type)"""
+        events = self.query(event=event, limit=1, newest_first=True)
+        return events[0] if events else None
+
+    def export_csv(self, output):
+        """Export all events to CSV with the legacy columns (path or open text file)"""
+        with self.lock:
+            rows = self.connection.execute(
+                "SELECT timestamp, event, description_sinhala, description_english FROM events ORDER BY timestamp, id"
+            ).fetchall()
+
+        if hasattr(output, 'write'):
+            self._write_csv(output, rows)
+        else:
+            with open(output, 'w', newline='', encoding='utf-8') as f:
+                self._write_csv(f, rows)
+        return len(rows)
+
+    def _write_csv(self, f, rows):
+        """Write rows under the legacy CSV header"""
+        writer = csv.writer(f)
+        writer.writerow(CSV_FIELDS)
+        writer.writerows(tuple(row) for row in rows)
+
+    def close(self):
+        """Close the database connection"""
+        with self.lock:
+            self.connection.close()
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3 or sys.argv[1] not in ("export", "import"):
+        print(__doc__)
+        sys.exit(1)
+
+    store = EventStore()
+    if sys.argv[1] == "export":
+        print(f"✅ Exported {store.export_csv(sys.argv[2])} events to {sys.argv[2]}")
+    else:
+        print(f"✅ Imported {store.import_csv(sys.argv[2])} events from {sys.argv[2]}")
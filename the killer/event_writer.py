@@ -0,0 +1,155 @@
+import queue
+import threading
+import time
+
+# Queue markers, never written to the store
+_FLUSH = object()
+_STOP = object()
+
+class EventWriter:
+    def __init__(self, event_store, max_queue_size=1000, batch_size=50, flush_interval=1.0):
+        """Initialize background writer that batches event appends off the detection loop"""
+        self.event_store = event_store
+        self.queue = queue.Queue(maxsize=max(1, int(max_queue_size)))
+        self.batch_size = max(1, int(batch_size))
+        self.flush_interval = flush_interval
+        self.condition = threading.Condition()
+        self.writer_thread = None
+        self.pending = 0  # Events accepted but not written yet
+
+        # Counters exposed through get_stats()
+        self.events_written = 0
+        self.batches_written = 0
+        self.overflow_writes = 0
+        self.failed_events = 0
+        self.flush_count = 0
+        self.last_flush_latency = 0.0
+        self.max_flush_latency = 0.0
+        self.total_flush_latency = 0.0
+
+    def start(self):
+        """Start writing in a background thread"""
+        if self.writer_thread and self.writer_thread.is_alive():
+            return
+
+        self.writer_thread = threading.Thread(target=self._writer_loop, daemon=True)
+        self.writer_thread.start()
+
+    def stop(self, timeout=5.0):
+        """Write everything still queued, then stop the writer thread"""
+        if self.writer_thread and self.writer_thread.is_alive():
+            self.queue.put(_STOP)
+            self.writer_thread.join(timeout=timeout)
+        self.writer_thread = None
+
+    def is_running(self):
+        """Check if the writer thread is alive"""
+        return self.writer_thread is not None and self.writer_thread.is_alive()
+
+    def write(self, event_type, sinhala_desc, english_desc, timestamp, camera_id=None, duration=None,
+              animal_count=None):
+        """Queue one event without waiting for the disk"""
+        row = (timestamp, event_type, sinhala_desc, english_desc, camera_id, duration, animal_count)
+        with self.condition:
+            self.pending += 1
+
+        if not self.is_running():
+            self._write_batch([row])
+            return
+
+        try:
+            self.queue.put_nowait(row)
+        except queue.Full:
+            # Never lose an event - when the writer is this far behind, write it on the caller's thread
+            self.overflow_writes += 1
+            self._write_batch([row])
+
+    def flush(self, timeout=5.0):
+        """Block until every queued event is written, returns False on timeout"""
+        if self.is_running():
+            self.queue.put(_FLUSH)
+        with self.condition:
+            return self.condition.wait_for(lambda: self.pending == 0, timeout)
+
+    def _writer_loop(self):
+        """Internal method that writes a batch when it is full or flush_interval has passed"""
+        stopping = False
+        while not stopping:
+            item = self.queue.get()
+            if item is _STOP:
+                break
+            if item is _FLUSH:
+                continue
+
+            batch = [item]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self.queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is _FLUSH:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            self._write_batch(batch)
+
+        # Drain whatever was queued before the stop request
+        batch = []
+        while True:
+            try:
+                item = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _FLUSH and item is not _STOP:
+                batch.append(item)
+        if batch:
+            self._write_batch(batch)
+
+    def _write_batch(self, rows):
+        """Internal method that appends rows in one transaction, retrying a few times"""
+        start = time.perf_counter()
+        written = False
+        for attempt in range(3):
+            try:
+                self.event_store.append_many(rows)
+                written = True
+                break
+            except Exception as e:
+                print(f"Error writing events (attempt {attempt + 1}): {e}")
+                time.sleep(0.5)
+        latency = time.perf_counter() - start
+
+        with self.condition:
+            self.pending -= len(rows)
+            if written:
+                self.events_written += len(rows)
+                self.batches_written += 1
+            else:
+                self.failed_events += len(rows)
+            self.flush_count += 1
+            self.last_flush_latency = latency
+            self.max_flush_latency = max(self.max_flush_latency, latency)
+            self.total_flush_latency += latency
+            self.condition.notify_all()
+
+    def get_stats(self):
+        """Get queue depth and flush latency counters"""
+        with self.condition:
+            return {
+                "queue_depth": self.queue.qsize(),
+                "pending_events": self.pending,
+                "events_written": self.events_written,
+                "batches_written": self.batches_written,
+                "overflow_writes": self.overflow_writes,
+                "failed_events": self.failed_events,
+                "last_flush_ms": round(self.last_flush_latency * 1000, 2),
+                "max_flush_ms": round(self.max_flush_latency * 1000, 2),
+                "avg_flush_ms": round(self.total_flush_latency * 1000 / self.flush_count, 2) if self.flush_count else 0.0
+            }
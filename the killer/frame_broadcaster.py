@@ -0,0 +1,88 @@
+import io
+import threading
+
+from PIL import Image
+
+_placeholder_part = None
+
+def make_mjpeg_part(jpeg_bytes):
+    """Wrap JPEG bytes as one part of a multipart/x-mixed-replace stream"""
+    return b'--frame\r\nContent-Type: image/jpeg\r\n\r\n' + jpeg_bytes + b'\r\n'
+
+def get_placeholder_part():
+    """Get the black placeholder frame, encoded only once"""
+    global _placeholder_part
+    if _placeholder_part is None:
+        img = Image.new('RGB', (640, 480), color='black')
+        img_bytes = io.BytesIO()
+        img.save(img_bytes, format='JPEG')
+        _placeholder_part = make_mjpeg_part(img_bytes.getvalue())
+    return _placeholder_part
+
+class FrameBroadcaster:
+    def __init__(self, keepalive_interval=5.0, on_subscribers_changed=None):
+        """Initialize a fan-out broadcaster for one MJPEG stream"""
+        self.on_subscribers_changed = on_subscribers_changed  # Called with the new subscriber count
+        self.condition = threading.Condition()
+        self.part = None  # Latest frame, already wrapped as a multipart part
+        self.sequence = 0
+        self.subscribers = 0
+        self.frames_published = 0
+        self.keepalive_interval = keepalive_interval
+
+    def publish(self, jpeg_bytes):
+        """Publish a new JPEG frame and wake up every subscriber"""
+        part = make_mjpeg_part(jpeg_bytes)
+        with self.condition:
+            self.part = part
+            self.sequence += 1
+            self.frames_published += 1
+            self.condition.notify_all()
+
+    def clear(self):
+        """Forget the current frame so subscribers fall back to the placeholder"""
+        with self.condition:
+            self.part = None
+            self.sequence += 1
+            self.condition.notify_all()
+
+    def get_latest_frame(self):
+        """Get the latest multipart part (None if no frame yet)"""
+        return self.part
+
+    def wait_for_frame(self, last_sequence, timeout=None):
+        """Block until a frame newer than last_sequence arrives, returns (sequence, part)"""
+        with self.condition:
+            self.condition.wait_for(lambda: self.sequence != last_sequence, timeout)
+            return self.sequence, self.part
+
+    def stream(self):
+        """Yield multipart parts for one client.
+
+        Every client only ever gets the newest frame: a slow client skips the
+        frames published while it was still sending, nothing is queued for it.
+        """
+        with self.condition:
+            self.subscribers += 1
+            count = self.subscribers
+        if self.on_subscribers_changed:
+            self.on_subscribers_changed(count)
+        try:
+            last_sequence, part = self.sequence, self.part
+            yield part or get_placeholder_part()
+
+            while True:
+                sequence, part = self.wait_for_frame(last_sequence, self.keepalive_interval)
+                # On timeout resend the current frame so dead connections get noticed
+                last_sequence = sequence
+                yield part or get_placeholder_part()
+        finally:
+            with self.condition:
+                self.subscribers -= 1
+                count = self.subscribers
+            if self.on_subscribers_changed:
+                self.on_subscribers_changed(count)
+
+    def get_subscriber_count(self):
+        """Get the number of connected clients"""
+        return self.subscribers
@@ -0,0 +1,95 @@
+import threading
+import time
+from collections import deque
+
+class FrameGrabber:
+    def __init__(self, camera, buffer_size=3):
+        """Initialize background frame grabber for an opened camera"""
+        self.camera = camera
+        self.buffer = deque(maxlen=max(1, int(buffer_size)))  # (frame_id, timestamp, frame)
+        self.condition = threading.Condition()
+        self.capture_thread = None
+        self.should_stop = False
+        self.next_frame_id = 0
+        self.last_read_id = -1
+
+        # Counters exposed through get_stats()
+        self.frames_captured = 0
+        self.frames_processed = 0
+        self.frames_dropped = 0
+        self.read_failures = 0
+
+    def start(self):
+        """Start capturing frames in a background thread"""
+        if self.capture_thread and self.capture_thread.is_alive():
+            return
+
+        self.should_stop = False
+        self.capture_thread = threading.Thread(target=self._capture_loop, daemon=True)
+        self.capture_thread.start()
+
+    def stop(self):
+        """Stop the capture thread and wake up any waiting reader"""
+        self.should_stop = True
+        with self.condition:
+            self.condition.notify_all()
+
+        if self.capture_thread and self.capture_thread.is_alive():
+            self.capture_thread.join(timeout=2.0)
+        self.capture_thread = None
+
+    def is_running(self):
+        """Check if the capture thread is alive"""
+        return self.capture_thread is not None and self.capture_thread.is_alive()
+
+    def _capture_loop(self):
+        """Internal method that keeps the ring buffer filled with the newest frames"""
+        while not self.should_stop:
+            try:
+                ret, frame = self.camera.read()
+            except Exception as e:
+                print(f"Frame capture error: {e}")
+                ret, frame = False, None
+
+            if not ret or frame is None:
+                self.read_failures += 1
+                time.sleep(0.05)  # Avoid spinning on a disconnected camera
+                continue
+
+            with self.condition:
+                self.buffer.append((self.next_frame_id, time.time(), frame))
+                self.next_frame_id += 1
+                self.frames_captured += 1
+                self.condition.notify_all()
+
+    def _has_new_frame(self):
+        """Check if the buffer holds a frame that has not been read yet"""
+        return len(self.buffer) > 0 and self.buffer[-1][0] > self.last_read_id
+
+    def read_latest(self, timeout=1.0):
+        """Return the newest unread (frame_id, timestamp, frame), dropping older ones"""
+        with self.condition:
+            if not self.condition.wait_for(lambda: self._has_new_frame() or self.should_stop, timeout):
+                return None
+            if not self._has_new_frame():
+                return None
+
+            frame_id, timestamp, frame = self.buffer[-1]
+            # Every frame captured since the last read but never handed out is dropped
+            self.frames_dropped += frame_id - self.last_read_id - 1
+            self.frames_processed += 1
+            self.last_read_id = frame_id
+            return frame_id, timestamp, frame
+
+    def get_stats(self):
+        """Get capture counters"""
+        with self.condition:
+            latest_timestamp = self.buffer[-1][1] if self.buffer else None
+            return {
+                "frames_captured": self.frames_captured,
+                "frames_processed": self.frames_processed,
+                "frames_dropped": self.frames_dropped,
+                "read_failures": self.read_failures,
+                "buffered_frames": len(self.buffer),
+                "frame_age": time.time() - latest_timestamp if latest_timestamp else None
+            }
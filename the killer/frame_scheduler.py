@@ -0,0 +1,66 @@
+import time
+
+# Used when config.json has no "frame_rate"
+DEFAULT_FRAME_RATE = {
+    "active_fps": 10,  # Target rate while there is motion or an intrusion
+    "idle_fps": 2,  # Rate for a quiet scene
+    "idle_after": 5.0  # Seconds without motion before dropping to idle_fps
+}
+
+class FrameScheduler:
+    def __init__(self, settings=None, clock=time.monotonic):
+        """Initialize a frame pacer that targets an FPS and slows down on a quiet scene"""
+        self.clock = clock
+        self.last_activity = None
+        self.frame_start = None
+        self.mode = "active"
+        self.frames = 0
+        self.period_average = None  # Smoothed seconds from one frame start to the next
+        self.busy_average = None  # Smoothed processing seconds per frame
+        self.configure(settings)
+
+    def configure(self, settings=None):
+        """Apply frame rate settings (missing keys keep their defaults)"""
+        self.settings = {**DEFAULT_FRAME_RATE, **(settings or {})}
+
+    def start_frame(self):
+        """Mark the start of one loop iteration"""
+        now = self.clock()
+        if self.frame_start is not None:
+            period = now - self.frame_start
+            self.period_average = period if self.period_average is None else 0.9 * self.period_average + 0.1 * period
+        self.frame_start = now
+        self.frames += 1
+
+    def end_frame(self, active, min_fps=0):
+        """Finish an iteration, returns seconds to sleep before the next one.
+
+        active (motion or an intrusion) switches to the active rate at once;
+        the idle rate only comes back after idle_after quiet seconds. min_fps
+        keeps the rate up for live viewers. Processing time is subtracted so
+        the loop runs at the target rate instead of target + processing.
+        """
+        now = self.clock()
+        busy = now - self.frame_start if self.frame_start is not None else 0.0
+        self.busy_average = busy if self.busy_average is None else 0.9 * self.busy_average + 0.1 * busy
+
+        if active or self.last_activity is None:
+            self.last_activity = now
+        quiet = now - self.last_activity >= self.settings["idle_after"]
+        self.mode = "idle" if quiet else "active"
+
+        fps = self.settings["idle_fps"] if quiet else self.settings["active_fps"]
+        fps = max(float(fps), float(min_fps))
+        return max(0.0, 1.0 / fps - busy) if fps > 0 else 0.0
+
+    def get_stats(self):
+        """Get the mode, the achieved FPS and the duty cycle (share of time spent processing)"""
+        fps = 1.0 / self.period_average if self.period_average else 0.0
+        duty_cycle = min(1.0, self.busy_average / self.period_average) if self.period_average else 0.0
+        return {
+            "mode": self.mode,
+            "target_fps": self.settings["idle_fps"] if self.mode == "idle" else self.settings["active_fps"],
+            "fps": round(fps, 2),
+            "duty_cycle": round(duty_cycle, 3),
+            "frames": self.frames
+        }
@@ -0,0 +1,75 @@
+import cv2
+
+# Used when config.json has no "motion_gate"
+DEFAULT_MOTION_GATE = {
+    "enabled": True,
+    "thumbnail_width": 64,  # The gate compares tiny grayscale thumbnails
+    "pixel_threshold": 12,  # Gray-level change that counts a thumbnail pixel as changed
+    "min_changed": 0.002,  # Fraction of changed pixels that wakes the full pipeline (lower = more sensitive)
+    "refresh_interval": 2.0  # Seconds between frames passed anyway, so the background model keeps adapting
+}
+
+class MotionGate:
+    def __init__(self, settings=None):
+        """Initialize a cheap frame-difference gate in front of the detection pipeline"""
+        self.reference = None  # Thumbnail of the last frame that went through the pipeline
+        self.last_pass_time = None
+        self.frames_checked = 0
+        self.frames_skipped = 0
+        self.refresh_passes = 0
+        self.last_changed = 0.0
+        self.motion_seen = False  # Whether the last checked frame differed from the reference
+        self.configure(settings)
+
+    def configure(self, settings=None):
+        """Apply gate settings (missing keys keep their defaults)"""
+        self.settings = {**DEFAULT_MOTION_GATE, **(settings or {})}
+        self.reference = None  # Thumbnail size may have changed
+
+    def make_thumbnail(self, frame):
+        """Shrink a frame to the gate's grayscale thumbnail"""
+        height, width = frame.shape[:2]
+        thumb_width = int(self.settings["thumbnail_width"])
+        thumb_height = max(1, round(height * thumb_width / width))
+        thumbnail = cv2.resize(frame, (thumb_width, thumb_height), interpolation=cv2.INTER_AREA)
+        return cv2.cvtColor(thumbnail, cv2.COLOR_BGR2GRAY) if thumbnail.ndim == 3 else thumbnail
+
+    def check(self, frame, timestamp, force=False):
+        """Check if a frame needs the full pipeline (always True when force is set or the gate is off)"""
+        if not self.settings["enabled"]:
+            return True
+
+        self.frames_checked += 1
+        thumbnail = self.make_thumbnail(frame)
+        changed = False
+        if self.reference is not None and self.reference.shape == thumbnail.shape:
+            # Compared with the last frame that was analysed, so slow movement adds up until it shows
+            difference = cv2.absdiff(thumbnail, self.reference)
+            _, difference = cv2.threshold(difference, self.settings["pixel_threshold"], 255, cv2.THRESH_BINARY)
+            self.last_changed = cv2.countNonZero(difference) / difference.size
+            changed = self.last_changed >= self.settings["min_changed"]
+        else:
+            changed = True
+        self.motion_seen = changed
+
+        refresh = self.last_pass_time is None or timestamp - self.last_pass_time >= self.settings["refresh_interval"]
+        if not (force or changed or refresh):
+            self.frames_skipped += 1
+            return False
+
+        if not (force or changed):
+            self.refresh_passes += 1
+        self.reference = thumbnail
+        self.last_pass_time = timestamp
+        return True
+
+    def get_stats(self):
+        """Get gate counters (hit_rate = share of frames that skipped the pipeline)"""
+        return {
+            "enabled": self.settings["enabled"],
+            "frames_checked": self.frames_checked,
+            "frames_skipped": self.frames_skipped,
+            "refresh_passes": self.refresh_passes,
+            "hit_rate": self.frames_skipped / self.frames_checked if self.frames_checked else 0.0,
+            "last_changed": round(self.last_changed, 4)
+        }
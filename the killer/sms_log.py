@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+SMS log
+Append-only JSON Lines log of sent SMS with size/time based rotation.
+Replaces the sms_log.json array that was rewritten on every message.
+
+Usage:
+    python sms_log.py convert sms_log.json sms_log.jsonl
+    python sms_log.py tail 20
+"""
+
+import itertools
+import json
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+
+class SMSLog:
+    def __init__(self, path="sms_log.jsonl", max_bytes=1024 * 1024, rotate_interval=None, backup_count=5,
+                 legacy_json=None):
+        """Open the log; rotate_interval is in seconds (None = size based only)"""
+        self.path = path
+        self.max_bytes = max_bytes
+        self.rotate_interval = rotate_interval
+        self.backup_count = max(0, int(backup_count))
+        self.lock = threading.Lock()
+        self.file = None
+        self.started_at = None  # Time of the first record in the current file
+
+        log_dir = os.path.dirname(path)
+        if log_dir and not os.path.exists(log_dir):
+            os.makedirs(log_dir)
+
+        # One-time import of the old JSON array log
+        if legacy_json and os.path.exists(legacy_json) and not os.path.exists(path):
+            count = convert_json_array(legacy_json, path)
+            print(f"Converted {count} SMS records from {legacy_json} to {path}")
+
+    def _open(self):
+        """Internal method that opens the current file for appending"""
+        self.file = open(self.path, 'a', encoding='utf-8')
+        if self.file.tell() == 0:
+            self.started_at = None
+        elif self.started_at is None:
+            self.started_at = self._read_first_timestamp()
+
+    def _read_first_timestamp(self):
+        """Internal method that gets the time of the first record in the current file"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                record = json.loads(f.readline())
+            return datetime.strptime(record["timestamp"], "%Y-%m-%d %H:%M:%S").timestamp()
+        except Exception:
+            return os.path.getmtime(self.path)
+
+    def _should_rotate(self, now):
+        """Internal method that checks the size and age limits"""
+        size = self.file.tell()
+        if size == 0:
+            return False
+        if self.max_bytes and size >= self.max_bytes:
+            return True
+        return bool(self.rotate_interval and self.started_at and now - self.started_at >= self.rotate_interval)
+
+    def _rotate(self):
+        """Internal method that shifts path -> path.1 -> path.2 ... and drops the oldest"""
+        self.file.close()
+        self.file = None
+        if self.backup_count == 0:
+            os.remove(self.path)
+        else:
+            for index in range(self.backup_count - 1, 0, -1):
+                source = f"{self.path}.{index}"
+                if os.path.exists(source):
+                    os.replace(source, f"{self.path}.{index + 1}")
+            os.replace(self.path, f"{self.path}.1")
+        self.started_at = None
+
+    def append(self, record):
+        """Append one record as a single line - constant cost whatever the history size"""
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        now = time.time()
+        with self.lock:
+            if self.file is None:
+                self._open()
+            if self._should_rotate(now):
+                self._rotate()
+                self._open()
+            if self.started_at is None:
+                self.started_at = now
+            # One write per record; a crash can only cut the last line, which readers skip
+            self.file.write(line)
+            self.file.flush()
+
+    def get_files(self):
+        """Get the log files, newest first"""
+        files = [self.path] + [f"{self.path}.{index}" for index in range(1, self.backup_count + 1)]
+        return [path for path in files if os.path.exists(path)]
+
+    def iter_records(self, newest_first=True):
+        """Yield records across the rotated files without loading them whole"""
+        with self.lock:
+            if self.file:
+                self.file.flush()
+            files = self.get_files()
+
+        for path in (files if newest_first else reversed(files)):
+            lines = read_lines_reversed(path) if newest_first else read_lines(path)
+            for line in lines:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue  # Partial line from an interrupted write
+
+    def tail(self, count=20):
+        """Get the last `count` records, newest first"""
+        return list(itertools.islice(self.iter_records(), count))
+
+    def paginate(self, offset=0, limit=50, newest_first=True):
+        """Get one page of records"""
+        return list(itertools.islice(self.iter_records(newest_first), offset, offset + limit))
+
+    def close(self):
+        """Close the current file"""
+        with self.lock:
+            if self.file:
+                self.file.close()
+                self.file = None
+
+def read_lines(path):
+    """Yield the non-empty lines of a file, oldest first"""
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield line
+
+def read_lines_reversed(path, block_size=8192):
+    """Yield the non-empty lines of a file from the end, reading it backwards in blocks"""
+    with open(path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        remainder = b""
+        while position > 0:
+            read_size = min(block_size, position)
+            position -= read_size
+            f.seek(position)
+            lines = (f.read(read_size) + remainder).split(b"\n")
+            remainder = lines.pop(0)  # May continue in the previous block
+            for line in reversed(lines):
+                if line.strip():
+                    yield line.decode('utf-8', errors='replace')
+        if remainder.strip():
+            yield remainder.decode('utf-8', errors='replace')
+
+def convert_json_array(json_path, jsonl_path):
+    """Convert the old sms_log.json array into a JSON Lines file, returns the record count"""
+    try:
+        with open(json_path, 'r', encoding='utf-8') as f:
+            records = json.load(f)
+    except (json.JSONDecodeError, ValueError):
+        records = []
+
+    with open(jsonl_path, 'a', encoding='utf-8') as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    return len(records)
+
+if __name__ == "__main__":
+    if len(sys.argv) >= 2 and sys.argv[1] == "convert":
+        source = sys.argv[2] if len(sys.argv) > 2 else "sms_log.json"
+        target = sys.argv[3] if len(sys.argv) > 3 else "sms_log.jsonl"
+        print(f"✅ Converted {convert_json_array(source, target)} records to {target}")
+    elif len(sys.argv) >= 2 and sys.argv[1] == "tail":
+        for record in reversed(SMSLog().tail(int(sys.argv[2]) if len(sys.argv) > 2 else 20)):
+            print(f"{record.get('timestamp')}  {record.get('to')}  {record.get('status')}  {record.get('message')}")
+    else:
+        print(__doc__)
+        sys.exit(1)
@@ -0,0 +1,179 @@
+import sqlite3
+import threading
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at REAL NOT NULL,
+    to_number TEXT NOT NULL,
+    message TEXT NOT NULL,
+    kind TEXT,
+    status TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL,
+    last_error TEXT,
+    result TEXT,
+    sent_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_outbox_status_next ON outbox (status, next_attempt_at);
+"""
+
+# queued -> sending -> sent, or back to queued with a backoff delay until
+# max_attempts is reached (failed) or the message is older than max_age (expired)
+STATUSES = ("queued", "sending", "sent", "failed", "expired")
+
+class SMSOutbox:
+    def __init__(self, send_function, db_path="sms_outbox.db", workers=2, max_attempts=5,
+                 base_delay=2.0, max_delay=300.0, max_age=3600.0):
+        """Initialize persistent SMS queue; send_function(to_number, message) returns (success, message)"""
+        self.send_function = send_function
+        self.db_path = db_path
+        self.worker_count = max(1, int(workers))
+        self.max_attempts = max(1, int(max_attempts))
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_age = max_age  # An intrusion alert is useless hours later
+        self.lock = threading.Lock()
+        self.wakeup = threading.Condition()
+        self.worker_threads = []
+        self.should_stop = False
+
+        self.connection = sqlite3.connect(db_path, timeout=10.0, check_same_thread=False, isolation_level=None)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.executescript(SCHEMA)
+
+    def start(self):
+        """Start the worker pool, resuming anything left over from the last run"""
+        if self.is_running():
+            return
+
+        with self.lock:
+            # A message that was being sent when the process died is retried
+            self.connection.execute("UPDATE outbox SET status = 'queued' WHERE status = 'sending'")
+
+        self.should_stop = False
+        self.worker_threads = [threading.Thread(target=self._worker_loop, daemon=True)
+                               for _ in range(self.worker_count)]
+        for worker in self.worker_threads:
+            worker.start()
+
+    def stop(self, timeout=5.0):
+        """Stop the worker pool (queued messages stay in the database)"""
+        self.should_stop = True
+        with self.wakeup:
+            self.wakeup.notify_all()
+        for worker in self.worker_threads:
+            worker.join(timeout=timeout)
+        self.worker_threads = []
+
+    def is_running(self):
+        """Check if any worker thread is alive"""
+        return any(worker.is_alive() for worker in self.worker_threads)
+
+    def enqueue(self, to_number, message, kind="alert"):
+        """Queue a message for delivery, returns its id without waiting for the network"""
+        now = time.time()
+        with self.lock:
+            cursor = self.connection.execute(
+                "INSERT INTO outbox (created_at, to_number, message, kind, next_attempt_at) VALUES (?, ?, ?, ?, ?)",
+                (now, to_number, message, kind, now)
+            )
+            message_id = cursor.lastrowid
+        with self.wakeup:
+            self.wakeup.notify()
+        return message_id
+
+    def get_backoff_delay(self, attempts):
+        """Seconds to wait before the next attempt after `attempts` failures"""
+        return min(self.max_delay, self.base_delay * (2 ** (attempts - 1)))
+
+    def _claim_next(self):
+        """Mark the next due message as sending, returns (message, seconds until the next one is due)"""
+        now = time.time()
+        with self.lock:
+            # Old messages are expired here instead of being sent late
+            self.connection.execute("UPDATE outbox SET status = 'expired' WHERE status = 'queued' AND created_at < ?",
+                                    (now - self.max_age,))
+            row = self.connection.execute(
+                "SELECT * FROM outbox WHERE status = 'queued' ORDER BY next_attempt_at, id LIMIT 1"
+            ).fetchone()
+            if row is None:
+                return None, 1.0
+            if row["next_attempt_at"] > now:
+                return None, min(1.0, row["next_attempt_at"] - now)
+
+            self.connection.execute("UPDATE outbox SET status = 'sending', attempts = attempts + 1 WHERE id = ?",
+                                    (row["id"],))
+            message = dict(row, attempts=row["attempts"] + 1)
+            return message, 0.0
+
+    def _worker_loop(self):
+        """Internal method that delivers due messages until stopped"""
+        while not self.should_stop:
+            try:
+                message, wait_time = self._claim_next()
+            except Exception as e:
+                print(f"SMS outbox error: {e}")
+                message, wait_time = None, 1.0
+
+            if message is None:
+                with self.wakeup:
+                    self.wakeup.wait(wait_time)
+                continue
+
+            try:
+                success, result = self.send_function(message["to_number"], message["message"])
+            except Exception as e:
+                success, result = False, str(e)
+            self._complete(message, success, result)
+
+    def _complete(self, message, success, result):
+        """Internal method that records a delivery attempt"""
+        now = time.time()
+        with self.lock:
+            if success:
+                self.connection.execute("UPDATE outbox SET status = 'sent', result = ?, sent_at = ? WHERE id = ?",
+                                        (result, now, message["id"]))
+            elif message["attempts"] >= self.max_attempts:
+                self.connection.execute("UPDATE outbox SET status = 'failed', last_error = ? WHERE id = ?",
+                                        (result, message["id"]))
+            else:
+                next_attempt = now + self.get_backoff_delay(message["attempts"])
+                self.connection.execute(
+                    "UPDATE outbox SET status = 'queued', last_error = ?, next_attempt_at = ? WHERE id = ?",
+                    (result, next_attempt, message["id"])
+                )
+
+        if success:
+            print(f"📱 SMS {message['id']} delivered to {message['to_number']}")
+        else:
+            print(f"SMS {message['id']} attempt {message['attempts']} failed: {result}")
+
+    def get_message(self, message_id):
+        """Get one message with its delivery status"""
+        with self.lock:
+            row = self.connection.execute("SELECT * FROM outbox WHERE id = ?", (message_id,)).fetchone()
+        return dict(row) if row else None
+
+    def get_recent(self, limit=20):
+        """Get the most recent messages, newest first"""
+        with self.lock:
+            rows = self.connection.execute("SELECT * FROM outbox ORDER BY id DESC LIMIT ?", (int(limit),)).fetchall()
+        return [dict(row) for row in rows]
+
+    def get_stats(self):
+        """Get message counts per delivery status"""
+        with self.lock:
+            rows = self.connection.execute("SELECT status, COUNT(*) FROM outbox GROUP BY status").fetchall()
+        stats = {status: 0 for status in STATUSES}
+        stats.update({row[0]: row[1] for row in rows})
+        stats["workers"] = len(self.worker_threads)
+        return stats
+
+    def close(self):
+        """Stop the workers and close the database"""
+        self.stop()
+        with self.lock:
+            self.connection.close()
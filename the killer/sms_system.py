@@ -1,5 +1,14 @@
 import os
 import json
+import base64
+import http.client
+import threading
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+
+from alert_policy import AlertPolicy, format_duration
+from sms_log import SMSLog
+from sms_outbox import SMSOutbox
 
 # Import Twilio with proper error handling
 try:
@@ -13,13 +22,150 @@ except ImportError:
     TwilioException = Exception
     TWILIO_AVAILABLE = False
 
+# Alert types each role receives unless a recipient lists its own "alerts"
+DEFAULT_ROLE_ALERTS = {
+    "owner": ["ENTER", "EXIT", "TEST"],
+    "watchman": ["ENTER", "EXIT"],
+    "neighbour": ["ENTER"]
+}
+
+def load_recipients(config):
+    """Get the SMS recipient list from config (farmer_phone is always included as the owner)"""
+    recipients = []
+    for recipient in config.get("recipients") or []:
+        if not recipient.get("phone") or not recipient.get("enabled", True):
+            continue
+        role = recipient.get("role", "owner")
+        alerts = recipient.get("alerts") or DEFAULT_ROLE_ALERTS.get(role, ["ENTER", "EXIT"])
+        recipients.append({
+            "name": recipient.get("name") or recipient["phone"],
+            "phone": recipient["phone"],
+            "role": role,
+            "alerts": [alert.upper() for alert in alerts]
+        })
+
+    # Older configs (and the admin page) only know about farmer_phone
+    farmer_phone = config.get("farmer_phone") or os.getenv("FARMER_PHONE")
+    if farmer_phone and farmer_phone not in [recipient["phone"] for recipient in recipients]:
+        recipients.insert(0, {"name": "කර්මිකරු", "phone": farmer_phone, "role": "owner",
+                              "alerts": list(DEFAULT_ROLE_ALERTS["owner"])})
+    return recipients
+
+class TwilioHTTPError(Exception):
+    def __init__(self, status):
+        super().__init__(f"HTTP {status}")
+        self.status = status
+
+class TwilioHTTPClient:
+    def __init__(self, account_sid, auth_token, from_number, base_url="https://api.twilio.com", timeout=10.0):
+        """Minimal Twilio REST client; point base_url at a local fake server to test offline"""
+        self.account_sid = account_sid
+        self.from_number = from_number
+        parsed = urllib.parse.urlsplit(base_url)
+        self.scheme = parsed.scheme
+        self.host = parsed.netloc
+        self.path = f"{parsed.path.rstrip('/')}/2010-04-01/Accounts/{account_sid}/Messages.json"
+        self.timeout = timeout
+        credentials = f"{account_sid}:{auth_token}".encode('utf-8')
+        self.authorization = "Basic " + base64.b64encode(credentials).decode('ascii')
+        # One kept-alive connection per sending thread, reused for every message
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.connections_opened = 0
+    
+    def _get_connection(self):
+        """Internal method that gets this thread's connection, opening it if needed"""
+        connection = getattr(self.local, 'connection', None)
+        if connection is None:
+            connection_class = http.client.HTTPSConnection if self.scheme == 'https' else http.client.HTTPConnection
+            connection = connection_class(self.host, timeout=self.timeout)
+            self.local.connection = connection
+            with self.lock:
+                self.connections_opened += 1
+        return connection
+    
+    def _drop_connection(self):
+        """Internal method that closes this thread's connection"""
+        connection = getattr(self.local, 'connection', None)
+        if connection is not None:
+            connection.close()
+        self.local.connection = None
+    
+    def send_message(self, to_number, body):
+        """Create a message, returns its SID"""
+        data = urllib.parse.urlencode({"To": to_number, "From": self.from_number, "Body": body}).encode('utf-8')
+        headers = {"Authorization": self.authorization, "Content-Type": "application/x-www-form-urlencoded"}
+        
+        for attempt in range(2):
+            connection = self._get_connection()
+            try:
+                connection.request("POST", self.path, body=data, headers=headers)
+                response = connection.getresponse()
+                payload = response.read()
+                break
+            except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError):
+                # The server closed an idle kept-alive connection - reconnect once
+                self._drop_connection()
+                if attempt:
+                    raise
+            except Exception:
+                self._drop_connection()
+                raise
+        
+        if response.will_close:
+            self._drop_connection()
+        if response.status >= 400:
+            raise TwilioHTTPError(response.status)
+        return json.loads(payload.decode('utf-8')).get("sid")
+
 class SMSSystem:
     def __init__(self, config_file="config.json"):
         """Initialize SMS system with Twilio"""
         self.load_config(config_file)
         self.client = None
+        self.http_client = None
         self.sms_enabled = False
         self.initialize_twilio()
+        
+        # Mock SMS records are appended one line each, the old sms_log.json is imported once
+        log_config = self.config.get('sms_log', {})
+        self.sms_log = SMSLog(
+            log_config.get('path', 'sms_log.jsonl'),
+            max_bytes=log_config.get('max_bytes', 1024 * 1024),
+            rotate_interval=log_config.get('rotate_days', 0) * 86400 or None,
+            backup_count=log_config.get('backup_count', 5),
+            legacy_json='sms_log.json'
+        )
+        
+        # Alerts are queued here and sent by background workers once start() is called
+        outbox_config = self.config.get('sms_outbox', {})
+        self.outbox = SMSOutbox(
+            self.deliver_sms,
+            db_path=outbox_config.get('db_path', 'sms_outbox.db'),
+            workers=outbox_config.get('workers', 4),
+            max_attempts=outbox_config.get('max_attempts', 5),
+            base_delay=outbox_config.get('base_delay', 2.0),
+            max_delay=outbox_config.get('max_delay', 300.0),
+            max_age=outbox_config.get('max_age', 3600.0)
+        )
+        
+        # ENTER/EXIT alerts pass through rate limiting and digest aggregation first
+        self.alert_policy = AlertPolicy(self.config.get('alert_policy'), self.send_sms)
+        
+        # Sends the direct test SMS to every recipient at once (queued alerts are sent by the outbox workers)
+        self.executor = ThreadPoolExecutor(max_workers=max(1, outbox_config.get('workers', 4)))
+    
+    def start(self):
+        """Start delivering queued SMS in the background"""
+        self.outbox.start()
+        self.alert_policy.start()
+    
+    def stop(self):
+        """Stop the SMS workers (undelivered messages stay queued)"""
+        self.alert_policy.stop()
+        self.executor.shutdown(wait=False)
+        self.outbox.close()
+        self.sms_log.close()
     
     def load_config(self, config_file):
         """Load configuration from JSON file"""
@@ -28,9 +174,23 @@ class SMSSystem:
                 self.config = json.load(f)
         except FileNotFoundError:
             self.config = {}
+        
+        # Rate limit changes from the admin page apply at once, without a restart
+        if hasattr(self, 'alert_policy'):
+            self.alert_policy.configure(self.config.get('alert_policy'))
     
     def initialize_twilio(self):
         """Initialize Twilio client"""
+        base_url = self.config.get('twilio_base_url')
+        if base_url and self.config.get('twilio_sid') and self.config.get('twilio_auth') and self.config.get('twilio_from'):
+            # Plain REST calls, no Twilio library needed (also used with a local fake server)
+            self.http_client = TwilioHTTPClient(self.config['twilio_sid'], self.config['twilio_auth'],
+                                                self.config['twilio_from'], base_url)
+            self.sms_enabled = True
+            self.mock_mode = False
+            print(f"SMS system initialized with Twilio REST API at {base_url}")
+            return
+        
         if not TWILIO_AVAILABLE:
             print("Twilio library not available - Using mock SMS system")
             self.sms_enabled = True
@@ -67,54 +227,93 @@ class SMSSystem:
             self.sms_enabled = True
             self.mock_mode = True
     
-    def send_animal_enter_alert(self, farmer_phone=None):
-        """Send SMS alert when animals enter"""
+    def get_recipients(self, alert_type=None):
+        """Get the configured recipients (only those opted in to alert_type if given)"""
+        recipients = load_recipients(self.config)
+        if alert_type:
+            recipients = [recipient for recipient in recipients if alert_type in recipient["alerts"]]
+        return recipients
+    
+    def send_to_recipients(self, alert_type, send_one, farmer_phone=None, concurrent=False):
+        """Call send_one(phone) for every opted-in recipient, returns a combined (success, message).
+
+        Alerts only queue a message per recipient, so they run in turn; concurrent
+        is for send_one calls that wait on the network (the direct test SMS).
+        """
         if not self.sms_enabled:
             return False, "SMS අක්‍රීයයි"
         
-        phone = farmer_phone or self.config.get('farmer_phone') or os.getenv('FARMER_PHONE')
-        if not phone:
+        phones = [farmer_phone] if farmer_phone else [recipient["phone"] for recipient in self.get_recipients(alert_type)]
+        if not phones:
             return False, "කර්මිකාරයාගේ දුරකථන අංකය සකසා නැත"
+        if len(phones) == 1:
+            return send_one(phones[0])
         
+        results = list(self.executor.map(send_one, phones) if concurrent else map(send_one, phones))
+        sent = sum(1 for success, _ in results if success)
+        errors = [message for success, message in results if not success]
+        summary = f"SMS ලබන්නන් {sent}/{len(phones)}"
+        return sent > 0, summary + (f" - {errors[0]}" if errors else "")
+    
+    def send_animal_enter_alert(self, farmer_phone=None):
+        """Send SMS alert when animals enter"""
         message = "ඔබේ වත්තට සතුන් ඇතුළු වී ඇත. කරුණාකර පරීක්ෂා කරන්න."
-        return self.send_sms(phone, message)
+        return self.send_to_recipients(
+            "ENTER", lambda phone: self.alert_policy.submit(phone, "ENTER", message), farmer_phone)
     
-    def send_animal_exit_alert(self, farmer_phone=None):
+    def send_animal_exit_alert(self, farmer_phone=None, duration=None):
         """Send SMS alert when animals exit"""
-        if not self.sms_enabled:
-            return False, "SMS අක්‍රීයයි"
-        
-        phone = farmer_phone or self.config.get('farmer_phone') or os.getenv('FARMER_PHONE')
-        if not phone:
-            return False, "කර්මිකාරයාගේ දුරකථන අංකය සකසා නැත"
-        
         message = "සතුන් වත්තෙන් පිටවී ගොස් ඇත."
-        return self.send_sms(phone, message)
+        return self.send_to_recipients(
+            "EXIT", lambda phone: self.alert_policy.submit(phone, "EXIT", message, duration), farmer_phone)
+    
+    def send_intrusion_reminder(self, seconds, farmer_phone=None):
+        """Re-alert ENTER recipients that an intrusion is still going on (an escalation stage,
+        so it skips the alert policy - the plan already limits it to once per intrusion)"""
+        message = f"සතුන් තවමත් වත්තේ ඇත ({format_duration(seconds)}). කරුණාකර වහාම පරීක්ෂා කරන්න."
+        return self.send_to_recipients("ENTER", lambda phone: self.send_sms(phone, message), farmer_phone)
     
     def send_test_sms(self, farmer_phone=None):
         """Send test SMS"""
-        if not self.sms_enabled:
-            return False, "SMS අක්‍රීයයි"
-        
-        phone = farmer_phone or self.config.get('farmer_phone') or os.getenv('FARMER_PHONE')
-        if not phone:
-            return False, "කර්මිකාරයාගේ දුරකථන අංකය සකසා නැත"
-        
         message = "කර්මිකාරයාගේ වත්තේ ආරක්ෂක පද්ධතිය සාර්ථකව ක්‍රියාත්මක වේ."
-        return self.send_sms(phone, message)
+        # Sent right away so the admin page shows the real delivery result
+        return self.send_to_recipients(
+            "TEST", lambda phone: self.deliver_sms(self.clean_phone_number(phone), message), farmer_phone,
+            concurrent=True)
+    
+    def clean_phone_number(self, to_number):
+        """Clean phone number (remove spaces, add + if needed)"""
+        to_number = to_number.strip()
+        if not to_number.startswith('+'):
+            to_number = '+' + to_number
+        return to_number
     
-    def send_sms(self, to_number, message):
-        """Send SMS using Twilio or mock system"""
+    def send_sms(self, to_number, message, kind="alert"):
+        """Queue SMS for background delivery (sent immediately if the outbox is not running)"""
         try:
-            # Clean phone number (remove spaces, add + if needed)
-            to_number = to_number.strip()
-            if not to_number.startswith('+'):
-                to_number = '+' + to_number
+            to_number = self.clean_phone_number(to_number)
+            if not self.outbox.is_running():
+                return self.deliver_sms(to_number, message)
             
+            message_id = self.outbox.enqueue(to_number, message, kind)
+            return True, f"SMS පෝලිමට එක් කරන ලදී (ID: {message_id})"
+        
+        except Exception as e:
+            error_msg = f"SMS පෝලිම් දෝෂය: {str(e)}"
+            print(error_msg)
+            return False, error_msg
+    
+    def deliver_sms(self, to_number, message):
+        """Send SMS now using Twilio or mock system (blocks for the network round trip)"""
+        try:
             # Use mock SMS if Twilio is not available or configured
             if hasattr(self, 'mock_mode') and self.mock_mode:
                 return self._send_mock_sms(to_number, message)
             
+            if self.http_client:
+                sid = self.http_client.send_message(to_number, message)
+                return True, f"SMS යවන ලදී (ID: {sid})"
+            
             if not self.client:
                 return False, "SMS සේවාව අක්‍රීයයි"
             
@@ -126,6 +325,11 @@ class SMSSystem:
             
             return True, f"SMS යවන ලදී (ID: {message_obj.sid})"
         
+        except TwilioHTTPError as e:
+            error_msg = f"Twilio දෝෂය: HTTP {e.status}"
+            print(error_msg)
+            return False, error_msg
+        
         except TwilioException as e:
             error_msg = f"Twilio දෝෂය: {str(e)}"
             print(error_msg)
@@ -141,26 +345,13 @@ class SMSSystem:
         try:
             from datetime import datetime
             
-            # Load existing log
-            sms_log = []
-            try:
-                with open("sms_log.json", "r", encoding="utf-8") as f:
-                    sms_log = json.load(f)
-            except (FileNotFoundError, json.JSONDecodeError):
-                sms_log = []
-            
-            # Add new SMS record
             sms_record = {
                 "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
                 "to": to_number,
                 "message": message,
                 "status": "SENT (MOCK)"
             }
-            sms_log.append(sms_record)
-            
-            # Save to file
-            with open("sms_log.json", "w", encoding="utf-8") as f:
-                json.dump(sms_log, f, indent=2, ensure_ascii=False)
+            self.sms_log.append(sms_record)
             
             print(f"📱 MOCK SMS SENT:")
             print(f"   To: {to_number}")
@@ -186,12 +377,20 @@ class SMSSystem:
         """Check if SMS is enabled"""
         return self.sms_enabled
     
+    def get_outbox_stats(self):
+        """Get SMS queue counts per delivery status"""
+        return self.outbox.get_stats()
+    
     def get_status(self):
         """Get SMS system status"""
         if self.sms_enabled:
-            phone = self.config.get('farmer_phone') or os.getenv('FARMER_PHONE')
-            if phone:
-                return "SMS සක්‍රීයයි", f"දුරකථන: {phone}"
+            recipients = self.get_recipients()
+            if recipients:
+                phones = recipients[0]["phone"] if len(recipients) == 1 else f"ලබන්නන් {len(recipients)}"
+                queued = self.outbox.get_stats()["queued"]
+                if queued:
+                    return "SMS සක්‍රීයයි", f"දුරකථන: {phones} ({queued} පෝලිමේ)"
+                return "SMS සක්‍රීයයි", f"දුරකථන: {phones}"
             else:
                 return "SMS සක්‍රීයයි", "දුරකථන අංකය සකසා නැත"
         else:
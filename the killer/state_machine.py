@@ -1,29 +1,30 @@
 import time
 from datetime import datetime
-import csv
-import os
+
+from event_store import EventStore
+from event_writer import EventWriter
 
 class FarmGateStateMachine:
-    def __init__(self):
+    def __init__(self, events_db="events/events.db", camera_id=None):
         self.state = "SAFE"  # SAFE, INTRUSION, EXIT
         self.last_state_change = time.time()
         self.intrusion_start_time = None
-        self.events_file = "events/events.csv"
-        self.ensure_events_file()
-    
-    def ensure_events_file(self):
-        """Create events CSV file if it doesn't exist"""
-        if not os.path.exists("events"):
-            os.makedirs("events")
-        
-        if not os.path.exists(self.events_file):
-            with open(self.events_file, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.writer(f)
-                writer.writerow(["timestamp", "event", "description_sinhala", "description_english"])
+        self.last_intrusion_duration = 0
+        self.last_event_time = None  # "%Y-%m-%d %H:%M:%S" of the last logged event
+        self.animal_count = None  # Distinct animals in the current intrusion, reported by the detector
+        self.camera_id = camera_id
+        # None disables logging (offline analysis)
+        self.event_store = EventStore(events_db) if events_db else None
+        # Events are written in the background so disk latency never stalls detection
+        self.event_writer = EventWriter(self.event_store) if self.event_store else None
+        if self.event_writer:
+            self.event_writer.start()
     
-    def update_state(self, detection_status):
-        """Update state based on detection status"""
-        current_time = time.time()
+    def update_state(self, detection_status, timestamp=None, animal_count=None):
+        """Update state based on detection status (timestamp defaults to now)"""
+        current_time = timestamp if timestamp is not None else time.time()
+        if animal_count is not None:
+            self.animal_count = animal_count
         
         if detection_status == "ඇතුළු වී ඇත":
             if self.state == "SAFE":
@@ -38,8 +39,10 @@ class FarmGateStateMachine:
             if self.state == "INTRUSION":
                 self.state = "SAFE"
                 intrusion_duration = current_time - self.intrusion_start_time if self.intrusion_start_time else 0
+                self.last_intrusion_duration = intrusion_duration
                 self.log_event("EXIT", f"සතුන් වත්තෙන් පිටවී ගොස් ඇත (කාලය: {int(intrusion_duration)}s)", 
-                             f"Animals left the farm (Duration: {int(intrusion_duration)}s)")
+                             f"Animals left the farm (Duration: {int(intrusion_duration)}s)",
+                             duration=intrusion_duration)
                 self.intrusion_start_time = None
                 return "EXIT"
             elif self.state == "SAFE":
@@ -51,8 +54,10 @@ class FarmGateStateMachine:
                 if current_time - self.last_state_change > 3.0:  # 3 seconds threshold
                     self.state = "SAFE"
                     intrusion_duration = current_time - self.intrusion_start_time if self.intrusion_start_time else 0
+                    self.last_intrusion_duration = intrusion_duration
                     self.log_event("EXIT", f"සතුන් වත්තෙන් පිටවී ගොස් ඇත (කාලය: {int(intrusion_duration)}s)", 
-                                 f"Animals left the farm (Duration: {int(intrusion_duration)}s)")
+                                 f"Animals left the farm (Duration: {int(intrusion_duration)}s)",
+                                 duration=intrusion_duration)
                     self.intrusion_start_time = None
                     return "EXIT"
                 else:
@@ -63,23 +68,41 @@ class FarmGateStateMachine:
         self.last_state_change = current_time
         return "NO_CHANGE"
     
-    def log_event(self, event_type, sinhala_desc, english_desc):
-        """Log event to CSV file"""
+    def log_event(self, event_type, sinhala_desc, english_desc, duration=None):
+        """Log event to the event store (with the animal count known so far)"""
+        self.last_event_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        if not self.event_writer:
+            return
+        
         try:
-            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            with open(self.events_file, 'a', newline='', encoding='utf-8') as f:
-                writer = csv.writer(f)
-                writer.writerow([timestamp, event_type, sinhala_desc, english_desc])
+            self.event_writer.write(event_type, sinhala_desc, english_desc, self.last_event_time,
+                                    camera_id=self.camera_id, duration=duration, animal_count=self.animal_count)
         except Exception as e:
             print(f"Error logging event: {e}")
     
+    def flush_events(self, timeout=5.0):
+        """Wait until every logged event is in the event store"""
+        return self.event_writer.flush(timeout) if self.event_writer else True
+    
+    def get_writer_stats(self):
+        """Get event writer queue depth and flush latency"""
+        return self.event_writer.get_stats() if self.event_writer else {}
+    
+    def close(self):
+        """Write pending events and close the event store"""
+        if self.event_writer:
+            self.event_writer.stop()
+            self.event_store.close()
+            self.event_writer = None
+    
     def get_current_state(self):
         """Get current state information"""
         return {
             "state": self.state,
             "is_intrusion": self.state == "INTRUSION",
             "is_safe": self.state == "SAFE",
-            "intrusion_duration": time.time() - self.intrusion_start_time if self.intrusion_start_time else 0
+            "intrusion_duration": time.time() - self.intrusion_start_time if self.intrusion_start_time else 0,
+            "animal_count": self.animal_count
         }
     
     def get_state_display(self):
@@ -91,8 +114,8 @@ class FarmGateStateMachine:
         else:
             return "අක්‍රීයයි", "⚪"
     
-    def reset_state(self):
-        """Reset state machine to safe state"""
+    def reset_state(self, timestamp=None):
+        """Reset state machine to safe state (timestamp sets the clock origin for replays)"""
         self.state = "SAFE"
         self.intrusion_start_time = None
-        self.last_state_change = time.time()
+        self.last_state_change = timestamp if timestamp is not None else time.time()
@@ -0,0 +1,54 @@
+import cv2
+
+# Used when config.json has no "stream_profiles"
+DEFAULT_STREAM_PROFILES = {
+    "thumbnail": {"width": 320, "height": 180, "quality": 50, "fps": 2},
+    "mobile": {"width": 640, "height": 360, "quality": 60, "fps": 5},
+    "full": {"width": 1280, "height": 720, "quality": 80, "fps": 10}
+}
+
+def parse_stream_profile(profile):
+    """Check one profile's settings, ValueError if any would break streaming"""
+    settings = {
+        "width": int(profile.get("width", 640)),
+        "height": int(profile.get("height", 360)),
+        "quality": int(profile.get("quality", 70)),
+        "fps": float(profile.get("fps", 5))
+    }
+    if settings["width"] <= 0 or settings["height"] <= 0:
+        raise ValueError("width and height must be positive")
+    if not 1 <= settings["quality"] <= 100:
+        raise ValueError("quality must be between 1 and 100")
+    if not settings["fps"] > 0:
+        raise ValueError("fps must be positive")
+    return settings
+
+def load_stream_profiles(config):
+    """Get the named streaming profiles from config (invalid ones are skipped with a warning)"""
+    profiles = {}
+    for name, profile in (config.get("stream_profiles") or DEFAULT_STREAM_PROFILES).items():
+        try:
+            profiles[name] = parse_stream_profile(profile)
+        except (TypeError, ValueError, AttributeError) as e:
+            print(f"Stream profile '{name}' ignored: {e}")
+
+    if not profiles:
+        print("No valid stream profiles - using the defaults")
+        return {name: dict(profile) for name, profile in DEFAULT_STREAM_PROFILES.items()}
+    return profiles
+
+def get_default_profile(config):
+    """Get the profile used when a client does not ask for one"""
+    profiles = load_stream_profiles(config)
+    name = config.get("default_stream_profile")
+    return name if name in profiles else next(iter(profiles))
+
+def encode_frame(frame, profile):
+    """Downscale a frame to fit the profile resolution and JPEG-encode it at the profile quality"""
+    height, width = frame.shape[:2]
+    scale = min(1.0, profile["width"] / width, profile["height"] / height)
+    if scale < 1.0:
+        frame = cv2.resize(frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+
+    ret, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, profile["quality"]])
+    return buffer.tobytes() if ret else None
@@ -4,12 +4,13 @@ Test SMS System - Works without Twilio
 This creates a mock SMS system for testing
 """
 
-import json
 from datetime import datetime
 
+from sms_log import SMSLog
+
 class TestSMSSystem:
     def __init__(self):
-        self.sms_log = []
+        self.sms_log = SMSLog("sms_log.jsonl", legacy_json="sms_log.json")
     
     def send_sms(self, to_number, message):
         """Mock SMS sending - logs to file instead"""
@@ -21,10 +22,6 @@ class TestSMSSystem:
         }
         self.sms_log.append(sms_record)
         
-        # Save to file
-        with open("sms_log.json", "w", encoding="utf-8") as f:
-            json.dump(self.sms_log, f, indent=2, ensure_ascii=False)
-        
         print(f"📱 MOCK SMS SENT:")
         print(f"   To: {to_number}")
         print(f"   Message: {message}")
@@ -57,6 +54,6 @@ if __name__ == "__main__":
     success, msg = sms.send_animal_exit_alert("+94719563015")
     print(f"Animal Exit: {'✅' if success else '❌'} {msg}")
     
-    print("\n📋 SMS Log saved to: sms_log.json")
+    print("\n📋 SMS Log saved to: sms_log.jsonl")
     print("🔧 To use real SMS, update config.json with valid Twilio credentials")
 
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Tiny test classifier
+Writes a very small ONNX model for trying the classifier stage offline,
+without the onnx package or a download. It is a toy: it only looks at the
+mean colour of a crop (GlobalAveragePool -> Gemm -> Softmax), so a light
+grey crop is a "ගවයා", a dark one is "පසුබිම" and a red one is "මිනිසා".
+
+Usage:
+    python tests/make_test_model.py models/test_classifier.onnx
+
+and in config.json:
+    "classifier": {"enabled": true, "model": "models/test_classifier.onnx",
+                   "labels": ["ගවයා", "පසුබිම", "මිනිසා"], "input_size": 32}
+"""
+
+import os
+import struct
+import sys
+
+TEST_MODEL_LABELS = ["ගවයා", "පසුබිම", "මිනිසා"]
+
+# Logits from the mean B, G, R of a crop (0..1)
+WEIGHTS = [
+    [3.0, 3.0, 3.0],  # Light grey: the synthetic animal
+    [-3.0, -3.0, -3.0],  # Dark: background
+    [-4.0, -4.0, 8.0]  # Red: a person in a red shirt
+]
+BIAS = [-3.0, 3.0, 0.0]
+
+def varint(value):
+    """Encode a protobuf varint"""
+    out = b""
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out += bytes([byte | 0x80])
+        else:
+            return out + bytes([byte])
+
+def field(number, value):
+    """Encode one protobuf field (int -> varint, float -> fixed32, str/bytes -> length-delimited)"""
+    if isinstance(value, int):
+        return varint(number << 3) + varint(value)
+    if isinstance(value, float):
+        return varint(number << 3 | 5) + struct.pack("<f", value)
+    if isinstance(value, str):
+        value = value.encode("utf-8")
+    return varint(number << 3 | 2) + varint(len(value)) + value
+
+def tensor(name, dims, values):
+    """TensorProto holding float32 values"""
+    return (b"".join(field(1, d) for d in dims) + field(2, 1) + field(8, name) +
+            field(9, struct.pack(f"<{len(values)}f", *values)))
+
+def value_info(name, dims):
+    """ValueInfoProto of a float tensor (str dims are symbolic, e.g. the batch size)"""
+    shape = b"".join(field(1, field(2, d) if isinstance(d, str) else field(1, d)) for d in dims)
+    return field(1, name) + field(2, field(1, field(1, 1) + field(2, shape)))
+
+def node(op_type, inputs, outputs, **attributes):
+    """NodeProto with int attributes"""
+    attrs = b"".join(field(5, field(1, key) + field(3, value) + field(20, 2)) for key, value in attributes.items())
+    return (b"".join(field(1, i) for i in inputs) + b"".join(field(2, o) for o in outputs) +
+            field(3, outputs[0]) + field(4, op_type) + attrs)
+
+def build_test_model():
+    """Build the serialized ModelProto"""
+    graph = b"".join([
+        field(1, node("GlobalAveragePool", ["input"], ["pooled"])),
+        field(1, node("Flatten", ["pooled"], ["features"], axis=1)),
+        field(1, node("Gemm", ["features", "weights", "bias"], ["logits"], transB=1)),
+        field(1, node("Softmax", ["logits"], ["probabilities"], axis=1)),
+        field(2, "tiny_animal_classifier"),
+        field(5, tensor("weights", [len(WEIGHTS), 3], [w for row in WEIGHTS for w in row])),
+        field(5, tensor("bias", [len(BIAS)], BIAS)),
+        field(11, value_info("input", ["N", 3, 32, 32])),
+        field(12, value_info("probabilities", ["N", len(BIAS)]))
+    ])
+    opset = field(1, "") + field(2, 11)
+    return field(1, 6) + field(2, "make_test_model.py") + field(7, graph) + field(8, opset)
+
+def write_test_model(path):
+    """Write the tiny model to path"""
+    model_dir = os.path.dirname(path)
+    if model_dir and not os.path.exists(model_dir):
+        os.makedirs(model_dir)
+    with open(path, "wb") as f:
+        f.write(build_test_model())
+    return path
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print(__doc__)
+        sys.exit(1)
+    print(f"✅ Test model written to {write_test_model(sys.argv[1])}")
@@ -93,6 +93,428 @@ def test_detector():
         print(f"❌ AnimalDetector error: {e}")
         return False
 
+def test_frame_grabber():
+    """Test that the frame grabber hands out only the newest frame"""
+    print("\n🔍 Testing frame grabber...")
+    
+    try:
+        import numpy as np
+        from frame_grabber import FrameGrabber
+        
+        class FakeCamera:
+            def __init__(self):
+                self.count = 0
+            
+            def read(self):
+                time.sleep(0.005)
+                self.count += 1
+                return True, np.full((4, 4), self.count % 256, dtype=np.uint8)
+        
+        grabber = FrameGrabber(FakeCamera(), buffer_size=3)
+        grabber.start()
+        
+        first = grabber.read_latest(timeout=1.0)
+        time.sleep(0.1)  # Let the grabber run ahead of the reader
+        second = grabber.read_latest(timeout=1.0)
+        grabber.stop()
+        
+        if first is None or second is None or second[0] <= first[0]:
+            print("❌ Frame grabber did not return newer frames")
+            return False
+        
+        stats = grabber.get_stats()
+        print(f"✅ Frame grabber stats: {stats}")
+        
+        if stats['frames_processed'] != 2 or stats['frames_dropped'] == 0:
+            print("❌ Frame grabber counters are wrong")
+            return False
+        
+        return True
+    except Exception as e:
+        print(f"❌ FrameGrabber error: {e}")
+        return False
+
+def test_frame_sources():
+    """Test offline frame sources (synthetic, image directory, video file)"""
+    print("\n🔍 Testing frame sources...")
+    
+    try:
+        import tempfile
+        import cv2
+        from frame_sources import SyntheticSource, ImageDirectorySource, VideoFileSource
+        
+        # Fast mode should not be paced, realtime mode should follow the frame rate
+        for realtime, max_time in ((False, 0.5), (True, 2.0)):
+            source = SyntheticSource(width=160, height=90, fps=20, frame_count=20, realtime=realtime)
+            source.open()
+            start = time.time()
+            frames = 0
+            while source.read()[0]:
+                frames += 1
+            elapsed = time.time() - start
+            if frames != 20 or elapsed > max_time or (realtime and elapsed < 0.9):
+                print(f"❌ Synthetic source (realtime={realtime}): {frames} frames in {elapsed:.2f}s")
+                return False
+            print(f"✅ Synthetic source (realtime={realtime}): {frames} frames in {elapsed:.2f}s")
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            source = SyntheticSource(width=160, height=96, fps=10, frame_count=5)
+            source.open()
+            writer = cv2.VideoWriter(os.path.join(tmp, 'clip.avi'), cv2.VideoWriter_fourcc(*'MJPG'), 10, (160, 96))
+            for i in range(5):
+                _, frame = source.read()
+                cv2.imwrite(os.path.join(tmp, f'frame_{i:03d}.png'), frame)
+                writer.write(frame)
+            writer.release()
+            
+            images = ImageDirectorySource(tmp, fps=10)
+            video = VideoFileSource(os.path.join(tmp, 'clip.avi'))
+            for name, replay in (("images", images), ("video", video)):
+                if not replay.open():
+                    print(f"❌ {name} source did not open")
+                    return False
+                count = 0
+                while replay.read()[0]:
+                    count += 1
+                replay.release()
+                if count != 5:
+                    print(f"❌ {name} source returned {count} frames")
+                    return False
+                print(f"✅ {name} source replayed {count} frames")
+        
+        return True
+    except Exception as e:
+        print(f"❌ Frame source error: {e}")
+        return False
+
+def test_batch_analysis():
+    """Test offline batch analysis on a generated recording"""
+    print("\n🔍 Testing batch analysis...")
+    
+    try:
+        import tempfile
+        import cv2
+        from frame_sources import SyntheticSource
+        from batch_analyze import analyze_video
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'night.avi')
+            source = SyntheticSource(width=320, height=180, fps=10, frame_count=300)
+            source.open()
+            writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'MJPG'), 10, (320, 180))
+            while True:
+                ret, frame = source.read()
+                if not ret:
+                    break
+                writer.write(frame)
+            writer.release()
+            
+            result = analyze_video(path, overrides={"analysis_resolution": None})
+        
+        events = [(e['event'], e['video_timestamp']) for e in result['events']]
+        print(f"✅ Batch result: {result['frames']} frames at {result['fps']} fps, events: {events}")
+        
+        if result['frames'] != 300 or result['enter_events'] < 1 or result['exit_events'] < 1:
+            print("❌ Expected ENTER and EXIT events in the generated recording")
+            return False
+        
+        return True
+    except Exception as e:
+        print(f"❌ Batch analysis error: {e}")
+        return False
+
+def test_frame_broadcaster():
+    """Test that the MJPEG broadcaster fans one frame out to every client"""
+    print("\n🔍 Testing frame broadcaster...")
+    
+    try:
+        import threading
+        from frame_broadcaster import FrameBroadcaster, get_placeholder_part
+        
+        broadcaster = FrameBroadcaster()
+        clients = [broadcaster.stream() for _ in range(10)]
+        
+        # First part is the cached placeholder, encoded once for everybody
+        first_parts = [next(client) for client in clients]
+        if any(part is not get_placeholder_part() for part in first_parts):
+            print("❌ Clients did not get the shared placeholder")
+            return False
+        
+        received = []
+        def read_next(client):
+            received.append(next(client))
+        
+        threads = [threading.Thread(target=read_next, args=(client,)) for client in clients]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.1)
+        broadcaster.publish(b'jpeg-1')
+        for thread in threads:
+            thread.join(timeout=2.0)
+        
+        if len(received) != 10 or len(set(map(id, received))) != 1:
+            print("❌ Frame was not fanned out as one shared part")
+            return False
+        print(f"✅ {len(received)} clients woken by one publish, {broadcaster.get_subscriber_count()} subscribers")
+        
+        # A slow client only gets the newest frame
+        broadcaster.publish(b'jpeg-2')
+        broadcaster.publish(b'jpeg-3')
+        if b'jpeg-3' not in next(clients[0]):
+            print("❌ Slow client did not skip to the newest frame")
+            return False
+        print("✅ Slow client skipped to the newest frame")
+        
+        for client in clients:
+            client.close()
+        return broadcaster.get_subscriber_count() == 0
+    except Exception as e:
+        print(f"❌ FrameBroadcaster error: {e}")
+        return False
+
+def test_stream_profiles():
+    """Test that stream profiles control resolution and JPEG size"""
+    print("\n🔍 Testing stream profiles...")
+    
+    try:
+        import cv2
+        import numpy as np
+        from stream_profiles import load_stream_profiles, get_default_profile, encode_frame
+        
+        config = {"default_stream_profile": "mobile"}
+        profiles = load_stream_profiles(config)
+        if get_default_profile(config) != "mobile" or get_default_profile({"default_stream_profile": "x"}) not in profiles:
+            print("❌ Default stream profile not resolved")
+            return False
+        
+        frame = np.random.default_rng(0).integers(0, 255, (720, 1280, 3), dtype=np.uint8)
+        sizes = {}
+        for name, profile in profiles.items():
+            jpeg_bytes = encode_frame(frame, profile)
+            decoded = cv2.imdecode(np.frombuffer(jpeg_bytes, np.uint8), cv2.IMREAD_COLOR)
+            if decoded.shape[1] > profile["width"] or decoded.shape[0] > profile["height"]:
+                print(f"❌ {name} frame is {decoded.shape[1]}x{decoded.shape[0]}")
+                return False
+            sizes[name] = len(jpeg_bytes)
+        
+        print(f"✅ JPEG sizes per profile: {sizes}")
+        
+        # A zero fps would divide by zero on every streamed frame, a negative one would never throttle
+        checked = load_stream_profiles({"stream_profiles": {
+            "ok": {"fps": 2}, "still": {"fps": 0}, "backwards": {"fps": -1}, "tiny": {"width": 0}, "raw": {"quality": 0}
+        }})
+        if list(checked) != ["ok"] or list(load_stream_profiles({"stream_profiles": {"still": {"fps": 0}}})) != list(profiles):
+            print(f"❌ Invalid stream profiles accepted: {checked}")
+            return False
+        print("✅ Invalid stream profiles skipped")
+        return sizes["thumbnail"] < sizes["mobile"] < sizes["full"]
+    except Exception as e:
+        print(f"❌ Stream profile error: {e}")
+        return False
+
+def test_event_bus():
+    """Test push updates and heartbeat of the SSE event bus"""
+    print("\n🔍 Testing event bus...")
+    
+    try:
+        from event_bus import EventBus
+        
+        bus = EventBus(max_queue_size=2)
+        stream = bus.stream(initial_messages=[('status', {'status': 'SAFE'})], heartbeat_interval=0.2)
+        
+        if not next(stream).startswith('event: status'):
+            print("❌ Initial status snapshot missing")
+            return False
+        
+        bus.publish('event', {'event': 'ENTER'})
+        message = next(stream)
+        if 'ENTER' not in message:
+            print(f"❌ Unexpected message: {message}")
+            return False
+        print("✅ ENTER event pushed to subscriber")
+        
+        if not next(stream).startswith('event: heartbeat'):
+            print("❌ Heartbeat missing while idle")
+            return False
+        print("✅ Heartbeat sent while idle")
+        
+        # A stalled client keeps only the newest messages
+        for i in range(5):
+            bus.publish('status', {'n': i})
+        if '"n": 3' not in next(stream) or '"n": 4' not in next(stream):
+            print("❌ Stalled client did not keep the newest messages")
+            return False
+        
+        stream.close()
+        return bus.get_subscriber_count() == 0
+    except Exception as e:
+        print(f"❌ EventBus error: {e}")
+        return False
+
+def test_camera_registry():
+    """Test camera registry loading and legacy single-camera fallback"""
+    print("\n🔍 Testing camera registry...")
+    
+    try:
+        from camera_manager import load_camera_registry
+        
+        legacy = load_camera_registry({"camera_index": 2})
+        if len(legacy) != 1 or legacy[0]["camera_index"] != 2:
+            print("❌ Legacy camera_index was not converted to a registry entry")
+            return False
+        print(f"✅ Legacy config registry: {legacy[0]['id']}")
+        
+        registry = load_camera_registry({"cameras": [
+            {"id": "north", "camera_index": 0},
+            {"camera_index": 1, "enabled": False}
+        ]})
+        ids = [camera["id"] for camera in registry]
+        if ids != ["north", "camera2"] or registry[1]["enabled"]:
+            print(f"❌ Unexpected registry: {ids}")
+            return False
+        print(f"✅ Camera registry: {ids}")
+        
+        return True
+    except Exception as e:
+        print(f"❌ Camera registry error: {e}")
+        return False
+
+def test_event_store():
+    """Test event store CSV migration, indexed queries and CSV export"""
+    print("\n🔍 Testing event store...")
+    
+    try:
+        import tempfile
+        from event_store import EventStore
+        
+        temp_dir = tempfile.mkdtemp()
+        legacy_csv = os.path.join(temp_dir, "events.csv")
+        with open(legacy_csv, 'w', newline='', encoding='utf-8') as f:
+            f.write("timestamp,event,description_sinhala,description_english\n")
+            f.write("2025-01-01 06:00:00,ENTER,සතුන් වත්තට ඇතුළු වී ඇත,Animals entered the farm\n")
+            f.write("2025-01-01 06:05:00,EXIT,සතුන් වත්තෙන් පිටවී ගොස් ඇත,Animals left the farm\n")
+        
+        db_path = os.path.join(temp_dir, "events.db")
+        store = EventStore(db_path, legacy_csv=legacy_csv)
+        store.close()
+        store = EventStore(db_path, legacy_csv=legacy_csv)  # Second open must not import again
+        if store.count() != 2:
+            print(f"❌ Legacy CSV imported {store.count()} rows, expected 2")
+            return False
+        print("✅ Legacy CSV migrated once")
+        
+        store.append("ENTER", "සතුන් වත්තට ඇතුළු වී ඇත", "Animals entered the farm",
+                     timestamp="2025-01-02 07:00:00", camera_id="gate1")
+        today = store.query(since="2025-01-02 00:00:00", until="2025-01-03 00:00:00")
+        if len(today) != 1 or today[0]["camera_id"] != "gate1":
+            print(f"❌ Unexpected time-range query result: {today}")
+            return False
+        if store.count(event="ENTER") != 2 or store.last_event("ENTER")["timestamp"] != "2025-01-02 07:00:00":
+            print("❌ Event type query failed")
+            return False
+        print("✅ Time-range and event type queries")
+        
+        from event_store import encode_cursor, decode_cursor
+        first_page = store.query(limit=2, newest_first=True)
+        next_page = store.query(limit=2, newest_first=True, after=decode_cursor(encode_cursor(first_page[-1])))
+        streamed = list(store.iter_events(newest_first=True, batch_size=2))
+        if [e["id"] for e in first_page + next_page] != [e["id"] for e in streamed] or len(streamed) != 3:
+            print("❌ Cursor pagination does not match the streamed history")
+            return False
+        print("✅ Cursor pagination")
+        
+        export_csv = os.path.join(temp_dir, "export.csv")
+        if store.export_csv(export_csv) != 3:
+            print("❌ CSV export row count mismatch")
+            return False
+        print("✅ CSV export")
+        
+        store.close()
+        return True
+    except Exception as e:
+        print(f"❌ Event store error: {e}")
+        return False
+
+def test_event_statistics():
+    """Test incrementally maintained statistics and rollups"""
+    print("\n🔍 Testing event statistics...")
+    
+    try:
+        import tempfile
+        from event_store import EventStore
+        from event_statistics import StatisticsAggregator
+        
+        store = EventStore(os.path.join(tempfile.mkdtemp(), "events.db"), legacy_csv=None)
+        store.append("ENTER", "", "", timestamp="2025-01-01 06:10:00")
+        store.append("EXIT", "", "", timestamp="2025-01-01 06:12:00", duration=120)
+        store.append("ENTER", "", "", timestamp="2025-01-02 21:00:00")
+        
+        statistics = StatisticsAggregator()
+        statistics.rebuild(store)
+        statistics.record_event("EXIT", "2025-01-02 21:00:30", 30)
+        store.close()
+        
+        summary = statistics.get_summary(today="2025-01-02")
+        expected = {"total_events": 4, "today_events": 2, "animals_detected": 2,
+                    "total_intrusion_seconds": 150.0, "last_detection": "2025-01-02 21:00:00"}
+        if any(summary[key] != value for key, value in expected.items()):
+            print(f"❌ Unexpected summary: {summary}")
+            return False
+        print(f"✅ Summary: {summary['total_events']} events, {summary['total_intrusion_seconds']}s intrusions")
+        
+        daily = statistics.get_daily_rollup(3, end_date="2025-01-02")
+        hourly = statistics.get_hourly_rollup("2025-01-01")
+        if [day["ENTER"] for day in daily] != [0, 1, 1] or hourly[6]["EXIT"] != 1:
+            print("❌ Daily/hourly rollups are wrong")
+            return False
+        if statistics.get_hour_of_day_histogram()[21] != 1:
+            print("❌ Hour of day histogram is wrong")
+            return False
+        print("✅ Daily and hourly rollups")
+        
+        return True
+    except Exception as e:
+        print(f"❌ Event statistics error: {e}")
+        return False
+
+def test_event_writer():
+    """Test batched background event writes, flush and drain on stop"""
+    print("\n🔍 Testing event writer...")
+    
+    try:
+        import tempfile
+        from event_store import EventStore
+        from event_writer import EventWriter
+        
+        store = EventStore(os.path.join(tempfile.mkdtemp(), "events.db"), legacy_csv=None)
+        writer = EventWriter(store, batch_size=10, flush_interval=30.0)
+        writer.start()
+        
+        for i in range(25):
+            writer.write("ENTER", "", "", f"2025-01-01 06:00:{i:02d}")
+        if not writer.flush(timeout=5.0) or store.count() != 25:
+            print(f"❌ Flush wrote {store.count()} of 25 events")
+            return False
+        stats = writer.get_stats()
+        if stats["batches_written"] < 3 or stats["queue_depth"] != 0:
+            print(f"❌ Unexpected writer stats: {stats}")
+            return False
+        print(f"✅ Flushed 25 events in {stats['batches_written']} batches (avg {stats['avg_flush_ms']} ms)")
+        
+        for i in range(3):
+            writer.write("EXIT", "", "", f"2025-01-01 07:00:{i:02d}")
+        writer.stop()
+        if store.count() != 28:
+            print(f"❌ Stop did not drain the queue ({store.count()} of 28 events)")
+            return False
+        print("✅ Queue drained on stop")
+        
+        store.close()
+        return True
+    except Exception as e:
+        print(f"❌ Event writer error: {e}")
+        return False
+
 def test_state_machine():
     """Test state machine functionality"""
     print("\n🔍 Testing state machine...")
@@ -131,6 +553,272 @@ def test_sms_system():
         print(f"❌ SMSSystem error: {e}")
         return False
 
+def test_sms_outbox():
+    """Test queued SMS delivery with retries against a local fake Twilio server"""
+    print("\n🔍 Testing SMS outbox...")
+    
+    try:
+        import tempfile
+        import threading
+        from http.server import BaseHTTPRequestHandler, HTTPServer
+        from sms_system import SMSSystem
+        
+        requests_seen = []
+        
+        class FakeTwilioHandler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                requests_seen.append(self.rfile.read(int(self.headers['Content-Length'])).decode())
+                # Fail the first attempt to exercise the retry path
+                status = 500 if len(requests_seen) == 1 else 201
+                body = json.dumps({"sid": f"SM{len(requests_seen)}"}).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def log_message(self, *args):
+                pass
+        
+        server = HTTPServer(('127.0.0.1', 0), FakeTwilioHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        
+        temp_dir = tempfile.mkdtemp()
+        config_file = os.path.join(temp_dir, "config.json")
+        with open(config_file, 'w', encoding='utf-8') as f:
+            json.dump({
+                "farmer_phone": "+94700000000",
+                "twilio_sid": "AC_TEST", "twilio_auth": "secret", "twilio_from": "+15550000000",
+                "twilio_base_url": f"http://127.0.0.1:{server.server_port}",
+                "sms_outbox": {"db_path": os.path.join(temp_dir, "outbox.db"), "base_delay": 0.05}
+            }, f)
+        
+        sms = SMSSystem(config_file)
+        sms.start()
+        start = time.time()
+        success, message = sms.send_animal_enter_alert()
+        enqueue_time = time.time() - start
+        if not success:
+            print(f"❌ Enqueue failed: {message}")
+            return False
+        print(f"✅ Alert queued in {enqueue_time * 1000:.1f} ms: {message}")
+        
+        outbox_message = None
+        for _ in range(100):
+            outbox_message = sms.outbox.get_recent(1)[0]
+            if outbox_message["status"] == "sent":
+                break
+            time.sleep(0.05)
+        sms.stop()
+        server.shutdown()
+        
+        if outbox_message["status"] != "sent" or outbox_message["attempts"] != 2:
+            print(f"❌ Unexpected delivery: {outbox_message['status']} after {outbox_message['attempts']} attempts")
+            return False
+        if "To=%2B94700000000" not in requests_seen[-1]:
+            print("❌ Fake server did not receive the farmer's number")
+            return False
+        print(f"✅ Delivered after a retry: {outbox_message['result']}")
+        
+        return True
+    except Exception as e:
+        print(f"❌ SMS outbox error: {e}")
+        return False
+
+def test_sms_log():
+    """Test the append-only SMS log, rotation, paging and legacy conversion"""
+    print("\n🔍 Testing SMS log...")
+    
+    try:
+        import tempfile
+        from sms_log import SMSLog
+        
+        temp_dir = tempfile.mkdtemp()
+        legacy_json = os.path.join(temp_dir, "sms_log.json")
+        with open(legacy_json, 'w', encoding='utf-8') as f:
+            json.dump([{"timestamp": "2025-01-01 06:00:00", "to": "+94700000000", "message": "පැරණි", "status": "SENT (MOCK)"}], f)
+        
+        log_path = os.path.join(temp_dir, "sms_log.jsonl")
+        sms_log = SMSLog(log_path, max_bytes=400, backup_count=2, legacy_json=legacy_json)
+        for i in range(10):
+            sms_log.append({"timestamp": f"2025-01-02 06:00:{i:02d}", "to": "+94700000000",
+                            "message": f"පණිවිඩය {i}", "status": "SENT (MOCK)"})
+        
+        if len(sms_log.get_files()) != 3 or os.path.getsize(log_path) > 400:
+            print(f"❌ Log was not rotated: {sms_log.get_files()}")
+            return False
+        print(f"✅ Rotated into {len(sms_log.get_files())} files")
+        
+        newest = sms_log.tail(3)
+        if [record["message"] for record in newest] != ["පණිවිඩය 9", "පණිවිඩය 8", "පණිවිඩය 7"]:
+            print(f"❌ Unexpected tail: {newest}")
+            return False
+        page = sms_log.paginate(offset=3, limit=2)
+        if [record["message"] for record in page] != ["පණිවිඩය 6", "පණිවිඩය 5"]:
+            print(f"❌ Unexpected page: {page}")
+            return False
+        print("✅ Tail and pagination")
+        
+        # A crash mid-write leaves a partial line that readers must skip
+        sms_log.close()
+        with open(log_path, 'a', encoding='utf-8') as f:
+            f.write('{"timestamp": "2025-01-02')
+        if sms_log.tail(1)[0]["message"] != "පණිවිඩය 9":
+            print("❌ Partial line was not skipped")
+            return False
+        
+        converted = SMSLog(os.path.join(temp_dir, "converted.jsonl"), legacy_json=legacy_json)
+        if [record["message"] for record in converted.tail()] != ["පැරණි"]:
+            print("❌ Legacy sms_log.json was not converted")
+            return False
+        print("✅ Legacy JSON array converted")
+        
+        return True
+    except Exception as e:
+        print(f"❌ SMS log error: {e}")
+        return False
+
+def test_alert_policy():
+    """Test SMS rate limiting and digest aggregation"""
+    print("\n🔍 Testing alert policy...")
+    
+    try:
+        from alert_policy import AlertPolicy
+        
+        now = [1000.0]
+        sent = []
+        policy = AlertPolicy({"min_interval": 60, "bucket_capacity": 2, "tokens_per_hour": 1},
+                             lambda to, message: sent.append((to, message)) or (True, "ok"),
+                             clock=lambda: now[0])
+        
+        # A flickering detection: three ENTER/EXIT pairs within a minute
+        for _ in range(3):
+            policy.submit("+94700000000", "ENTER", "ENTER")
+            now[0] += 5
+            policy.submit("+94700000000", "EXIT", "EXIT", duration=5)
+            now[0] += 5
+        if sent != [("+94700000000", "ENTER")]:
+            print(f"❌ Expected only the first alert to go out, got {sent}")
+            return False
+        print("✅ Burst held back after the first alert")
+        
+        now[0] = 1000.0 + 61
+        policy.flush_due()
+        if len(sent) != 2 or "2ක්" not in sent[1][1] or "15s" not in sent[1][1]:
+            print(f"❌ Unexpected digest: {sent[-1]}")
+            return False
+        print(f"✅ Digest: {sent[1][1]}")
+        
+        # Bucket is now empty (capacity 2, 1 token/hour) - the minimum interval alone is not enough
+        now[0] += 120
+        policy.submit("+94700000000", "ENTER", "ENTER")
+        if len(sent) != 2 or policy.get_stats()["alerts_held"] != 1:
+            print("❌ Token bucket did not limit the third SMS")
+            return False
+        print("✅ Token bucket limits sustained rate")
+        
+        # New limits apply without a restart, and the held alert is still there
+        policy.configure({"min_interval": 60, "bucket_capacity": 2, "tokens_per_hour": 3600})
+        now[0] += 2
+        policy.flush_due()
+        if len(sent) != 3 or policy.get_stats()["alerts_held"] != 0:
+            print(f"❌ New rate limit not applied: {policy.get_stats()}")
+            return False
+        print("✅ Reconfigured limits applied to existing recipients")
+        
+        return True
+    except Exception as e:
+        print(f"❌ Alert policy error: {e}")
+        return False
+
+def test_sms_recipients():
+    """Test per-role opt-ins and concurrent fan-out over reused connections"""
+    print("\n🔍 Testing SMS recipients...")
+    
+    try:
+        import tempfile
+        import threading
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        from sms_system import SMSSystem
+        
+        class SlowFakeTwilioHandler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # Keep connections alive like the real API
+            
+            def do_POST(self):
+                self.rfile.read(int(self.headers['Content-Length']))
+                time.sleep(0.3)  # Network round trip
+                body = b'{"sid": "SM1"}'
+                self.send_response(201)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def log_message(self, *args):
+                pass
+        
+        server = ThreadingHTTPServer(('127.0.0.1', 0), SlowFakeTwilioHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        
+        temp_dir = tempfile.mkdtemp()
+        config_file = os.path.join(temp_dir, "config.json")
+        with open(config_file, 'w', encoding='utf-8') as f:
+            json.dump({
+                "farmer_phone": "+94700000001",
+                "recipients": [
+                    {"name": "Watchman", "phone": "+94700000002", "role": "watchman", "alerts": ["ENTER", "EXIT", "TEST"]},
+                    {"name": "Neighbour 1", "phone": "+94700000003", "role": "neighbour", "alerts": ["ENTER", "TEST"]},
+                    {"name": "Neighbour 2", "phone": "+94700000004", "role": "neighbour", "alerts": ["ENTER", "TEST"]},
+                    {"name": "Neighbour 3", "phone": "+94700000005", "role": "neighbour"}
+                ],
+                "twilio_sid": "AC_TEST", "twilio_auth": "secret", "twilio_from": "+15550000000",
+                "twilio_base_url": f"http://127.0.0.1:{server.server_port}",
+                "sms_outbox": {"db_path": os.path.join(temp_dir, "outbox.db"), "workers": 5}
+            }, f)
+        
+        sms = SMSSystem(config_file)
+        exit_phones = [recipient["phone"] for recipient in sms.get_recipients("EXIT")]
+        if exit_phones != ["+94700000001", "+94700000002"] or len(sms.get_recipients("ENTER")) != 5:
+            print(f"❌ Unexpected opt-ins: EXIT -> {exit_phones}")
+            return False
+        print("✅ Role opt-ins (neighbours get ENTER only)")
+        
+        start = time.time()
+        success, message = sms.send_test_sms()
+        elapsed = time.time() - start
+        if not success or "4/4" not in message or elapsed > 0.9:
+            print(f"❌ Fan-out took {elapsed:.2f}s: {message}")
+            return False
+        print(f"✅ 4 recipients in {elapsed:.2f}s (one round trip is 0.3s)")
+        
+        opened = sms.http_client.connections_opened
+        sms.send_test_sms()
+        server.shutdown()
+        if sms.http_client.connections_opened != opened:
+            print("❌ Connections were not reused")
+            return False
+        print(f"✅ {opened} pooled connections reused")
+        
+        sms.stop()
+        try:
+            sms.outbox.get_stats()
+            print("❌ Outbox database left open after stop")
+            return False
+        except Exception:
+            pass
+        try:
+            sms.executor.submit(print)
+            print("❌ Fan-out thread pool left running after stop")
+            return False
+        except RuntimeError:
+            pass
+        print("✅ Thread pool and outbox database released on stop")
+        
+        return True
+    except Exception as e:
+        print(f"❌ SMS recipients error: {e}")
+        return False
+
 def test_alarm_system():
     """Test alarm system initialization"""
     print("\n🔍 Testing alarm system...")
@@ -148,6 +836,549 @@ def test_alarm_system():
         print(f"❌ AlarmSystem error: {e}")
         return False
 
+def test_alarm_worker():
+    """Test the alarm command worker with the silent audio backend"""
+    print("\n🔍 Testing alarm worker...")
+    
+    try:
+        import tempfile
+        from alarm_system import AlarmSystem
+        
+        alarm_file = os.path.join(tempfile.mkdtemp(), "alert.wav")
+        with open(alarm_file, 'wb') as f:
+            f.write(b"RIFF")
+        
+        alarm = AlarmSystem(alarm_file, audio_backend="null")
+        alarm.start_alarm()
+        for _ in range(50):
+            if alarm.is_playing_alarm():
+                break
+            time.sleep(0.01)
+        if not alarm.is_playing_alarm():
+            print("❌ Alarm did not start")
+            return False
+        
+        start = time.perf_counter()
+        alarm.stop_alarm()
+        stop_time = time.perf_counter() - start
+        if alarm.is_playing_alarm() or stop_time > 0.05:
+            print(f"❌ Stop took {stop_time * 1000:.1f} ms")
+            return False
+        print(f"✅ Alarm stopped in {stop_time * 1000:.1f} ms")
+        
+        alarm.test_alarm(duration=0.2)
+        time.sleep(0.05)
+        playing_during_test = alarm.is_playing_alarm()
+        time.sleep(0.3)
+        if not playing_during_test or alarm.is_playing_alarm():
+            print("❌ Test playback did not stop by itself")
+            return False
+        print("✅ Test playback stops after its duration")
+        
+        alarm.play_mode("siren")
+        alarm.play_mode("chime")
+        time.sleep(0.05)
+        if alarm.mode != "siren":
+            print(f"❌ Chime replaced the siren ({alarm.mode})")
+            return False
+        alarm.play_mode("pulse")
+        time.sleep(0.05)
+        if alarm.mode != "pulse":
+            print(f"❌ Alarm did not escalate to pulse ({alarm.mode})")
+            return False
+        alarm.stop_alarm()
+        alarm.play_mode("chime")
+        time.sleep(1.2)
+        if alarm.is_playing_alarm():
+            print("❌ Chime did not stop after one play")
+            return False
+        print("✅ Alarm modes only escalate, chime plays once")
+        
+        alarm.cleanup()
+        return True
+    except Exception as e:
+        print(f"❌ Alarm worker error: {e}")
+        return False
+
+def test_alarm_escalation():
+    """Test the escalation plan on a hand-turned timer wheel"""
+    print("\n🔍 Testing alarm escalation...")
+    
+    try:
+        from timer_wheel import TimerWheel
+        from escalation import EscalationScheduler, load_escalation_plan
+        
+        # Timers further away than one turn of the wheel must wait out the extra rounds
+        wheel = TimerWheel(tick=0.5, slots=4)
+        fired = []
+        wheel.schedule(5.0, lambda: fired.append("late"))
+        cancelled = wheel.schedule(1.0, lambda: fired.append("cancelled"))
+        wheel.cancel(cancelled)
+        for _ in range(9):
+            wheel.advance()
+        if fired:
+            print(f"❌ Timer fired early: {fired}")
+            return False
+        wheel.advance()
+        if fired != ["late"] or wheel.get_pending_count() != 0:
+            print(f"❌ Timer wheel fired {fired}")
+            return False
+        print("✅ Timer wheel fires on the right tick across rounds")
+        
+        plan = load_escalation_plan({"escalation_plan": [
+            {"after": 30, "action": "siren"}, {"after": 0, "action": "chime"},
+            {"after": 120, "action": "sms"}, {"after": 10, "action": "explode"}]})
+        if [stage["action"] for stage in plan] != ["chime", "siren", "sms"]:
+            print(f"❌ Plan not sorted/validated: {plan}")
+            return False
+        
+        stages = []
+        wheel = TimerWheel(tick=1.0, slots=64)
+        scheduler = EscalationScheduler(plan, lambda key, stage: stages.append((key, stage["action"])), wheel)
+        scheduler.begin("gate1")
+        if stages != [("gate1", "chime")]:
+            print(f"❌ 0s stage did not run at once: {stages}")
+            return False
+        for _ in range(30):
+            wheel.advance()
+        scheduler.begin("gate2")
+        if stages[1:] != [("gate1", "siren"), ("gate2", "chime")]:
+            print(f"❌ Wrong stages after 30s: {stages}")
+            return False
+        
+        scheduler.end("gate1")
+        for _ in range(200):
+            wheel.advance()
+        if ("gate1", "sms") in stages or stages[-1] != ("gate2", "sms"):
+            print(f"❌ Ended intrusion kept escalating: {stages}")
+            return False
+        if scheduler.get_status()["active"] != {"gate2": "sms"}:
+            print(f"❌ Wrong escalation status: {scheduler.get_status()}")
+            return False
+        scheduler.cancel_all()
+        if wheel.get_pending_count() != 0:
+            print("❌ Timers left after cancel_all")
+            return False
+        print("✅ Intrusions escalate independently and stop on EXIT")
+        return True
+    except Exception as e:
+        print(f"❌ Alarm escalation error: {e}")
+        return False
+
+def test_tracker():
+    """Test stable track ids, velocity and the bounded track table"""
+    print("\n🔍 Testing object tracker...")
+    
+    try:
+        from tracker import ObjectTracker
+        
+        tracker = ObjectTracker(max_tracks=4)
+        ids = set()
+        for i in range(20):
+            # Two animals: one walking right with 1px jitter, one standing still
+            jitter = i % 2
+            slots = tracker.update([(10 + 5 * i, 50 + jitter, 40, 30 + jitter), (300, 200, 60, 40)], i * 0.1)
+            ids.update(int(tracker.ids[slot]) for slot in slots)
+        if ids != {1, 2}:
+            print(f"❌ Track ids not stable: {sorted(ids)}")
+            return False
+        walker = next(track for track in tracker.get_tracks() if track["id"] == 1)
+        if not 40 < walker["velocity"][0] < 60 or abs(walker["age"] - 1.9) > 1e-6:
+            print(f"❌ Wrong velocity/age: {walker}")
+            return False
+        if tracker.distinct_count != 2:
+            print(f"❌ Expected 2 distinct animals, got {tracker.distinct_count}")
+            return False
+        print("✅ Jittering boxes keep their ids, velocity and age are tracked")
+        
+        # More boxes than slots never grows the table
+        tracker.update([(i * 100, 400, 30, 30) for i in range(8)], 2.0)
+        if len(tracker.get_tracks()) != 4:
+            print(f"❌ Track table grew to {len(tracker.get_tracks())}")
+            return False
+        
+        tracker.update([], 10.0)
+        tracker.reset_count()
+        if tracker.get_tracks() or tracker.distinct_count != 0:
+            print("❌ Lost tracks were not expired")
+            return False
+        print("✅ Track table stays bounded and expires lost tracks")
+        return True
+    except Exception as e:
+        print(f"❌ Tracker error: {e}")
+        return False
+
+def test_contour_filter():
+    """Test that the contour filter keeps an animal-shaped blob and drops grass, noise and solid blocks"""
+    print("\n🔍 Testing contour filter...")
+    
+    try:
+        import cv2
+        import numpy as np
+        from detection_backends import BULK_FILTER_MIN_POINTS, filter_animal_contours, filter_contours_bulk
+        
+        mask = np.zeros((360, 640), dtype=np.uint8)
+        cv2.ellipse(mask, (200, 180), (60, 35), 0, 0, 360, 255, -1)  # Body
+        cv2.rectangle(mask, (150, 195), (175, 240), 255, -1)  # Legs
+        cv2.rectangle(mask, (225, 195), (250, 240), 255, -1)
+        for x in range(20, 600, 37):
+            cv2.line(mask, (x, 350), (x + 5, 280), 255, 3)  # Grass
+        cv2.rectangle(mask, (400, 50), (480, 300), 255, -1)  # Solid block
+        mask[np.random.default_rng(0).random(mask.shape) < 0.01] = 255  # Speckle
+        
+        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        kept = filter_animal_contours(contours, 1000, 20)
+        if len(kept) != 1 or cv2.boundingRect(kept[0])[:2] != (140, 145):
+            print(f"❌ Expected only the animal, kept {[cv2.boundingRect(c) for c in kept]}")
+            return False
+        print(f"✅ 1 of {len(contours)} contours kept")
+        
+        # A mask full of grass blades goes through the bulk path and must keep the same contours
+        rng = np.random.default_rng(1)
+        for _ in range(600):
+            x, y = int(rng.integers(0, 640)), int(rng.integers(0, 360))
+            cv2.line(mask, (x, y), (x + int(rng.integers(-8, 9)), y - int(rng.integers(5, 40))), 255, int(rng.integers(2, 5)))
+        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        one_by_one = [contour for contour in contours if filter_animal_contours([contour], 250, 10)]
+        bulk = filter_contours_bulk(contours, 250, 10)
+        if sum(map(len, contours)) < BULK_FILTER_MIN_POINTS or len(bulk) != len(one_by_one) or \
+                not all(a is b for a, b in zip(bulk, one_by_one)):
+            print(f"❌ Bulk filter kept {len(bulk)} contours, the per-contour loop {len(one_by_one)}")
+            return False
+        print(f"✅ Bulk filter agrees on a grass-heavy mask ({len(contours)} contours, {len(bulk)} kept)")
+        return True
+    except Exception as e:
+        print(f"❌ Contour filter error: {e}")
+        return False
+
+def test_detection_zones():
+    """Test that detection only looks inside include zones and ignores exclude zones"""
+    print("\n🔍 Testing detection zones...")
+    
+    try:
+        import cv2
+        import numpy as np
+        from detector import AnimalDetector
+        from zones import build_zone_mask, load_zones
+        
+        # Bottom 70% watched, right half excluded
+        zones = {"include": [[[0, 0.3], [1, 0.3], [1, 1], [0, 1]]],
+                 "exclude": [[[0.5, 0], [1, 0], [1, 1], [0.5, 1]]]}
+        mask, rect = build_zone_mask(load_zones({"zones": zones}), 640, 360)
+        if rect != (0, 108, 320, 252) or mask is not None:
+            print(f"❌ Wrong zone crop: {rect}")
+            return False
+        _, rect = build_zone_mask(load_zones({"zones": {"exclude": zones["include"] + [[[0, 0], [1, 0], [1, 0.3], [0, 0.3]]]}}), 640, 360)
+        if rect[2] != 0:
+            print(f"❌ Fully excluded frame still has an active area: {rect}")
+            return False
+        
+        def count_detections(center_x):
+            detector = AnimalDetector("missing_config.json")
+            detector.config["zones"] = zones
+            detections = 0
+            for i in range(60):
+                frame = np.full((360, 640, 3), 40, dtype=np.uint8)
+                if i >= 40:
+                    x = center_x + (i - 40) * 3
+                    cv2.ellipse(frame, (x, 200), (60, 35), 0, 0, 360, (255, 255, 255), -1)
+                    cv2.rectangle(frame, (x - 50, 215), (x - 25, 260), (255, 255, 255), -1)
+                    cv2.rectangle(frame, (x + 25, 215), (x + 50, 260), (255, 255, 255), -1)
+                detections += detector.is_animal_motion(frame)[0]
+            return detections
+        
+        inside, excluded = count_detections(150), count_detections(450)
+        if inside == 0 or excluded != 0:
+            print(f"❌ Detections inside={inside} excluded={excluded}")
+            return False
+        print(f"✅ Motion inside the zone detected ({inside} frames), excluded motion ignored")
+        return True
+    except Exception as e:
+        print(f"❌ Detection zones error: {e}")
+        return False
+
+def test_motion_gate():
+    """Test that the motion gate skips static frames but still refreshes the background"""
+    print("\n🔍 Testing motion gate...")
+    
+    try:
+        import cv2
+        import numpy as np
+        from motion_gate import MotionGate
+        
+        gate = MotionGate({"refresh_interval": 1.0})
+        static = np.full((720, 1280, 3), 60, dtype=np.uint8)
+        noisy = [np.clip(static.astype(np.int16) + np.random.default_rng(i).integers(-3, 4, static.shape), 0, 255).astype(np.uint8)
+                 for i in range(3)]
+        passed = [gate.check(noisy[i % 3], i * 0.1) for i in range(30)]
+        # First frame, then one refresh per second of the 3 seconds
+        if sum(passed) != 3 or gate.get_stats()["refresh_passes"] != 2:
+            print(f"❌ Static scene passed {sum(passed)} frames: {gate.get_stats()}")
+            return False
+        
+        moving = static.copy()
+        cv2.rectangle(moving, (600, 300), (700, 400), (255, 255, 255), -1)
+        if not gate.check(moving, 3.05) or not gate.check(moving, 3.1, force=True):
+            print("❌ Changed or forced frame was skipped")
+            return False
+        
+        stats = gate.get_stats()
+        if stats["frames_skipped"] != 27 or abs(stats["hit_rate"] - 27 / 32) > 1e-9:
+            print(f"❌ Wrong gate counters: {stats}")
+            return False
+        
+        if not MotionGate({"enabled": False}).check(static, 0.0):
+            print("❌ Disabled gate skipped a frame")
+            return False
+        print(f"✅ Static frames skipped (hit rate {stats['hit_rate']:.0%}), motion and refreshes pass")
+        return True
+    except Exception as e:
+        print(f"❌ Motion gate error: {e}")
+        return False
+
+def test_frame_scheduler():
+    """Test frame pacing: processing time subtracted, idle after a quiet spell, instant ramp-up"""
+    print("\n🔍 Testing frame scheduler...")
+    
+    try:
+        from frame_scheduler import FrameScheduler
+        
+        now = [0.0]
+        scheduler = FrameScheduler({"active_fps": 10, "idle_fps": 2, "idle_after": 5.0}, clock=lambda: now[0])
+        
+        def run_frame(busy, active, min_fps=0):
+            scheduler.start_frame()
+            now[0] += busy
+            delay = scheduler.end_frame(active, min_fps)
+            now[0] += delay
+            return delay
+        
+        delay = run_frame(0.03, True)
+        if abs(delay - 0.07) > 1e-9:
+            print(f"❌ Processing time not subtracted: {delay}")
+            return False
+        
+        # Quiet for more than idle_after seconds at 10 fps, then idle
+        while now[0] < 5.5:
+            run_frame(0.03, False)
+        if scheduler.mode != "idle" or abs(run_frame(0.03, False) - 0.47) > 1e-9:
+            print(f"❌ Did not drop to the idle rate: {scheduler.get_stats()}")
+            return False
+        for _ in range(40):
+            run_frame(0.03, False)
+        stats = scheduler.get_stats()
+        if abs(stats["fps"] - 2.0) > 0.05 or abs(stats["duty_cycle"] - 0.06) > 0.01:
+            print(f"❌ Wrong idle stats: {stats}")
+            return False
+        
+        if abs(run_frame(0.03, False, min_fps=5) - 0.17) > 1e-9:
+            print("❌ Viewer frame rate not honoured")
+            return False
+        if abs(run_frame(0.03, True) - 0.07) > 1e-9 or scheduler.mode != "active":
+            print("❌ Motion did not ramp up at once")
+            return False
+        print(f"✅ Idle at {stats['fps']} fps ({stats['duty_cycle']:.0%} duty), active again on the first motion frame")
+        return True
+    except Exception as e:
+        print(f"❌ Frame scheduler error: {e}")
+        return False
+
+def test_detector_workspace():
+    """Test that the detector reuses its buffers and never draws on the captured frame"""
+    print("\n🔍 Testing detector workspace...")
+    
+    try:
+        import numpy as np
+        from detector import AnimalDetector
+        from frame_sources import SyntheticSource
+        
+        detector = AnimalDetector("missing_config.json")
+        detector.config["detection_frames"] = 5
+        detector.motion_gate.configure({"enabled": False})
+        source = SyntheticSource(frame_count=120)
+        source.open()
+        buffers = None
+        annotated = 0
+        for i in range(120):
+            ok, frame = source.read()
+            original = frame.copy()
+            result = detector.process_frame(frame, timestamp=i / 10.0)
+            if not np.array_equal(frame, original):
+                print(f"❌ Captured frame {i} was modified")
+                return False
+            if result and result[0] and result[1] is not frame:
+                annotated += 1
+            if i == 20:
+                buffers = {name: id(buffer) for name, buffer in detector.workspace.buffers.items() if name != "overlay"}
+        source.release()
+        
+        reused = {name: id(buffer) for name, buffer in detector.workspace.buffers.items() if name != "overlay"}
+        if not buffers or reused != buffers:
+            print(f"❌ Buffers were reallocated: {sorted(buffers or {})} -> {sorted(reused)}")
+            return False
+        if not annotated:
+            print("❌ No annotated overlay returned")
+            return False
+        print(f"✅ {len(buffers)} buffers reused, {annotated} annotated frames drawn on the overlay")
+        return True
+    except Exception as e:
+        print(f"❌ Detector workspace error: {e}")
+        return False
+
+def test_animal_classifier():
+    """Test the classifier stage with the tiny offline model: batched crops, species names, people rejected"""
+    print("\n🔍 Testing animal classifier...")
+    
+    try:
+        import tempfile
+        import numpy as np
+        from classifier import load_classifier
+        from detector import AnimalDetector
+        from frame_sources import draw_animal
+        from make_test_model import TEST_MODEL_LABELS, write_test_model
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            settings = {"enabled": True, "model": write_test_model(os.path.join(tmp, "tiny.onnx")),
+                        "labels": TEST_MODEL_LABELS, "input_size": 32, "max_batch": 2}
+            classifier = load_classifier({"classifier": settings})
+            
+            frame = np.full((200, 600, 3), 60, dtype=np.uint8)
+            frame[:, 200:400] = 170
+            frame[:, 400:] = (50, 50, 200)
+            labels = [label for label, _ in classifier.classify(frame, [(220, 20, 150, 150), (420, 20, 150, 150), (20, 20, 150, 150)])]
+            if labels != ["ගවයා", "මිනිසා", "පසුබිම"] or classifier.batches != 2:
+                print(f"❌ Wrong labels or batching: {labels}, {classifier.get_stats()}")
+                return False
+            
+            rng = np.random.default_rng(0)
+            background = rng.integers(40, 90, (360, 640, 3), dtype=np.uint8)
+            
+            def run_crossing(color):
+                detector = AnimalDetector("missing_config.json")
+                detector.config["classifier"] = settings
+                detector.classifier = load_classifier(detector.config, classifier)  # Same settings: not reloaded
+                statuses = []
+                for i in range(100):
+                    frame = background.copy()
+                    if i >= 40:
+                        draw_animal(frame, 50 + (i - 40) * 8, 200, 0.6, color)
+                    result = detector.process_frame(frame, timestamp=i / 10.0)
+                    statuses.append(result[2] if result else None)
+                names = {entry[1] for entry in detector.track_names if entry}
+                return statuses, names
+            
+            statuses, names = run_crossing((170, 170, 170))
+            if "ඇතුළු වී ඇත" not in statuses or names != {"ගවයා"}:
+                print(f"❌ Animal not named by the model: {names}")
+                return False
+            statuses, names = run_crossing((50, 50, 200))
+            if "ඇතුළු වී ඇත" in statuses:
+                print(f"❌ Person was reported as an animal: {names}")
+                return False
+        print(f"✅ Crops classified in batches, animal named {labels[0]}, person ignored")
+        return True
+    except Exception as e:
+        print(f"❌ Animal classifier error: {e}")
+        return False
+
+def test_event_flush():
+    """Test that ENTER/EXIT messages wait in the worker while the result queue is full, in order"""
+    print("\n🔍 Testing event delivery...")
+    
+    try:
+        import queue
+        from collections import deque
+        from camera_manager import flush_events
+        
+        result_queue = queue.Queue(maxsize=2)
+        result_queue.put({"type": "status"})
+        pending = deque([{"event": "ENTER"}, {"event": "EXIT"}])
+        if flush_events(result_queue, pending) or [m["event"] for m in pending] != ["EXIT"]:
+            print(f"❌ Wrong events kept: {list(pending)}")
+            return False
+        
+        result_queue.get_nowait()
+        if not flush_events(result_queue, pending, timeout=0.1) or pending:
+            print("❌ Kept events were not delivered")
+            return False
+        delivered = [result_queue.get_nowait()["event"] for _ in range(2)]
+        if delivered != ["ENTER", "EXIT"]:
+            print(f"❌ Events out of order: {delivered}")
+            return False
+        print("✅ Events kept while the queue was full and delivered in order")
+        return True
+    except Exception as e:
+        print(f"❌ Event delivery error: {e}")
+        return False
+
+def test_camera_workers():
+    """Test that a config reload starts and stops camera workers and a dead worker is reported offline"""
+    print("\n🔍 Testing camera worker supervision...")
+    
+    try:
+        import json
+        import queue
+        import tempfile
+        import camera_manager
+        from camera_manager import CameraManager
+        
+        class FakeProcess:
+            def __init__(self, target=None, args=(), name=None, daemon=None):
+                self.alive = False
+                self.exitcode = None
+                self.pid = 0
+            def start(self):
+                self.alive = True
+            def is_alive(self):
+                return self.alive
+            def join(self, timeout=None):
+                self.alive = False
+            def terminate(self):
+                self.alive = False
+        
+        class FakeContext:
+            Process = FakeProcess
+            def Queue(self, maxsize=0):
+                return queue.Queue(maxsize)
+        
+        def write_config(path, camera_ids):
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump({"cameras": [{"id": camera_id, "camera_index": 0} for camera_id in camera_ids]}, f)
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            config_file = os.path.join(temp_dir, 'config.json')
+            write_config(config_file, ["gate1", "gate2"])
+            changes = []
+            manager = CameraManager(config_file, on_status_change=lambda camera_id, status: changes.append(camera_id))
+            manager.context = FakeContext()
+            manager.start()
+            try:
+                write_config(config_file, ["gate1", "gate3"])
+                manager.reload_config()
+                if sorted(manager.workers) != ["gate1", "gate3"] or "gate2" in manager.broadcasters:
+                    print(f"❌ Workers after reload: {sorted(manager.workers)}")
+                    return False
+                
+                manager.workers["gate1"].alive = False
+                manager._check_workers()
+                status = manager.get_camera_status("gate1")
+                if status["camera_active"] or "gate1" in manager.workers or changes != ["gate1"]:
+                    print(f"❌ Dead worker still reported: {status['status']}")
+                    return False
+                
+                manager.restart_at["gate1"] = 0
+                manager._check_workers()
+                if not manager.workers.get("gate1") or not manager.workers["gate1"].is_alive():
+                    print("❌ Dead worker was not restarted")
+                    return False
+            finally:
+                manager.stop()
+        print("✅ Workers follow config reloads and dead workers are reported and restarted")
+        return True
+    except Exception as e:
+        print(f"❌ Camera worker supervision error: {e}")
+        return False
+
 def test_directories():
     """Test if required directories exist"""
     print("\n🔍 Testing directory structure...")
@@ -211,9 +1442,34 @@ def main():
         test_templates,
         test_batch_files,
         test_detector,
+        test_frame_grabber,
+        test_frame_sources,
+        test_batch_analysis,
+        test_frame_broadcaster,
+        test_stream_profiles,
+        test_event_bus,
+        test_camera_registry,
+        test_event_store,
+        test_event_statistics,
+        test_event_writer,
         test_state_machine,
         test_sms_system,
-        test_alarm_system
+        test_sms_outbox,
+        test_sms_log,
+        test_alert_policy,
+        test_sms_recipients,
+        test_alarm_system,
+        test_alarm_worker,
+        test_alarm_escalation,
+        test_tracker,
+        test_contour_filter,
+        test_detection_zones,
+        test_motion_gate,
+        test_frame_scheduler,
+        test_detector_workspace,
+        test_animal_classifier,
+        test_event_flush,
+        test_camera_workers
     ]
     
     passed = 0
@@ -0,0 +1,91 @@
+import math
+import threading
+import time
+
+class TimerWheel:
+    def __init__(self, tick=0.25, slots=512):
+        """Initialize a hashed timing wheel: one thread serves every timer, resolution `tick` seconds"""
+        self.tick = tick
+        self.slots = [dict() for _ in range(max(1, int(slots)))]  # timer_id -> [rounds, callback]
+        self.timer_slots = {}  # timer_id -> slot index, for O(1) cancel
+        self.current_tick = 0
+        self.next_timer_id = 1
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.wheel_thread = None
+        self.timers_fired = 0
+
+    def start(self):
+        """Start turning the wheel"""
+        if self.wheel_thread and self.wheel_thread.is_alive():
+            return
+
+        self.stop_event.clear()
+        self.wheel_thread = threading.Thread(target=self._wheel_loop, daemon=True)
+        self.wheel_thread.start()
+
+    def stop(self):
+        """Stop the wheel thread (pending timers are kept)"""
+        self.stop_event.set()
+        if self.wheel_thread and self.wheel_thread.is_alive():
+            self.wheel_thread.join(timeout=2.0)
+        self.wheel_thread = None
+
+    def schedule(self, delay, callback):
+        """Call callback() after `delay` seconds (rounded up to the next tick), returns a timer id"""
+        ticks = max(1, math.ceil(delay / self.tick))
+        with self.lock:
+            timer_id = self.next_timer_id
+            self.next_timer_id += 1
+            slot = (self.current_tick + ticks) % len(self.slots)
+            # Whole turns of the wheel to skip before the timer is due
+            self.slots[slot][timer_id] = [(ticks - 1) // len(self.slots), callback]
+            self.timer_slots[timer_id] = slot
+        return timer_id
+
+    def cancel(self, timer_id):
+        """Cancel a pending timer, returns False if it already fired or never existed"""
+        with self.lock:
+            slot = self.timer_slots.pop(timer_id, None)
+            if slot is None:
+                return False
+            self.slots[slot].pop(timer_id, None)
+            return True
+
+    def get_pending_count(self):
+        """Get the number of timers not fired yet"""
+        with self.lock:
+            return len(self.timer_slots)
+
+    def advance(self):
+        """Move the wheel one tick and run the timers that became due"""
+        due = []
+        with self.lock:
+            self.current_tick += 1
+            slot = self.slots[self.current_tick % len(self.slots)]
+            for timer_id, entry in list(slot.items()):
+                if entry[0] > 0:
+                    entry[0] -= 1
+                else:
+                    due.append(entry[1])
+                    del slot[timer_id]
+                    del self.timer_slots[timer_id]
+
+        for callback in due:
+            try:
+                callback()
+            except Exception as e:
+                print(f"Timer callback error: {e}")
+            self.timers_fired += 1
+        return len(due)
+
+    def _wheel_loop(self):
+        """Internal method that advances one tick per `tick` seconds, catching up if it fell behind"""
+        start = time.monotonic()
+        ticks_done = 0
+        while not self.stop_event.is_set():
+            next_tick_at = start + (ticks_done + 1) * self.tick
+            if self.stop_event.wait(max(0.0, next_tick_at - time.monotonic())):
+                break
+            self.advance()
+            ticks_done += 1
@@ -0,0 +1,125 @@
+import numpy as np
+
+class ObjectTracker:
+    def __init__(self, max_tracks=32, iou_threshold=0.1, max_distance=1.0, max_lost=1.0, min_hits=3):
+        """Initialize a greedy IoU/centroid tracker with a fixed number of track slots.
+
+        All track state lives in preallocated NumPy arrays indexed by slot, so the
+        memory used never grows with the number of frames or animals seen.
+        """
+        self.max_tracks = max_tracks
+        self.iou_threshold = iou_threshold  # Below this overlap, fall back to centroid distance
+        self.max_distance = max_distance  # Centroid gate, in box diagonals
+        self.max_lost = max_lost  # Seconds a track survives without a match
+        self.min_hits = min_hits  # Matches before a track counts as an animal
+        self.ids = np.full(max_tracks, -1, dtype=np.int64)  # -1 marks a free slot
+        self.boxes = np.zeros((max_tracks, 4), dtype=np.float32)  # x, y, w, h
+        self.velocity = np.zeros((max_tracks, 2), dtype=np.float32)  # Centre speed in pixels/second
+        self.first_seen = np.zeros(max_tracks, dtype=np.float64)
+        self.last_seen = np.zeros(max_tracks, dtype=np.float64)
+        self.hits = np.zeros(max_tracks, dtype=np.int32)
+        self.next_id = 1
+        self.distinct_count = 0  # Tracks confirmed since reset_count()
+
+    def update(self, boxes, timestamp):
+        """Match this frame's (x, y, w, h) boxes to tracks, returns the track slot of each box (-1 if none)"""
+        boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 4)
+        self._expire(timestamp)
+        slots = np.full(len(boxes), -1, dtype=np.intp)
+        active = np.flatnonzero(self.ids >= 0)
+
+        if len(active) and len(boxes):
+            elapsed = np.maximum(timestamp - self.last_seen[active], 0.0)
+            predicted = self.boxes[active].copy()
+            predicted[:, :2] += self.velocity[active] * elapsed[:, None]
+            scores = self._match_scores(predicted, boxes)
+
+            # Greedy assignment: best-scoring pairs first, each track and box used once
+            matched_tracks = np.zeros(len(active), dtype=bool)
+            for flat in np.argsort(-scores, axis=None):
+                track, box = divmod(int(flat), len(boxes))
+                if scores[track, box] <= 0:
+                    break
+                if matched_tracks[track] or slots[box] >= 0:
+                    continue
+                matched_tracks[track] = True
+                slots[box] = active[track]
+                self._match(active[track], boxes[box], timestamp)
+
+        for box in np.flatnonzero(slots < 0):
+            slots[box] = self._create(boxes[box], timestamp, slots)
+        return slots
+
+    def _match_scores(self, tracks, boxes):
+        """Internal method that scores every track/box pair: IoU, or a smaller centroid score when they barely overlap"""
+        tx1, ty1 = tracks[:, 0:1], tracks[:, 1:2]
+        tx2, ty2 = tx1 + tracks[:, 2:3], ty1 + tracks[:, 3:4]
+        bx1, by1 = boxes[:, 0], boxes[:, 1]
+        bx2, by2 = bx1 + boxes[:, 2], by1 + boxes[:, 3]
+
+        overlap = (np.clip(np.minimum(tx2, bx2) - np.maximum(tx1, bx1), 0, None) *
+                   np.clip(np.minimum(ty2, by2) - np.maximum(ty1, by1), 0, None))
+        union = tracks[:, 2:3] * tracks[:, 3:4] + boxes[:, 2] * boxes[:, 3] - overlap
+        iou = overlap / np.maximum(union, 1e-6)
+
+        distance = np.hypot((tx1 + tx2) / 2 - (bx1 + bx2) / 2, (ty1 + ty2) / 2 - (by1 + by2) / 2)
+        diagonal = np.hypot(tracks[:, 2:3], tracks[:, 3:4])
+        closeness = 1.0 - distance / np.maximum(diagonal * self.max_distance, 1e-6)
+        # Centroid matches always rank below real overlaps
+        return np.where(iou >= self.iou_threshold, iou, np.clip(closeness, 0, None) * self.iou_threshold)
+
+    def _match(self, slot, box, timestamp):
+        """Internal method that moves a track to its matched box and updates its velocity"""
+        elapsed = timestamp - self.last_seen[slot]
+        if elapsed > 0:
+            moved = (box[:2] + box[2:] / 2) - (self.boxes[slot, :2] + self.boxes[slot, 2:] / 2)
+            self.velocity[slot] = 0.5 * self.velocity[slot] + 0.5 * moved / elapsed
+        self.boxes[slot] = box
+        self.last_seen[slot] = timestamp
+        self.hits[slot] += 1
+        if self.hits[slot] == self.min_hits:
+            self.distinct_count += 1
+
+    def _create(self, box, timestamp, taken):
+        """Internal method that starts a track in a free slot (or the stalest one not matched this frame)"""
+        free = np.flatnonzero(self.ids < 0)
+        if len(free):
+            slot = free[0]
+        else:
+            candidates = np.setdiff1d(np.arange(self.max_tracks), taken[taken >= 0])
+            if not len(candidates):
+                return -1
+            slot = candidates[np.argmin(self.last_seen[candidates])]
+
+        self.ids[slot] = self.next_id
+        self.next_id += 1
+        self.boxes[slot] = box
+        self.velocity[slot] = 0
+        self.first_seen[slot] = self.last_seen[slot] = timestamp
+        self.hits[slot] = 1
+        if self.min_hits <= 1:
+            self.distinct_count += 1
+        return slot
+
+    def _expire(self, timestamp):
+        """Internal method that frees the slots of tracks not matched for max_lost seconds"""
+        self.ids[(self.ids >= 0) & (timestamp - self.last_seen > self.max_lost)] = -1
+
+    def reset_count(self):
+        """Start counting distinct animals again (tracks already confirmed count once)"""
+        self.distinct_count = int(np.count_nonzero((self.ids >= 0) & (self.hits >= self.min_hits)))
+
+    def reset(self):
+        """Drop every track"""
+        self.ids[:] = -1
+        self.distinct_count = 0
+
+    def get_tracks(self):
+        """Get the live tracks as dicts (id, box, age in seconds, velocity in pixels/second, hits)"""
+        return [{
+            "id": int(self.ids[slot]),
+            "box": tuple(int(v) for v in self.boxes[slot]),
+            "age": float(self.last_seen[slot] - self.first_seen[slot]),
+            "velocity": (float(self.velocity[slot, 0]), float(self.velocity[slot, 1])),
+            "hits": int(self.hits[slot])
+        } for slot in np.flatnonzero(self.ids >= 0)]
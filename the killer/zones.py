@@ -0,0 +1,51 @@
+import cv2
+import numpy as np
+
+def load_zones(config):
+    """Get a camera's detection zones from config as {"include": [...], "exclude": [...]}.
+
+    Each zone is a polygon of [x, y] points normalized to 0..1 of the frame, so
+    the same zones work at any camera or analysis resolution. No include zone
+    means the whole frame is watched.
+    """
+    zones = config.get("zones") or {}
+    result = {}
+    for kind in ("include", "exclude"):
+        polygons = []
+        for polygon in zones.get(kind) or []:
+            points = [[min(1.0, max(0.0, float(x))), min(1.0, max(0.0, float(y)))] for x, y in polygon]
+            if len(points) >= 3:
+                polygons.append(points)
+        result[kind] = polygons
+    return result
+
+def has_zones(zones):
+    """Check if any zone is defined"""
+    return bool(zones["include"] or zones["exclude"])
+
+def build_zone_mask(zones, width, height):
+    """Rasterize zones for one frame size, returns (mask, (x, y, w, h)) with the mask cropped to that box.
+
+    The box is the bounding box of the active area, so detection can work on
+    the crop only. The mask is None when every pixel of the box is active;
+    the box is empty (w = h = 0) when no pixel is active at all.
+    """
+    mask = np.zeros((height, width), dtype=np.uint8)
+    scale = np.array([width - 1, height - 1], dtype=np.float64)
+
+    if zones["include"]:
+        for polygon in zones["include"]:
+            cv2.fillPoly(mask, [np.round(np.array(polygon) * scale).astype(np.int32)], 255)
+    else:
+        mask[:] = 255
+    for polygon in zones["exclude"]:
+        cv2.fillPoly(mask, [np.round(np.array(polygon) * scale).astype(np.int32)], 0)
+
+    points = cv2.findNonZero(mask)
+    if points is None:
+        return None, (0, 0, 0, 0)
+    x, y, w, h = cv2.boundingRect(points)
+    mask = mask[y:y + h, x:x + w].copy()
+    if cv2.countNonZero(mask) == w * h:
+        mask = None  # Plain crop, nothing to mask out
+    return mask, (x, y, w, h)